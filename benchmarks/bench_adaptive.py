@@ -0,0 +1,60 @@
+"""Adaptive selection: cost of choosing the next question, at several bank sizes.
+
+Builds a RatingIndex over an in-memory bank of each --rows size, spreads
+the question ratings by applying random updates, then plays --answers
+answers through AdaptiveQuiz and reports:
+  build ms       one RatingIndex (one pass over the pool)
+  next-q us      record() of an answer plus choosing the next question:
+                 what the session adds between EVAL and QUESTION
+  update us      one rating update as the background thread applies it
+Ratings go to a temporary file.
+
+Usage: python benchmarks/bench_adaptive.py [--rows 10000,100000,1000000] [--answers 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.shared_logic import CompiledQuestion  # noqa: E402
+from server.adaptive import INITIAL_RATING, AdaptiveEngine, AdaptiveQuiz, RatingIndex, RatingStore  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--answers', type=int, default=20000)
+    args = parser.parse_args()
+    print(f'{"rows":>8} {"build ms":>9} {"next-q us":>10} {"update us":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in map(int, args.rows.split(',')):
+            questions = [CompiledQuestion(f'Câu hỏi số {i}', ('1', '2', '3', '4'), i % 4) for i in range(rows)]
+            store = RatingStore(os.path.join(tmp, f'ratings{rows}.json'))
+            started = time.perf_counter()
+            index = RatingIndex(questions, range(rows), store)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            updates = min(rows, 50000)
+            started = time.perf_counter()
+            for _ in range(updates):
+                index.update(random.randrange(rows), random.gauss(INITIAL_RATING, 200))
+            update_us = (time.perf_counter() - started) / updates * 1e6
+
+            # Updates are only queued here; the engine thread applies them
+            engine = AdaptiveEngine(store, save_interval=3600)
+            quizzes = [AdaptiveQuiz(engine, index, f'p{i}', 10) for i in range(args.answers // 10)]
+            started = time.perf_counter()
+            for quiz in quizzes:
+                for _turn in quiz.turns():
+                    quiz.record(random.random() < 0.5)
+            next_us = (time.perf_counter() - started) / (len(quizzes) * 10) * 1e6
+            engine.stop()
+            print(f'{rows:>8} {build_ms:>9.0f} {next_us:>10.1f} {update_us:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
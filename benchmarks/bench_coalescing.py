@@ -0,0 +1,99 @@
+"""Outbound write coalescing: one write per turn vs. one write per frame.
+
+Runs quiz turns over loopback TCP through a ThreadedConnection, exactly as
+run_quiz_session does: read ANSWER, send EVAL, send the next QUESTION. The
+client answers as soon as a QUESTION arrives. Reports the turn latency seen
+by the client (ANSWER sent -> next QUESTION received) and the socket write
+calls the server made per turn, with coalescing on and off. No TCP_NODELAY
+is set, so the uncoalesced run also shows the Nagle / delayed-ACK stall.
+
+Usage: python benchmarks/bench_coalescing.py [--turns 200]
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.network_utils import BufferedLineReader  # noqa: E402
+from core.protocol import MessageBuilder  # noqa: E402
+from server import outbound  # noqa: E402
+from server.outbound import ThreadedConnection  # noqa: E402
+
+TEXT = 'Thủ đô của Việt Nam là thành phố nào?'
+OPTIONS = ['Hà Nội', 'Huế', 'Đà Nẵng', 'Sài Gòn']
+
+
+class CountingSocket(socket.socket):
+    """Socket that counts the send calls made on it."""
+
+    writes = 0
+
+    def sendall(self, *args, **kwargs):
+        self.writes += 1
+        return super().sendall(*args, **kwargs)
+
+    def sendmsg(self, *args, **kwargs):
+        self.writes += 1
+        return super().sendmsg(*args, **kwargs)
+
+
+def serve_turns(listener: socket.socket, turns: int) -> int:
+    raw, _ = listener.accept()
+    sock = CountingSocket(raw.family, raw.type, raw.proto, fileno=raw.detach())
+    conn = ThreadedConnection(sock, 'bench')
+    reader = BufferedLineReader(sock)
+    conn.send(MessageBuilder.question_frame(0, TEXT, OPTIONS))
+    for qidx in range(1, turns + 1):
+        if reader.read_line() is None:
+            break
+        conn.cork()
+        conn.send(MessageBuilder.eval_frame(True, 'A'))
+        conn.send(MessageBuilder.question_frame(qidx, TEXT, OPTIONS))
+        conn.uncork()
+    conn.close()
+    sock.close()
+    return sock.writes
+
+
+def run(turns: int, coalesce: bool) -> tuple:
+    outbound.configure(coalesce=coalesce)
+    listener = socket.create_server(('127.0.0.1', 0))
+    result = {}
+    server = threading.Thread(target=lambda: result.setdefault('writes', serve_turns(listener, turns)))
+    server.start()
+    client = socket.create_connection(listener.getsockname())
+    reader = BufferedLineReader(client)
+    latencies = []
+    reader.read_line()  # first QUESTION
+    for qidx in range(turns):
+        started = time.perf_counter()
+        client.sendall(f'ANSWER:{qidx}|A\n'.encode('utf-8'))
+        reader.read_line()  # EVAL
+        reader.read_line()  # next QUESTION
+        latencies.append(time.perf_counter() - started)
+    server.join()
+    client.close()
+    listener.close()
+    return latencies, result['writes']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=200)
+    args = parser.parse_args()
+    print(f'{"":<12} {"median ms":>9} {"p99 ms":>8} {"writes/turn":>11}')
+    for label, coalesce in (('per frame', False), ('coalesced', True)):
+        latencies, writes = run(args.turns, coalesce)
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f'{label:<12} {statistics.median(latencies) * 1e3:>9.3f} {p99 * 1e3:>8.3f} '
+              f'{(writes - 1) / args.turns:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
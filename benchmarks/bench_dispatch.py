@@ -0,0 +1,76 @@
+"""Per-message parse cost: startswith chain vs. verb table, as message types grow.
+
+The chain variant models the old ProtocolParser.parse / _process_message:
+exact matches, then one startswith() per message type until one hits. The
+table variant is core.protocol.parse_server_message; both build the same
+typed messages, so only dispatch differs. Each run registers
+N extra synthetic message types and parses a realistic mix, where the
+chain pays for every type listed before the one that matches.
+
+Usage: python benchmarks/bench_dispatch.py [--messages 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import protocol  # noqa: E402
+
+MIX = [
+    'QUESTION:3|Thủ đô của Việt Nam là thành phố nào?|Hà Nội,Huế,Đà Nẵng,Sài Gòn',
+    'EVAL|RIGHT|A',
+    'EVAL|WRONG|C',
+    'WAIT',
+    'SCORE|7/10',
+]
+
+EXACT = ['NAME_OK', 'NAME_TAKEN', 'WAIT', 'START', 'STOP']
+PREFIXES = ['SERVER_PAUSED|', 'GAME_STARTED|', 'GAME_PAUSED|', 'ERROR|', 'QUESTION:',
+            'QUESTION|', 'EVAL|', 'SCORE|', 'LEADERBOARD|']
+
+
+def make_chain(extra: int):
+    # Extra types are checked before the real ones, as new messages are
+    # usually appended in the middle of such chains
+    prefixes = [f'EXTRA{i}|' for i in range(extra)] + PREFIXES
+
+    parsers = protocol.SERVER_MESSAGE_PARSERS
+
+    def parse(line: str):
+        for verb in EXACT:
+            if line == verb:
+                return parsers[verb](line, '', '')
+        for prefix in prefixes:
+            if line.startswith(prefix):
+                # Same payload parsing as the table; only dispatch differs
+                return parsers[prefix[:-1]](line, prefix[-1], line[len(prefix):])
+        return None
+    return parse
+
+
+def bench(parse, lines) -> float:
+    started = time.perf_counter()
+    for line in lines:
+        parse(line)
+    return (time.perf_counter() - started) / len(lines) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+    lines = (MIX * (args.messages // len(MIX) + 1))[:args.messages]
+
+    print(f'{"types":>6} {"chain ns/msg":>14} {"table ns/msg":>14}')
+    for extra in (0, 10, 50, 200):
+        for i in range(extra):
+            protocol.SERVER_MESSAGE_PARSERS.setdefault(f'EXTRA{i}', protocol._parse_eval)
+        chain_ns = bench(make_chain(extra), lines)
+        table_ns = bench(protocol.parse_server_message, lines)
+        print(f'{len(EXACT) + len(PREFIXES) + extra:>6} {chain_ns:14.0f} {table_ns:14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Outbound message cost: str build + send_line encoding vs. pre-encoded frames.
+
+Models the server's output for one answered question (EVAL, the next
+QUESTION and a SCORE) and reports time per message and the peak memory a
+turn allocates on top of its result, i.e. the intermediate str objects
+that send_line() builds (f-string, rstrip, + '\\n') before encoding.
+
+Usage: python benchmarks/bench_frames.py [--turns 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.protocol import MessageBuilder  # noqa: E402
+
+TEXT = 'Thủ đô của Việt Nam là thành phố nào?'
+OPTIONS = ['Hà Nội', 'Huế', 'Đà Nẵng', 'Sài Gòn']
+
+
+def send_line_turn(i: int, given: str = 'A') -> list:
+    lines = (f'EVAL|RIGHT|{given}', f"QUESTION:{i}|{TEXT}|{','.join(OPTIONS)}", f'SCORE|{i}/10')
+    return [(line.rstrip('\n') + '\n').encode('utf-8') for line in lines]
+
+
+def frame_turn(i: int, given: str = 'A') -> list:
+    return [
+        MessageBuilder.eval_frame(True, given),
+        MessageBuilder.question_frame(i, TEXT, OPTIONS),
+        MessageBuilder.score_frame(i, 10),
+    ]
+
+
+def time_per_message(turn, turns: int) -> float:
+    started = time.perf_counter()
+    for i in range(turns):
+        turn(i)
+    return (time.perf_counter() - started) / (turns * 3) * 1e9
+
+
+def transient_bytes(turn, samples: int = 1000) -> float:
+    """Average peak bytes allocated by one turn beyond what it returns."""
+    tracemalloc.start()
+    total = 0
+    for i in range(samples):
+        tracemalloc.reset_peak()
+        result = turn(i)
+        current, peak = tracemalloc.get_traced_memory()
+        total += peak - current
+        del result
+    tracemalloc.stop()
+    return total / samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=100000)
+    args = parser.parse_args()
+    for label, turn in (('send_line', send_line_turn), ('frames', frame_turn)):
+        print(f'{label:<10} {time_per_message(turn, args.turns):6.0f} ns/msg  '
+              f'{transient_bytes(turn):6.0f} transient bytes/turn')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Multi-file ingestion: parse throughput with 1 vs. N parser processes.
+
+Writes --files synthetic banks of --rows questions each (CSV and JSONL
+alternating, a tenth of each file repeating the previous file) and runs
+core.ingest.ingest() over them with every --workers count. Reports wall
+time, rows/s and the duplicates found.
+
+Usage: python benchmarks/bench_ingest.py [--files 24] [--rows 50000] [--workers 1,2,4]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ingest import ingest  # noqa: E402
+
+
+def question(i: int) -> dict:
+    return {'question': f'Câu hỏi số {i}: {i} cộng 1 bằng bao nhiêu?',
+            'A': i + 1, 'B': i + 2, 'C': i, 'D': f'{i}, hoặc "khác"', 'answer': 'ABCD'[i % 4]}
+
+
+def write_csv(path: str, first: int, rows: int) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(question(0)))
+        writer.writeheader()
+        writer.writerows(question(i) for i in range(first, first + rows))
+
+
+def write_jsonl(path: str, first: int, rows: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(first, first + rows):
+            f.write(json.dumps(question(i), ensure_ascii=False) + '\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=24)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--workers', default=f'1,{os.cpu_count() or 1}')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        step = args.rows - args.rows // 10  # each file repeats the tail of the previous one
+        for n in range(args.files):
+            write = write_jsonl if n % 2 else write_csv
+            write(os.path.join(tmp, f'bank{n:03}.{"jsonl" if n % 2 else "csv"}'), n * step, args.rows)
+        print(f'{"workers":>7} {"seconds":>8} {"rows/s":>10} {"questions":>10} {"duplicates":>10}')
+        for workers in dict.fromkeys(map(int, args.workers.split(','))):
+            started = time.perf_counter()
+            result = ingest([tmp], workers)
+            elapsed = time.perf_counter() - started
+            rows = sum(report.rows for report in result.files)
+            print(f'{workers:>7} {elapsed:>8.2f} {rows / elapsed:>10,.0f} '
+                  f'{len(result.questions):>10} {result.duplicates:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Line reading cost: byte-at-a-time recv vs. MSG_PEEK recv_line vs. BufferedLineReader.
+
+A writer thread streams protocol-sized lines over a socketpair; each reader
+consumes them and we report recv syscalls per message and throughput. The
+'byte' variant is the original recv_line loop (recv(1) per byte). In a
+lockstep exchange (one line in flight) the buffered reader still needs one
+recv per message instead of one per byte.
+
+Usage: python benchmarks/bench_line_reader.py [--messages 20000]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.network_utils import BufferedLineReader, recv_line  # noqa: E402
+
+LINE = 'QUESTION:7|Thủ đô của Việt Nam là thành phố nào?|Hà Nội,Huế,Đà Nẵng,Sài Gòn\n'.encode('utf-8')
+
+
+class CountingSocket:
+    """Counts recv-family calls made through it."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self.calls = 0
+
+    def recv(self, *args):
+        self.calls += 1
+        return self._sock.recv(*args)
+
+    def recv_into(self, *args):
+        self.calls += 1
+        return self._sock.recv_into(*args)
+
+
+def recv_line_bytewise(sock) -> str:
+    buf = []
+    while True:
+        ch = sock.recv(1)
+        if not ch:
+            return ''
+        if ch == b'\n':
+            break
+        buf.append(ch)
+    return b''.join(buf).decode('utf-8').rstrip('\r')
+
+
+def run(label: str, messages: int) -> None:
+    a, b = socket.socketpair()
+    counted = CountingSocket(b)
+    writer = threading.Thread(target=lambda: (a.sendall(LINE * messages), a.shutdown(socket.SHUT_WR)))
+
+    if label == 'byte':
+        read = lambda: recv_line_bytewise(counted)
+    elif label == 'peek':
+        read = lambda: recv_line(counted)
+    else:
+        reader = BufferedLineReader(counted)
+        read = reader.readline
+
+    writer.start()
+    started = time.perf_counter()
+    for _ in range(messages):
+        if not read():
+            raise RuntimeError(f'{label}: stream ended early')
+    elapsed = time.perf_counter() - started
+    writer.join()
+    a.close()
+    b.close()
+    print(f'{label:<9} {counted.calls / messages:8.3f} recv calls/msg  '
+          f'{messages / elapsed:12,.0f} msg/s')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    print(f'{args.messages} lines of {len(LINE)} bytes')
+    for label in ('byte', 'peek', 'buffered'):
+        run(label, args.messages)
+
+
+if __name__ == '__main__':
+    main()
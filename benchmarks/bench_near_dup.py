@@ -0,0 +1,88 @@
+"""Near-duplicate detection: time and recall on synthetic banks with known paraphrases.
+
+Builds banks of --rows random Vietnamese-looking questions, then adds
+--dup-rate of them again as variants (diacritics dropped, case and
+punctuation changed, one word dropped or duplicated) with the same
+answer and number. Runs core.near_dup.find_near_duplicates() and reports
+time per phase, questions per second, recall (variants clustered with
+their original) and false clusters (clusters joining two different
+originals).
+
+Usage: python benchmarks/bench_near_dup.py [--rows 100000,1000000] [--dup-rate 0.05]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.near_dup import DEFAULT_THRESHOLD, find_near_duplicates  # noqa: E402
+from core.shared_logic import CompiledQuestion  # noqa: E402
+
+WORDS = ('thủ đô của nước nào là gì ai người đã viết bài thơ năm bao nhiêu sông dài nhất '
+         'Việt Nam thế giới thành phố lớn tỉnh có diện tích dân số đông núi cao trận đánh '
+         'vua triều đại nhà Lý Trần Lê Nguyễn khi nào được xây dựng tác giả truyện Kiều '
+         'hành tinh gần mặt trời nguyên tố hóa học ký hiệu loài động vật sống ở đâu').split()
+
+
+def strip_marks(text: str) -> str:
+    text = unicodedata.normalize('NFD', text).replace('đ', 'd').replace('Đ', 'D')
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def variant(rng: random.Random, text: str) -> str:
+    *words, number = text.rstrip('?').split()  # a question with another number is another question
+    if len(words) > 6 and rng.random() < 0.5:
+        del words[rng.randrange(len(words))]
+    elif rng.random() < 0.5:
+        i = rng.randrange(len(words))
+        words.insert(i, words[i])
+    text = ' '.join(words + [number])
+    if rng.random() < 0.5:
+        text = strip_marks(text)
+    if rng.random() < 0.3:
+        text = text.upper()
+    return text + rng.choice(('?', ' ?', '', '...'))
+
+
+def make_bank(rows: int, dup_rate: float, seed: int = 1):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(rows):
+        words = rng.choices(WORDS, k=rng.randint(7, 14))
+        questions.append(CompiledQuestion(f'{" ".join(words).capitalize()} {i % 997}?',
+                                          (str(i), str(i + 1), str(i + 2), str(i + 3)), rng.randrange(4)))
+    originals = {}
+    for i in rng.sample(range(rows), int(rows * dup_rate)):
+        originals[len(questions)] = i
+        question = questions[i]
+        questions.append(question._replace(text=variant(rng, question.text)))
+    return questions, originals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='100000,1000000')
+    parser.add_argument('--dup-rate', type=float, default=0.05)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+    for rows in map(int, args.rows.split(',')):
+        questions, originals = make_bank(rows, args.dup_rate)
+        print(f'{len(questions)} questions ({len(originals)} variants):')
+        started = time.perf_counter()
+        result = find_near_duplicates(questions, args.threshold, progress=lambda line: print('  ' + line))
+        elapsed = time.perf_counter() - started
+        cluster_of = {i: n for n, cluster in enumerate(result.clusters) for i in cluster}
+        found = sum(1 for dup, original in originals.items()
+                    if dup in cluster_of and cluster_of[dup] == cluster_of.get(original))
+        mixed = sum(1 for cluster in result.clusters
+                    if len({originals.get(i, i) for i in cluster}) > 1)
+        print(f'  {elapsed:.1f} s, {len(questions) / elapsed:,.0f} questions/s, '
+              f'recall {found / max(len(originals), 1):.3f}, {mixed} false clusters of {len(result.clusters)}')
+
+
+if __name__ == '__main__':
+    main()
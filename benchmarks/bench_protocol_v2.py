@@ -0,0 +1,74 @@
+"""Wire protocol v1 (text lines) vs. v2 (length-prefixed binary frames).
+
+Encodes one full quiz session per protocol, as the server sends it (per
+question: QUESTION, EVAL; then SCORE) plus the client's ANSWER frames, and
+reports bytes on the wire and the time to decode that byte stream with the
+shared incremental decoders, fed in recv-sized chunks.
+
+Usage: python benchmarks/bench_protocol_v2.py [--sessions 2000] [--questions 10] [--chunk 4096]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.framing import MessageDecoder  # noqa: E402
+from core.protocol import MessageBuilder, parse_client_message, parse_server_message  # noqa: E402
+from core.protocol_v2 import FrameBuilder, FrameDecoder  # noqa: E402
+
+TEXT = 'Thủ đô của Việt Nam là thành phố nào?'
+OPTIONS = ['Hà Nội', 'Huế', 'Đà Nẵng', 'Sài Gòn']
+
+
+def session_bytes(builder, questions: int) -> tuple:
+    """(server->client, client->server) bytes of one session."""
+    down = []
+    up = []
+    for i in range(questions):
+        down.append(builder.question_frame(i, TEXT, OPTIONS))
+        letter = 'ABCD'[i % 4]
+        if builder is FrameBuilder:
+            up.append(FrameBuilder.answer_frame(i, letter))
+        else:
+            up.append(f'{MessageBuilder.answer(i, letter)}\n'.encode('utf-8'))
+        down.append(builder.eval_frame(i % 2 == 0, letter))
+    down.append(builder.score_frame(questions // 2, questions))
+    return b''.join(down), b''.join(up)
+
+
+def decode_ns(make_decoder, data: bytes, sessions: int, chunk: int) -> float:
+    """Nanoseconds per decoded message, feeding data in chunk-sized pieces."""
+    messages = 0
+    started = time.perf_counter()
+    for _ in range(sessions):
+        decoder = make_decoder()
+        for pos in range(0, len(data), chunk):
+            messages += len(decoder.feed(data[pos:pos + chunk]))
+    return (time.perf_counter() - started) / messages * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--chunk', type=int, default=4096, help='bytes per simulated recv()')
+    args = parser.parse_args()
+
+    protocols = (
+        ('v1 text', MessageBuilder,
+         lambda: MessageDecoder(parse_server_message), lambda: MessageDecoder(parse_client_message)),
+        ('v2 binary', FrameBuilder,
+         lambda: FrameDecoder(parse_server_message), lambda: FrameDecoder(parse_client_message)),
+    )
+    print(f'{"":<10} {"down B":>7} {"up B":>6} {"down ns/msg":>12} {"up ns/msg":>10}')
+    for label, builder, server_decoder, client_decoder in protocols:
+        down, up = session_bytes(builder, args.questions)
+        down_ns = decode_ns(server_decoder, down, args.sessions, args.chunk)
+        up_ns = decode_ns(client_decoder, up, args.sessions, args.chunk)
+        print(f'{label:<10} {len(down):>7} {len(up):>6} {down_ns:>12.0f} {up_ns:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Question bank loaders: whole bank in memory vs. row-offset index.
+
+Writes a synthetic bank of --rows questions to a temporary CSV, loads it
+with each loader and reports load time, memory held by the loaded bank
+(tracemalloc) and the time to draw one session (QuizPlan over the whole
+bank plus MAX_QUESTIONS lookups).
+
+Usage: python benchmarks/bench_question_bank.py [--rows 200000] [--sessions 2000]
+"""
+import argparse
+import csv
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.server_config import server_config  # noqa: E402
+from core.question_bank import LOADERS, open_question_bank  # noqa: E402
+from server.quiz_plan import QuizPlan  # noqa: E402
+
+
+def write_bank(path: str, rows: int) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['question', 'A', 'B', 'C', 'D', 'answer'])
+        for i in range(rows):
+            writer.writerow([f'Câu hỏi số {i}: {i} cộng 1 bằng bao nhiêu?',
+                             i + 1, i + 2, i, f'{i}, hoặc "khác"', 'ABCD'[i % 4]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--sessions', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.csv')
+        write_bank(path, args.rows)
+        print(f'{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB on disk')
+        print(f'{"loader":<8} {"load s":>7} {"held MB":>8} {"session us":>11}')
+        for loader in LOADERS:
+            gc.collect()
+            started = time.perf_counter()
+            bank = open_question_bank(path, loader)
+            load_s = time.perf_counter() - started
+            del bank
+            gc.collect()
+            tracemalloc.start()
+            bank = open_question_bank(path, loader)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            started = time.perf_counter()
+            for _ in range(args.sessions):
+                for question_id, perm_id in QuizPlan.new(len(bank), server_config.MAX_QUESTIONS).turns():
+                    bank[question_id].permuted(perm_id)
+            session_us = (time.perf_counter() - started) / args.sessions * 1e6
+            print(f'{loader:<8} {load_s:>7.2f} {held / 1e6:>8.1f} {session_us:>11.1f}')
+            del bank
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Question bank startup: cold CSV parse vs. warm compiled cache vs. mmap.
+
+Writes a synthetic bank of --rows questions to a temporary CSV and times:
+  cold CSV   parse + compile the CSV, then write the .qcache next to it
+  warm cache open the .qcache, reading the file into memory
+  mmap       open the .qcache through mmap
+plus the time to draw one session (QuizPlan over the whole bank and
+MAX_QUESTIONS lookups) from each.
+
+Usage: python benchmarks/bench_question_cache.py [--rows 1000000] [--sessions 2000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_question_bank import write_bank  # noqa: E402
+from config.server_config import server_config  # noqa: E402
+from core.question_bank import _compile_csv  # noqa: E402
+from core.question_cache import load_cached_questions, open_question_cache  # noqa: E402
+from server.quiz_plan import QuizPlan  # noqa: E402
+
+
+def session_us(bank, sessions: int) -> float:
+    started = time.perf_counter()
+    for _ in range(sessions):
+        for question_id, perm_id in QuizPlan.new(len(bank), server_config.MAX_QUESTIONS).turns():
+            bank[question_id].permuted(perm_id)
+    return (time.perf_counter() - started) / sessions * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--sessions', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bank.csv')
+        write_bank(path, args.rows)
+        print(f'{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB CSV')
+        print(f'{"":<11} {"load ms":>9} {"session us":>11}')
+
+        gc.collect()
+        started = time.perf_counter()
+        bank, cached = load_cached_questions(path, _compile_csv)
+        load_ms = (time.perf_counter() - started) * 1e3
+        assert not cached
+        print(f'{"cold CSV":<11} {load_ms:>9.1f} {session_us(bank, args.sessions):>11.1f}')
+        del bank
+        gc.collect()
+        print(f'{"":<11} cache file {os.path.getsize(path + ".qcache") / 1e6:.1f} MB')
+
+        for label, use_mmap in (('warm cache', False), ('mmap', True)):
+            started = time.perf_counter()
+            bank = open_question_cache(path, use_mmap=use_mmap)
+            load_ms = (time.perf_counter() - started) * 1e3
+            assert bank is not None and len(bank) == args.rows
+            print(f'{label:<11} {load_ms:>9.1f} {session_us(bank, args.sessions):>11.1f}')
+            bank.close()
+
+
+if __name__ == '__main__':
+    main()
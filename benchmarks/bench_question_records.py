@@ -0,0 +1,66 @@
+"""Memory per question: row dicts vs. compiled records, at several bank sizes.
+
+Writes a synthetic bank for each --rows size and loads it three ways:
+  dicts           load_questions(): one six-key dict per row
+  dicts+compile   compile_questions(load_questions()): the memory loader
+                  before rows were compiled while reading
+  compiled        load_compiled_questions(): CompiledQuestion per row,
+                  no intermediate dicts
+Reports bytes per question held after loading and at the loading peak
+(tracemalloc), plus load time without tracing.
+
+Usage: python benchmarks/bench_question_records.py [--rows 10000,100000,1000000]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_question_bank import write_bank  # noqa: E402
+from core.shared_logic import compile_questions, load_compiled_questions, load_questions  # noqa: E402
+
+LOADS = (
+    ('dicts', load_questions),
+    ('dicts+compile', lambda path: compile_questions(load_questions(path))),
+    ('compiled', load_compiled_questions),
+)
+
+
+def measure(load, path: str) -> tuple:
+    with contextlib.redirect_stdout(io.StringIO()):
+        gc.collect()
+        started = time.perf_counter()
+        questions = load(path)
+        load_s = time.perf_counter() - started
+        del questions
+        gc.collect()
+        tracemalloc.start()
+        questions = load(path)
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(questions), held, peak, load_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    args = parser.parse_args()
+    print(f'{"rows":>8} {"records":<14} {"held B/q":>9} {"peak B/q":>9} {"load s":>7}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in map(int, args.rows.split(',')):
+            path = os.path.join(tmp, f'bank{rows}.csv')
+            write_bank(path, rows)
+            for label, load in LOADS:
+                count, held, peak, load_s = measure(load, path)
+                print(f'{rows:>8} {label:<14} {held / count:>9.0f} {peak / count:>9.0f} {load_s:>7.2f}')
+
+
+if __name__ == '__main__':
+    main()
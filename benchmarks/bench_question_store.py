@@ -0,0 +1,76 @@
+"""Resident memory per worker process by question loader and bank size.
+
+For each bank size, writes a synthetic CSV, builds its compiled cache
+once, then starts --workers processes per loader. Each opens the bank as
+a server worker would, plays --sessions sessions against it and reports
+its private (RssAnon) and shared file-backed (RssFile) resident memory
+from /proc/self/status, minus what the process held before loading.
+
+Usage: python benchmarks/bench_question_store.py [--rows 10000,100000,1000000] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_question_bank import write_bank  # noqa: E402
+from config.server_config import server_config  # noqa: E402
+from core.question_bank import LOADERS, open_question_bank  # noqa: E402
+from server.quiz_plan import QuizPlan  # noqa: E402
+
+
+def rss_kb() -> dict:
+    with open('/proc/self/status') as f:
+        return {key: int(value.split()[0]) for key, value in
+                (line.split(':', 1) for line in f) if key in ('RssAnon', 'RssFile')}
+
+
+def worker(path: str, loader: str, sessions: int, results) -> None:
+    before = rss_kb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        bank = open_question_bank(path, loader)
+    for _ in range(sessions):
+        for question_id, perm_id in QuizPlan.new(len(bank), server_config.MAX_QUESTIONS).turns():
+            bank[question_id].permuted(perm_id)
+    after = rss_kb()
+    results.put({key: after[key] - before[key] for key in after})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--sessions', type=int, default=1000)
+    args = parser.parse_args()
+    if not os.path.exists('/proc/self/status'):
+        sys.exit('needs /proc/self/status (Linux)')
+
+    ctx = multiprocessing.get_context('spawn')
+    print(f'{"rows":>8} {"loader":<8} {"private MB/worker":>18} {"file-backed MB/worker":>22}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in map(int, args.rows.split(',')):
+            path = os.path.join(tmp, f'bank{rows}.csv')
+            write_bank(path, rows)
+            with contextlib.redirect_stdout(io.StringIO()):
+                open_question_bank(path, 'memory')  # build the .qcache once
+            for loader in LOADERS:
+                results = ctx.Queue()
+                procs = [ctx.Process(target=worker, args=(path, loader, args.sessions, results))
+                         for _ in range(args.workers)]
+                for proc in procs:
+                    proc.start()
+                usage = [results.get() for _ in procs]
+                for proc in procs:
+                    proc.join()
+                anon = sum(u['RssAnon'] for u in usage) / len(usage) / 1024
+                file_backed = sum(u['RssFile'] for u in usage) / len(usage) / 1024
+                print(f'{rows:>8} {loader:<8} {anon:>18.1f} {file_backed:>22.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Startup cost of the server module: headless vs. with tkinter loaded.
+
+Each sample runs in a fresh interpreter that imports server.server (what
+`python -m server.server --headless` pays before accepting) and reports
+import time and peak RSS. The 'tkinter' variant also imports tkinter and
+creates the Tcl interpreter, which is what every start cost before tkinter
+was imported lazily.
+
+Usage: python benchmarks/bench_startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, resource, sys, time
+t0 = time.perf_counter()
+if {with_tk}:
+    import tkinter
+    try:
+        tkinter.Tcl()
+    except Exception:
+        pass
+import server.server
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    'import_ms': elapsed * 1000.0,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'tkinter_loaded': 'tkinter' in sys.modules,
+}}))
+'''
+
+
+def sample(with_tk: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD.format(with_tk=with_tk)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    for label, with_tk in (('headless', False), ('tkinter', True)):
+        try:
+            runs = [sample(with_tk) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f'{label:<10} failed: {e.stderr.strip().splitlines()[-1]}')
+            continue
+        import_ms = statistics.median(r['import_ms'] for r in runs)
+        rss_mb = statistics.median(r['maxrss_kb'] for r in runs) / 1024.0
+        print(f'{label:<10} import {import_ms:7.1f} ms  peak RSS {rss_mb:6.1f} MB  '
+              f'tkinter loaded: {runs[0]["tkinter_loaded"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,23 @@ from typing import Callable, Optional
 
 from config.client_config import client_config
 from core.network_utils import (
+    MessageReader,
     close_socket_safely,
-    create_socket_with_file,
+    create_socket_connection,
+    send_frame as network_send_frame,
     send_line as network_send_line,
 )
+from core.protocol import (
+    NOTICE_DEFAULTS,
+    Answer,
+    Evaluation,
+    Notice,
+    Question,
+    Unknown,
+    parse_client_message,
+    parse_server_message,
+)
+from core.protocol_v2 import NAME_OK_LINE, VERSION_TAG, FrameBuilder, FrameDecoder
 
 
 class ClientNetwork:
@@ -43,17 +56,22 @@ class ClientNetwork:
         >>> client.disconnect()
     """
 
-    def __init__(self, host: str = None, port: int = None):
+    def __init__(self, host: str = None, port: int = None, protocol_version: int = None):
         """Initialize client network handler.
 
         Args:
             host: Server hostname or IP address. Defaults to client_config.DEFAULT_HOST
             port: Server port number. Defaults to client_config.DEFAULT_PORT
+            protocol_version: 2 asks the server for binary frames (core.protocol_v2)
+                at the NAME handshake; servers that decline keep the v1 text
+                protocol. Defaults to client_config.PROTOCOL_VERSION
         """
         self.host = host or client_config.DEFAULT_HOST
         self.port = int(port or client_config.DEFAULT_PORT)
+        self.protocol_version = int(protocol_version or client_config.PROTOCOL_VERSION)
         self.sock = None
         self._sockfile = None
+        self._v2 = False  # True once the server accepted protocol v2
         self.running = False
         self.receiver_thread = None
 
@@ -73,6 +91,8 @@ class ClientNetwork:
         self.on_game_started: Optional[Callable] = None
         self.on_game_paused: Optional[Callable] = None
 
+        self._dispatch = {verb: getattr(self, name) for verb, name in self._HANDLERS.items()}
+
     def _log(self, text: str):
         """Internal logging method that calls on_log callback if set.
 
@@ -110,11 +130,41 @@ class ClientNetwork:
                     print(f"[SEND] ANSWER qidx={qdisp}, answer={ans}")
 
             if self.sock:
-                if not network_send_line(self.sock, line):
+                if self._v2:
+                    sent = network_send_frame(self.sock, self._encode_v2(line))
+                else:
+                    if self.protocol_version >= 2 and line.startswith('NAME|'):
+                        line = f'{line}|{VERSION_TAG}'
+                    sent = network_send_line(self.sock, line)
+                if not sent:
                     self._log("Failed to send message to server")
         except Exception:
             self._log("Error sending to server:\n" + traceback.format_exc())
 
+    @staticmethod
+    def _encode_v2(line: str) -> bytes:
+        """Encode an outgoing text line as a v2 frame."""
+        message = parse_client_message(line)
+        if isinstance(message, Answer) and message.qidx.isdigit():
+            return FrameBuilder.answer_frame(message.qidx, message.letter)
+        return FrameBuilder.text_frame(line)
+
+    def _open(self, timeout: float):
+        """Connect and wrap the socket in a message reader.
+
+        Returns:
+            Tuple of (socket, MessageReader), or (None, None) on failure.
+        """
+        sock = create_socket_connection(self.host, self.port, timeout)
+        if sock is None:
+            return None, None
+        reader = MessageReader(sock, parse_server_message)
+        if self.protocol_version >= 2:
+            # v2 frames may follow NAME_OK|2 in the same read
+            reader.stop_after(NAME_OK_LINE.__eq__)
+        self._v2 = False
+        return sock, reader
+
     def connect(self):
         """Connect to server and start receiver thread.
 
@@ -124,11 +174,7 @@ class ClientNetwork:
         if self.running:
             return True
 
-        self.sock, self._sockfile = create_socket_with_file(
-            self.host,
-            self.port,
-            timeout=5
-        )
+        self.sock, self._sockfile = self._open(timeout=5)
 
         if self.sock is None or self._sockfile is None:
             self._log(f'Failed to connect to {self.host}:{self.port}')
@@ -157,11 +203,7 @@ class ClientNetwork:
         if self.running:
             return True
 
-        self.sock, self._sockfile = create_socket_with_file(
-            self.host,
-            self.port,
-            timeout=float(timeout)
-        )
+        self.sock, self._sockfile = self._open(timeout=float(timeout))
 
         if self.sock is None or self._sockfile is None:
             self._log(f'Failed to connect to {self.host}:{self.port}')
@@ -180,6 +222,7 @@ class ClientNetwork:
         close_socket_safely(self.sock)
         self.sock = None
         self._sockfile = None
+        self._v2 = False
 
     def _safe_callback(self, callback: Optional[Callable], *args, **kwargs):
         """Safely invoke callback, suppressing exceptions.
@@ -195,196 +238,175 @@ class ClientNetwork:
             except Exception:
                 pass
 
-    def _handle_server_paused(self, line: str) -> bool:
+    def _handle_server_paused(self, message: Notice) -> bool:
         """Handle SERVER_PAUSED message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
 
         Returns:
             bool: True to break receiver loop, False to continue
         """
-        msg = line.split('|', 1)[1] if '|' in line else 'Server đang tạm ngưng, vui lòng đợi...'
-        self._safe_callback(self.on_server_paused, msg)
+        self._safe_callback(self.on_server_paused, message.payload)
         if not self.on_server_paused:
-            self._log(f'SERVER: {msg}')
+            self._log(f'SERVER: {message.payload}')
         return True
 
-    def _handle_game_started(self, line: str) -> bool:
+    def _handle_game_started(self, message: Notice) -> bool:
         """Handle GAME_STARTED message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
 
         Returns:
             bool: True to break receiver loop, False to continue
         """
-        msg = line.split('|', 1)[1] if '|' in line else 'Game đã bắt đầu, không thể tham gia.'
-        self._safe_callback(self.on_game_started, msg)
+        self._safe_callback(self.on_game_started, message.payload)
         if not self.on_game_started:
-            self._log(f'SERVER: {msg}')
+            self._log(f'SERVER: {message.payload}')
         return True
 
-    def _handle_error(self, line: str) -> bool:
+    def _handle_error(self, message: Notice) -> bool:
         """Handle ERROR message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
 
         Returns:
             bool: True to break receiver loop, False to continue
         """
-        msg = line.split('|', 1)[1] if '|' in line else ''
-        self._safe_callback(self.on_error, msg)
+        self._safe_callback(self.on_error, message.payload)
         return True
 
-    def _handle_simple_message(self, message_type: str):
+    # Simple messages: verb -> (callback attribute, log line when no callback)
+    _SIMPLE_MESSAGES = {
+        'NAME_OK': ('on_name_ok', None),
+        'NAME_TAKEN': ('on_name_taken', None),
+        'WAIT': ('on_wait', 'SERVER: WAIT'),
+        'START': ('on_start', 'SERVER: START'),
+    }
+
+    def _handle_simple_message(self, message: Notice) -> bool:
         """Handle simple messages like NAME_OK, NAME_TAKEN, WAIT, START.
 
         Args:
-            message_type: Type of simple message (NAME_OK, NAME_TAKEN, WAIT, START)
+            message: Parsed message from server
+        """
+        attr, fallback_msg = self._SIMPLE_MESSAGES[message.verb]
+        callback = getattr(self, attr)
+        self._safe_callback(callback)
+        if not callback and fallback_msg:
+            self._log(fallback_msg)
+        return False
+
+    def _handle_name_ok(self, message: Notice) -> bool:
+        """Handle NAME_OK; NAME_OK|2 switches this connection to protocol v2.
+
+        Args:
+            message: Parsed message from server
         """
-        callbacks = {
-            'NAME_OK': self.on_name_ok,
-            'NAME_TAKEN': self.on_name_taken,
-            'WAIT': (self.on_wait, 'SERVER: WAIT'),
-            'START': (self.on_start, 'SERVER: START')
-        }
-
-        callback_info = callbacks.get(message_type)
-        if isinstance(callback_info, tuple):
-            callback, fallback_msg = callback_info
-            self._safe_callback(callback)
-            if not callback:
-                self._log(fallback_msg)
-        else:
-            self._safe_callback(callback_info)
-
-    def _handle_game_paused(self, line: str):
+        if message.payload == '2' and self.protocol_version >= 2:
+            self._sockfile.stop_after(None)
+            self._sockfile.switch_decoder(FrameDecoder(parse_server_message))
+            self._v2 = True
+            self._log('Protocol v2 (binary frames) negotiated')
+        return self._handle_simple_message(message)
+
+    def _handle_game_paused(self, message: Notice) -> bool:
         """Handle STOP or GAME_PAUSED message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
         """
-        msg = line.split('|', 1)[1] if '|' in line else 'Game đã tạm dừng.'
+        msg = message.payload or NOTICE_DEFAULTS['GAME_PAUSED']
         self._safe_callback(self.on_game_paused, msg)
         if not self.on_game_paused:
             self._log(f'SERVER: {msg}')
+        return False
 
-    def _parse_question(self, line: str) -> tuple:
-        """Parse QUESTION message.
-
-        Args:
-            line: Raw message line from server
-
-        Returns:
-            tuple: (qidx, qtext, opts) - question index, text, and options list
-        """
-        sep = ':' if line.startswith('QUESTION:') else '|'
-        payload = line.split(sep, 1)[1]
-        parts = payload.split('|')
-
-        qidx, qtext, opts = 0, '', []
-
-        if len(parts) >= 2:
-            raw_qidx = parts[0]
-            qidx = int(raw_qidx) if raw_qidx.isdigit() else raw_qidx
-            qtext = parts[1]
-
-            if len(parts) >= 3:
-                if ',' in parts[2] and len(parts) == 3:
-                    opts = [o.strip() for o in parts[2].split(',') if o.strip()]
-                else:
-                    opts = [p.strip() for p in parts[2:]]
-
-        return qidx, qtext, opts
-
-    def _handle_question(self, line: str):
+    def _handle_question(self, message: Question) -> bool:
         """Handle QUESTION message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
         """
-        qidx, qtext, opts = self._parse_question(line)
         try:
-            print(f"[RECV] QUESTION qidx={qidx}, question={qtext}")
+            print(f"[RECV] QUESTION qidx={message.qidx}, question={message.text}")
         except Exception:
             pass
-        self._safe_callback(self.on_question, qidx, qtext, opts)
+        self._safe_callback(self.on_question, message.qidx, message.text, message.options)
+        return False
 
-    def _handle_leaderboard(self, line: str):
+    def _handle_leaderboard(self, message: Notice) -> bool:
         """Handle LEADERBOARD message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
         """
-        payload = line.split('|', 1)[1]
-        self._safe_callback(self.on_leaderboard, payload)
+        self._safe_callback(self.on_leaderboard, message.payload)
+        return False
 
-    def _handle_score(self, line: str):
+    def _handle_score(self, message: Notice) -> bool:
         """Handle SCORE message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
         """
-        payload = line.split('|', 1)[1] if '|' in line else ''
-        self._safe_callback(self.on_score, payload)
+        self._safe_callback(self.on_score, message.payload)
+        return False
 
-    def _handle_eval(self, line: str):
+    def _handle_eval(self, message: Evaluation) -> bool:
         """Handle EVAL message.
 
         Args:
-            line: Raw message line from server
+            message: Parsed message from server
         """
-        parts = line.split('|')
-        if len(parts) >= 3:
-            tag, given = parts[1], parts[2]
-            self._safe_callback(self.on_eval, tag, given)
+        self._safe_callback(self.on_eval, message.tag, message.given)
+        return False
+
+    # verb -> handler name; resolved to bound methods once per client
+    _HANDLERS = {
+        'SERVER_PAUSED': '_handle_server_paused',
+        'GAME_STARTED': '_handle_game_started',
+        'ERROR': '_handle_error',
+        'NAME_OK': '_handle_name_ok',
+        'NAME_TAKEN': '_handle_simple_message',
+        'WAIT': '_handle_simple_message',
+        'START': '_handle_simple_message',
+        'STOP': '_handle_game_paused',
+        'GAME_PAUSED': '_handle_game_paused',
+        'QUESTION': '_handle_question',
+        'LEADERBOARD': '_handle_leaderboard',
+        'SCORE': '_handle_score',
+        'EVAL': '_handle_eval',
+    }
 
     def _process_message(self, line: str) -> bool:
         """Process single message line.
 
+        Parses the line once through core.protocol and dispatches on its
+        verb with a single table lookup.
+
         Args:
             line: Raw message line from server
 
         Returns:
             bool: True if receiver loop should break, False to continue
         """
-        if line.startswith('SERVER_PAUSED|'):
-            return self._handle_server_paused(line)
-
-        if line.startswith('GAME_STARTED|'):
-            return self._handle_game_started(line)
+        return self._handle_message(parse_server_message(line))
 
-        if line.startswith('ERROR|'):
-            return self._handle_error(line)
+    def _handle_message(self, message) -> bool:
+        """Dispatch one typed message (v1 or v2) on its verb.
 
-        if line in ('NAME_OK', 'NAME_TAKEN', 'WAIT', 'START'):
-            self._handle_simple_message(line)
-            return False
-
-        if line == 'STOP' or line.startswith('GAME_PAUSED|'):
-            self._handle_game_paused(line)
-            return False
-
-        if line.startswith('QUESTION:') or line.startswith('QUESTION|'):
-            self._handle_question(line)
-            return False
-
-        if line.startswith('LEADERBOARD|'):
-            self._handle_leaderboard(line)
-            return False
-
-        if line.startswith('SCORE|'):
-            self._handle_score(line)
-            return False
-
-        if line.startswith('EVAL|'):
-            self._handle_eval(line)
+        Returns:
+            bool: True if receiver loop should break, False to continue
+        """
+        handler = self._dispatch.get(message.verb)
+        if handler is None:
+            if isinstance(message, Unknown) and message.line:
+                self._log('SERVER: ' + message.line)
             return False
-
-        self._log('SERVER: ' + line)
-        return False
+        return handler(message)
 
     def _receiver_loop(self):
         """Main receiver loop - reads and dispatches messages.
@@ -394,13 +416,13 @@ class ClientNetwork:
         or a terminal message is received.
         """
         try:
-            for raw in self._sockfile:
-                line = raw.rstrip('\n')
-                if not line:
-                    continue
+            while True:
+                message = self._sockfile.read_message()
+                if message is None:
+                    break
 
                 try:
-                    should_break = self._process_message(line)
+                    should_break = self._handle_message(message)
                     if should_break:
                         break
                 except Exception:
@@ -12,6 +12,9 @@ class ClientConfig:
     CONNECTION_TIMEOUT = 5.0  # seconds
     RECONNECT_INTERVAL = 1.5  # seconds
     MAX_RECONNECT_ATTEMPTS = 10
+    MAX_LINE_LENGTH = 65536  # bytes; longer protocol lines are rejected
+    RECV_CHUNK_SIZE = 65536  # bytes requested per recv() by line readers
+    PROTOCOL_VERSION = int(os.getenv('QUIZ_PROTOCOL', 1))  # 2 asks the server for binary frames
     
     # UI settings
     WINDOW_WIDTH = 800
@@ -7,15 +7,44 @@ class ServerConfig:
     # Network settings
     HOST = os.getenv('QUIZ_HOST', '127.0.0.1')
     PORT = int(os.getenv('QUIZ_PORT', 65432))
-    
+    LISTEN_BACKLOG = 1024
+
+    # Connection engine: 'thread' (one thread per client) or 'asyncio'
+    ENGINE = os.getenv('QUIZ_ENGINE', 'thread')
+    MAX_LINE_LENGTH = 4096  # bytes buffered per connection for one protocol line
+    PROTOCOL_V2 = os.getenv('QUIZ_PROTOCOL_V2', '1') == '1'  # accept clients asking for binary frames
+
+    # Headless: no Tk dashboard or popups; the game is driven from the console
+    HEADLESS = os.getenv('QUIZ_HEADLESS', '0') == '1'
+    ADMIN_SOCKET_PATH = os.getenv('QUIZ_ADMIN_SOCKET', '/tmp/quiz-server.sock')  # JSON admin API (Unix socket)
+
+    # Prometheus-style /metrics over HTTP; port 0 disables the endpoint
+    METRICS_HOST = os.getenv('QUIZ_METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('QUIZ_METRICS_PORT', 0))
+
+    # Outbound queues: each connection owns a bounded queue drained by its writer
+    OUTBOUND_QUEUE_SIZE = 256  # pending messages per client
+    OUTBOUND_OVERFLOW_POLICY = os.getenv('QUIZ_OVERFLOW_POLICY', 'disconnect')  # 'disconnect' or 'drop'
+    OUTBOUND_FLUSH_TIMEOUT = 2.0  # seconds to flush pending messages on close
+    OUTBOUND_COALESCE = os.getenv('QUIZ_COALESCE', '1') == '1'  # batch queued frames into one vectored write
+
     # Game settings
     QUESTIONS_PATH = 'data/questions.csv'
-    MAX_QUESTIONS = 10
+    QUESTION_LOADER = os.getenv('QUIZ_QUESTION_LOADER', 'memory')  # 'memory', 'indexed' (row offsets only) or 'mmap'
+    QUESTION_CACHE = os.getenv('QUIZ_QUESTION_CACHE', '1') == '1'  # reuse <bank>.qcache while the CSV is unchanged
+    QUESTION_RELOAD_INTERVAL = float(os.getenv('QUIZ_RELOAD_INTERVAL', 2.0))  # seconds between bank file checks; 0 disables
+    MAX_QUESTIONS = 10  # questions per player, sampled from the whole bank
+    GAME_FILTER = os.getenv('QUIZ_GAME_FILTER', '')  # e.g. "category=geography, difficulty<=2"; '' = whole bank
+    QUESTION_SELECTION = os.getenv('QUIZ_SELECTION', 'random')  # 'random' or 'adaptive' (Elo-rated questions)
+    RATINGS_PATH = os.getenv('QUIZ_RATINGS_PATH', 'data/ratings.json')  # adaptive player / question ratings
+    RATINGS_SAVE_INTERVAL = 5.0  # seconds between rating saves
     
     # Protocol timing
     WAIT_SIGNAL_INTERVAL = 2.0  # seconds between WAIT signals
     ACCEPT_TIMEOUT = 1.0  # seconds for accept() timeout
     QUESTION_TIMEOUT = 180.0  # 3 minutes total timeout for answering each question
+    TIMER_TICK = 0.1  # seconds per timer wheel tick (deadline resolution)
+    TIMER_SLOTS = 512  # timer wheel slots (one revolution = TICK * SLOTS seconds)
     
     # Protocol messages
     MSG_NAME_OK = 'NAME_OK'
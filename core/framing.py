@@ -0,0 +1,111 @@
+from typing import Any, Callable, List, Optional
+
+from config.client_config import client_config
+
+MAX_LINE_LENGTH = client_config.MAX_LINE_LENGTH
+
+
+class FrameTooLongError(ValueError):
+    """A line exceeded the framer's max_line_length."""
+
+
+class LineFramer:
+    """Incremental line splitter shared by every transport.
+    
+    Bytes arrive in arbitrary pieces (recv chunks, asyncio reads, selector
+    callbacks); feed() returns the lines they complete, decoded and without
+    their LF / CRLF terminator. Incomplete data stays buffered for the next
+    call. A line longer than max_line_length raises FrameTooLongError, and
+    the framer should be discarded with its connection.
+    
+    Example:
+        >>> framer = LineFramer()
+        >>> framer.feed(b'NAME|An\\r\\nANS')
+        ['NAME|An']
+        >>> framer.feed(b'WER:0|B\\n')
+        ['ANSWER:0|B']
+    """
+    
+    def __init__(self, max_line_length: int = None, encoding: str = 'utf-8') -> None:
+        self.max_line_length = max_line_length or MAX_LINE_LENGTH
+        self.encoding = encoding
+        self._buf = bytearray()
+        self._scan = 0  # bytes already searched for a newline
+        # Optional line predicate: splitting stops after a matching line and
+        # the rest stays buffered for detach() (protocol switch at handshake)
+        self.stop_after: Optional[Callable[[str], bool]] = None
+    
+    def _split(self, data) -> List[str]:
+        buf = self._buf
+        buf += data
+        lines: List[str] = []
+        start = 0
+        newline = buf.find(b'\n', self._scan)
+        if newline >= 0:
+            with memoryview(buf) as view:
+                while newline >= 0:
+                    end = newline - 1 if newline > start and buf[newline - 1] == 13 else newline
+                    if end - start > self.max_line_length:
+                        raise FrameTooLongError(f'line exceeds {self.max_line_length} bytes')
+                    line = str(view[start:end], self.encoding, 'replace')
+                    lines.append(line)
+                    start = newline + 1
+                    if self.stop_after is not None and self.stop_after(line):
+                        break
+                    newline = buf.find(b'\n', start)
+            del buf[:start]
+            if newline >= 0:
+                self._scan = 0  # stopped: the rest is left for detach()
+                return lines
+        self._scan = len(buf)
+        if self._scan > self.max_line_length + 1:
+            raise FrameTooLongError(f'line exceeds {self.max_line_length} bytes')
+        return lines
+    
+    def feed(self, data) -> List[Any]:
+        """Add received bytes; return the complete lines they finish."""
+        return self._split(data)
+    
+    def flush(self) -> Optional[Any]:
+        """At EOF: return the unterminated last line, if any, and reset."""
+        if not self._buf:
+            return None
+        line = self._buf.decode(self.encoding, 'replace').rstrip('\r')
+        self._buf.clear()
+        self._scan = 0
+        return line
+    
+    def detach(self) -> bytes:
+        """Return and clear the bytes not yet split into lines."""
+        data = bytes(self._buf)
+        self._buf.clear()
+        self._scan = 0
+        return data
+    
+    @property
+    def buffered(self) -> int:
+        """Bytes held waiting for a newline."""
+        return len(self._buf)
+
+
+class MessageDecoder(LineFramer):
+    """LineFramer that parses each line into a typed message.
+    
+    Args:
+        parse: Line parser from core.protocol, e.g. parse_client_message
+        max_line_length: Longest accepted line in bytes
+    """
+    
+    def __init__(self, parse: Callable[[str], Any], max_line_length: int = None,
+                 encoding: str = 'utf-8') -> None:
+        super().__init__(max_line_length, encoding)
+        self.parse = parse
+    
+    def feed(self, data) -> List[Any]:
+        """Add received bytes; return the messages they complete."""
+        parse = self.parse
+        return [parse(line) for line in self._split(data)]
+    
+    def flush(self) -> Optional[Any]:
+        line = super().flush()
+        return None if line is None else self.parse(line)
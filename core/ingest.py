@@ -0,0 +1,314 @@
+"""Merge many question files (CSV or JSONL) into one bank.
+
+Files are parsed in parallel by a process pool, compiled with the same
+column rules as load_compiled_questions(), deduplicated by content and
+written out as one CSV the server can load (and hot-reload):
+
+    python -m core.ingest data/banks/ -o data/questions.csv
+
+JSONL files hold one object per line with the CSV column names as keys
+("question", "A"-"D", "answer", optional "category" / "difficulty").
+
+With --near-duplicates, paraphrased copies that survive exact
+deduplication are clustered too (see core.near_dup) and only the first
+question of each cluster is written.
+"""
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from core import near_dup
+from core.shared_logic import LETTERS, CompiledQuestion, column_candidates, resolve_path, row_compiler
+
+SUFFIXES = ('.csv', '.jsonl')
+MAX_FILE_ERRORS = 10  # error messages kept per file; the rest are only counted
+CSV_HEADER = ('question', *LETTERS, 'answer', 'category', 'difficulty')
+
+
+class FileReport(NamedTuple):
+    """What one input file contributed to the merged bank."""
+    path: str
+    rows: int  # data rows read, including rows without question text
+    parsed: int  # questions compiled from those rows
+    questions: List[CompiledQuestion]  # emptied by ingest() once merged
+    keys: List[bytes]  # content_key() per question, computed by the parser process; [] if not deduping
+    errors: Tuple[str, ...]  # first MAX_FILE_ERRORS messages
+    error_count: int
+    size: int  # bytes
+    seconds: float  # parse time, in the worker
+
+    def summary(self) -> str:
+        rate = self.rows / self.seconds if self.seconds else 0.0
+        mb_rate = self.size / self.seconds / 1e6 if self.seconds else 0.0
+        return (f'{self.path}: {self.rows} rows, {self.parsed} questions, '
+                f'{self.error_count} errors, {rate:,.0f} rows/s ({mb_rate:.1f} MB/s)')
+
+
+class IngestResult(NamedTuple):
+    questions: List[CompiledQuestion]
+    files: List[FileReport]
+    duplicates: int
+    seconds: float  # wall time, parsing and merging
+
+    def report_lines(self) -> List[str]:
+        lines = [report.summary() for report in self.files]
+        for report in self.files:
+            lines.extend(f'  {report.path}: {error}' for error in report.errors)
+            if report.error_count > len(report.errors):
+                lines.append(f'  {report.path}: ... {report.error_count - len(report.errors)} more errors')
+        rows = sum(report.rows for report in self.files)
+        size = sum(report.size for report in self.files)
+        errors = sum(report.error_count for report in self.files)
+        rate = rows / self.seconds if self.seconds else 0.0
+        lines.append(f'{len(self.files)} files, {rows} rows, {errors} errors, {self.duplicates} duplicates '
+                     f'-> {len(self.questions)} questions in {self.seconds:.2f} s '
+                     f'({rate:,.0f} rows/s, {size / max(self.seconds, 1e-9) / 1e6:.1f} MB/s)')
+        return lines
+
+
+class _Errors:
+    def __init__(self) -> None:
+        self.messages: List[str] = []
+        self.count = 0
+
+    def add(self, message: str) -> None:
+        self.count += 1
+        if len(self.messages) < MAX_FILE_ERRORS:
+            self.messages.append(message)
+
+
+def _parse_csv(f, errors: _Errors) -> Tuple[int, List[CompiledQuestion]]:
+    reader = csv.reader(f)
+    try:
+        header = next(reader, None) or []
+    except csv.Error as e:
+        errors.add(f'header: {e}')
+        return 0, []
+    if not column_candidates(header, 'question'):
+        errors.add('no "question" column in the header')
+        return 0, []
+    compile_row = row_compiler(header)
+    rows = 0
+    questions: List[CompiledQuestion] = []
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            errors.add(f'line {reader.line_num}: {e}')
+            continue
+        rows += 1
+        question = compile_row(values)
+        if question is not None:
+            questions.append(question)
+    return rows, questions
+
+
+def _parse_jsonl(f, errors: _Errors) -> Tuple[int, List[CompiledQuestion]]:
+    compilers: Dict[Tuple[str, ...], Callable] = {}  # one per distinct key order
+    rows = 0
+    questions: List[CompiledQuestion] = []
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        rows += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.add(f'line {line_number}: {e}')
+            continue
+        if not isinstance(record, dict):
+            errors.add(f'line {line_number}: expected an object, got {type(record).__name__}')
+            continue
+        keys = tuple(record)
+        compile_row = compilers.get(keys)
+        if compile_row is None:
+            compile_row = compilers[keys] = row_compiler(keys)
+        question = compile_row(['' if value is None else str(value) for value in record.values()])
+        if question is not None:
+            questions.append(question)
+    return rows, questions
+
+
+def parse_file(path: str, keys: bool = True) -> FileReport:
+    """Parse one question file; errors are reported, never raised.
+
+    Args:
+        path: CSV or JSONL (by suffix) file
+        keys: Also compute each question's content_key(), so deduplication
+            costs the merging process only set lookups
+    """
+    started = time.perf_counter()
+    errors = _Errors()
+    rows, questions, size = 0, [], 0
+    parse = _parse_jsonl if path.lower().endswith('.jsonl') else _parse_csv
+    try:
+        size = os.path.getsize(path)
+        # utf-8-sig, like core.shared_logic: a leading BOM is dropped
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            rows, questions = parse(f, errors)
+    except (OSError, UnicodeDecodeError) as e:
+        errors.add(f'cannot read: {e}')
+    return FileReport(path, rows, len(questions), questions, [content_key(q) for q in questions] if keys else [],
+                      tuple(errors.messages), errors.count, size, time.perf_counter() - started)
+
+
+def _parse_in_pool(path: str, keys: bool) -> FileReport:
+    report = parse_file(path, keys)
+    # Plain tuples pickle about 2.5x faster than CompiledQuestion
+    return report._replace(questions=[tuple(question) for question in report.questions])
+
+
+def expand_paths(paths: Iterable[str]) -> List[str]:
+    """Files to ingest: given files as-is, directories as their *.csv / *.jsonl files (sorted)."""
+    files: List[str] = []
+    for name in paths:
+        path = resolve_path(name)
+        if path.is_dir():
+            files.extend(str(child) for child in sorted(path.rglob('*'))
+                         if child.suffix.lower() in SUFFIXES and child.is_file())
+        else:
+            files.append(str(path))
+    return files
+
+
+def content_key(question: CompiledQuestion) -> bytes:
+    """Hash of what makes two questions the same, whatever the file, case,
+    spacing or option order."""
+    options = question.options
+    # Fields are already stripped, so one casefold and whitespace collapse
+    # over the joined fields normalises each of them
+    joined = '\0'.join([question.text, options[question.correct], *sorted(options, key=str.casefold)])
+    return hashlib.blake2b(' '.join(joined.casefold().split()).encode('utf-8'), digest_size=16).digest()
+
+
+def merge(reports: Sequence[FileReport], dedupe: bool = True) -> Tuple[List[CompiledQuestion], int]:
+    """Concatenate the files' questions in order, keeping the first copy of each.
+
+    Returns:
+        (questions, number of duplicates dropped)
+    """
+    seen = set()
+    questions: List[CompiledQuestion] = []
+    duplicates = 0
+    for report in reports:
+        # Questions from pool workers arrive as plain tuples
+        compiled = list(map(CompiledQuestion._make, report.questions))
+        if not dedupe:
+            questions.extend(compiled)
+            continue
+        for question, key in zip(compiled, report.keys or map(content_key, compiled)):
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            questions.append(question)
+    return questions, duplicates
+
+
+def ingest(paths: Iterable[str], workers: Optional[int] = None, dedupe: bool = True) -> IngestResult:
+    """Parse every file under `paths` in parallel and merge them into one bank.
+
+    Args:
+        paths: Files and/or directories (searched for *.csv and *.jsonl)
+        workers: Parser processes; None for one per CPU, 1 to parse in this process
+        dedupe: Drop questions whose content_key() was already seen
+    """
+    started = time.perf_counter()
+    files = expand_paths(paths)
+    workers = min(workers or os.cpu_count() or 1, len(files) or 1)
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(_parse_in_pool, files, itertools.repeat(dedupe)))
+    else:
+        reports = [parse_file(path, dedupe) for path in files]
+    questions, duplicates = merge(reports, dedupe)
+    reports = [report._replace(questions=[], keys=[]) for report in reports]
+    return IngestResult(questions, reports, duplicates, time.perf_counter() - started)
+
+
+def write_questions_csv(path: str, questions: Sequence[CompiledQuestion]) -> Path:
+    """Write a bank as CSV, replacing `path` atomically so a watching server
+    never reloads a half-written file."""
+    target = resolve_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=target.name, dir=target.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows((q.text, *q.options, LETTERS[q.correct], q.category, q.difficulty or '')
+                             for q in questions)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return target
+
+
+def write_cluster_report(path: str, questions: Sequence[CompiledQuestion],
+                         found: near_dup.NearDupResult) -> Path:
+    """One JSON line per near-duplicate cluster: the kept question, then the dropped ones."""
+    target = resolve_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        for cluster in found.clusters:
+            kept, *dropped = (questions[i] for i in cluster)
+            f.write(json.dumps({'kept': kept.text, 'answer': kept.options[kept.correct],
+                                'dropped': [question.text for question in dropped]},
+                               ensure_ascii=False) + '\n')
+    return target
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Merge question files (CSV / JSONL) into one bank')
+    parser.add_argument('paths', nargs='+', metavar='PATH', help='Question files or directories')
+    parser.add_argument('-o', '--output', help='Write the merged bank to this CSV (default: only report)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parser processes (default: one per CPU)')
+    parser.add_argument('--keep-duplicates', dest='dedupe', action='store_false',
+                        help='Keep every copy of a question found in several files')
+    parser.add_argument('--near-duplicates', type=float, nargs='?', const=near_dup.DEFAULT_THRESHOLD,
+                        default=None, metavar='THRESHOLD',
+                        help='Also drop paraphrased questions with the same answer whose text is at least '
+                             f'THRESHOLD similar (Jaccard, default {near_dup.DEFAULT_THRESHOLD})')
+    parser.add_argument('--near-dup-report', metavar='PATH',
+                        help='Write every near-duplicate cluster to this JSONL file')
+    args = parser.parse_args(argv)
+    if args.near_dup_report and args.near_duplicates is None:
+        args.near_duplicates = near_dup.DEFAULT_THRESHOLD
+
+    result = ingest(args.paths, args.workers, args.dedupe)
+    for line in result.report_lines():
+        print(line)
+    if not result.files:
+        print('No question files found', file=sys.stderr)
+        sys.exit(1)
+    questions = result.questions
+    if args.near_duplicates is not None:
+        found = near_dup.find_near_duplicates(questions, args.near_duplicates)
+        for line in found.report_lines(questions):
+            print(line)
+        if args.near_dup_report:
+            print(f'Wrote {len(found.clusters)} clusters to '
+                  f'{write_cluster_report(args.near_dup_report, questions, found)}')
+        questions = found.keep(questions)
+    if args.output:
+        if not questions:
+            print(f'No questions parsed; {args.output} left unchanged', file=sys.stderr)
+            sys.exit(1)
+        print(f'Wrote {len(questions)} questions to {write_questions_csv(args.output, questions)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Near-duplicate questions: MinHash signatures and LSH banding.
+
+Question text is normalised for Vietnamese (case, diacritics, đ, punctuation
+and spacing) and cut into character shingles. Each question gets a
+one-permutation MinHash signature: every shingle is hashed once and kept
+as the minimum of one of SIGNATURE_SIZE bins, so signing costs O(shingles)
+rather than O(shingles x hash functions). Signatures are split into BANDS
+bands of ROWS values. Questions sharing a band, the same correct answer
+and the same numbers in their text ("năm 1945" is not "năm 1954") are
+candidates, checked with the exact Jaccard similarity of their
+shingle sets, and merged into clusters with union-find.
+
+Each band is bucketed in one pass over the bank and a question is only
+compared with the last BUCKET_WINDOW members of its bucket, so the work
+stays near-linear even when thousands of templated questions share a bucket.
+
+Every hash is stable (blake2b, then hashes of int tuples, which unlike
+str hashes are not salted per process), so the same bank always gives
+the same clusters, whatever PYTHONHASHSEED is.
+"""
+import functools
+import hashlib
+import re
+import time
+import unicodedata
+from array import array
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from core.shared_logic import CompiledQuestion
+
+SHINGLE_SIZE = 3  # characters per shingle
+BANDS = 16
+ROWS = 3  # signature values per band; a pair sharing a band is a candidate
+SIGNATURE_SIZE = BANDS * ROWS
+# P(candidate) = 1 - (1 - J**ROWS)**BANDS: about 0.88 at Jaccard 0.5, 0.98 at 0.6
+DEFAULT_THRESHOLD = 0.6  # 0.5 already joins different questions sharing an answer ("Hamlet" / "Romeo và Juliet")
+BUCKET_WINDOW = 32  # earlier bucket members each question is compared with
+_MAX_REJECTED = 1 << 20  # dissimilar pairs remembered so other bands skip them
+
+_MASK64 = (1 << 64) - 1
+_MASK32 = (1 << 32) - 1
+_EMPTY = _MASK64  # bin without a shingle, before densification
+_BORROWED = 1 << 64  # keeps borrowed values apart from any real minimum
+_MARKS = re.compile('[\u0300-\u036f]')  # combining diacritics after NFD
+_NON_WORD = re.compile(r'[\W_]+')
+_NUMBER = re.compile(r'\d+')
+
+
+def normalize_text(text: str) -> str:
+    """Vietnamese-insensitive form: "2 + 2 BẰNG bao nhiêu?" -> "2 2 bang bao nhieu"."""
+    text = unicodedata.normalize('NFD', text.casefold()).replace('đ', 'd')
+    return ' '.join(_NON_WORD.sub(' ', _MARKS.sub('', text)).split())
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Character shingles of the normalised text (the whole text if shorter)."""
+    text = normalize_text(text)
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+
+@functools.lru_cache(maxsize=1 << 18)  # shingles repeat across a bank: a few tens of thousands
+def _shingle_hash(item: str) -> int:
+    return int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _fact_hash(fact: Tuple[str, ...]) -> int:
+    return int.from_bytes(hashlib.blake2b('\0'.join(fact).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def minhash(items: FrozenSet[str]) -> List[int]:
+    """One-permutation MinHash of a non-empty set, densified by rotation.
+
+    Empty bins borrow the next filled bin's value (circularly), offset by
+    the distance, so two sets agree on a bin with probability close to
+    their Jaccard similarity even when they have few shingles.
+    """
+    signature = [_EMPTY] * SIGNATURE_SIZE
+    for item in items:
+        h = _shingle_hash(item)
+        slot, value = h % SIGNATURE_SIZE, h // SIGNATURE_SIZE
+        if value < signature[slot]:
+            signature[slot] = value
+    if _EMPTY in signature:
+        filled = [value != _EMPTY for value in signature]
+        source = filled.index(True) + SIGNATURE_SIZE  # nearest filled bin to the right, circularly
+        for i in range(SIGNATURE_SIZE - 1, -1, -1):
+            if filled[i]:
+                source = i
+            else:
+                distance = source - i
+                signature[i] = signature[source % SIGNATURE_SIZE] + distance * _BORROWED
+    return signature
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class NearDupResult(NamedTuple):
+    clusters: List[List[int]]  # bank indexes, first (kept) question first; only clusters of 2+
+    compared: int  # candidate pairs whose shingles were compared
+    threshold: float
+    seconds: float
+
+    def duplicate_ids(self) -> Set[int]:
+        """Every clustered question except the first of its cluster."""
+        return {question_id for cluster in self.clusters for question_id in cluster[1:]}
+
+    def keep(self, questions: Sequence[CompiledQuestion]) -> List[CompiledQuestion]:
+        """The bank without near-duplicates, in its original order."""
+        dropped = self.duplicate_ids()
+        return [question for i, question in enumerate(questions) if i not in dropped]
+
+    def report_lines(self, questions: Sequence[CompiledQuestion], limit: int = 10) -> List[str]:
+        lines = [f'{len(self.clusters)} near-duplicate clusters (Jaccard >= {self.threshold:.2f}), '
+                 f'{len(self.duplicate_ids())} questions to drop; {self.compared} pairs compared '
+                 f'in {self.seconds:.2f} s']
+        for cluster in sorted(self.clusters, key=len, reverse=True)[:limit]:
+            lines.append(f'  {len(cluster)} x {questions[cluster[0]].text!r}')
+            lines.extend(f'      ~ {questions[i].text!r}' for i in cluster[1:4])
+            if len(cluster) > 4:
+                lines.append(f'      ... {len(cluster) - 4} more')
+        return lines
+
+
+def find_near_duplicates(questions: Sequence[CompiledQuestion], threshold: float = DEFAULT_THRESHOLD,
+                         progress: Optional[Callable[[str], None]] = None) -> NearDupResult:
+    """Cluster questions whose text is at least `threshold` similar, with
+    the same numbers in it, and whose correct answers match after
+    normalisation.
+
+    Args:
+        questions: The bank, e.g. after exact deduplication in core.ingest
+        threshold: Minimum Jaccard similarity of the shingle sets
+        progress: Called with a status line after each phase
+    """
+    started = time.perf_counter()
+    count = len(questions)
+    band_keys = array('I')  # BANDS per question: hash of (answer and numbers, band values)
+    facts: List[Tuple[str, ...]] = []  # what must match exactly: answer, then the distinct numbers in the text
+    for question in questions:
+        fact = (normalize_text(question.options[question.correct]), *sorted(set(_NUMBER.findall(question.text))))
+        facts.append(fact)
+        items = shingles(question.text)
+        if not items:
+            band_keys.extend([0] * BANDS)  # 0 is skipped below
+            continue
+        signature = minhash(items)
+        fact_hash = _fact_hash(fact)
+        for band in range(BANDS):
+            key = hash((fact_hash, *signature[band * ROWS:(band + 1) * ROWS])) & _MASK32
+            band_keys.append(key or 1)
+    if progress:
+        progress(f'Signed {count} questions in {time.perf_counter() - started:.1f} s')
+
+    parent = array('i', range(count))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    cache: Dict[int, FrozenSet[str]] = {}
+
+    def shingles_of(i: int) -> FrozenSet[str]:
+        items = cache.get(i)
+        if items is None:
+            if len(cache) >= 100000:
+                cache.clear()
+            items = cache[i] = shingles(questions[i].text)
+        return items
+
+    rejected: Set[Tuple[int, int]] = set()
+    compared = 0
+    previous = array('i', [-1]) * count
+    for band in range(BANDS):
+        last: Dict[int, int] = {}
+        for i in range(count):
+            key = band_keys[i * BANDS + band]
+            if not key:
+                continue
+            j = last.get(key, -1)
+            last[key] = i
+            previous[i] = j
+            for _ in range(BUCKET_WINDOW):
+                if j < 0:
+                    break
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    break  # i already joined this bucket's cluster, in an earlier band
+                if (j, i) not in rejected:
+                    compared += 1
+                    if facts[i] == facts[j] and jaccard(shingles_of(i), shingles_of(j)) >= threshold:
+                        # The earliest question stays the root: it is the one kept
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+                        break  # j was already compared with the bucket members before it
+                    else:
+                        if len(rejected) >= _MAX_REJECTED:
+                            rejected.clear()
+                        rejected.add((j, i))
+                j = previous[j]
+        if progress and band == BANDS - 1:
+            progress(f'Compared {compared} candidate pairs in {time.perf_counter() - started:.1f} s')
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(count):
+        root = find(i)
+        if root != i:
+            groups.setdefault(root, [root]).append(i)
+    clusters = sorted(groups.values())
+    return NearDupResult(clusters, compared, threshold, time.perf_counter() - started)
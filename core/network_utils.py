@@ -1,14 +1,23 @@
 import socket
 import logging
-from typing import Optional, Tuple, Any
+import time
+from collections import deque
+from typing import Optional, Tuple, Any, Callable, Deque, Sequence
 from config.client_config import client_config
+from core.framing import FrameTooLongError, LineFramer, MessageDecoder
 
 DEFAULT_HOST = client_config.DEFAULT_HOST
 DEFAULT_PORT = client_config.DEFAULT_PORT
 DEFAULT_TIMEOUT = client_config.CONNECTION_TIMEOUT
+MAX_LINE_LENGTH = client_config.MAX_LINE_LENGTH
+RECV_CHUNK_SIZE = client_config.RECV_CHUNK_SIZE
+MAX_BATCH_FRAMES = 64  # frames per send_frames() call; well below IOV_MAX
 
 logger = logging.getLogger(__name__)
 
+# Called with the duration of each successful send (see set_send_observer)
+_send_observer: Optional[Callable[[float], None]] = None
+
 
 def create_socket_connection(
     host: str = None,
@@ -57,6 +66,22 @@ def create_socket_connection(
         return None
 
 
+def set_send_observer(observer: Optional[Callable[[float], None]]) -> None:
+    """Report the duration in seconds of every successful send.
+    
+    Args:
+        observer: Callable receiving the elapsed seconds, or None to stop
+            timing sends altogether.
+    """
+    global _send_observer
+    _send_observer = observer
+
+
+def get_send_observer() -> Optional[Callable[[float], None]]:
+    """Return the observer installed by set_send_observer(), if any."""
+    return _send_observer
+
+
 def send_line(sock: socket.socket, line: str) -> bool:
     """Send a line-delimited message through socket.
     
@@ -67,9 +92,71 @@ def send_line(sock: socket.socket, line: str) -> bool:
     Returns:
         True if send successful, False otherwise.
     """
+    return send_frame(sock, (line.rstrip('\n') + '\n').encode('utf-8'))
+
+
+def send_frame(sock: socket.socket, frame: bytes) -> bool:
+    """Send an already encoded frame through socket.
+    
+    Args:
+        sock: Connected socket object
+        frame: Encoded message: a v1 line including its newline (see
+            MessageBuilder) or a v2 binary frame (see core.protocol_v2)
+        
+    Returns:
+        True if send successful, False otherwise.
+    """
+    return _send(_sendall, sock, frame)
+
+
+def send_frames(sock: socket.socket, frames: Sequence[bytes]) -> bool:
+    """Send several encoded frames as one write.
+    
+    Uses a single vectored sendmsg() where the platform has it (no copy
+    into a joined buffer), otherwise one sendall() of the joined frames.
+    The peer sees them in one TCP segment instead of one per frame.
+    
+    Args:
+        sock: Connected socket object
+        frames: Encoded frames, in order (at most MAX_BATCH_FRAMES)
+        
+    Returns:
+        True if send successful, False otherwise.
+    """
+    if len(frames) == 1:
+        return _send(_sendall, sock, frames[0])
+    return _send(_sendmsg_all if hasattr(sock, 'sendmsg') else _sendall_joined, sock, frames)
+
+
+def _sendall(sock: socket.socket, frame: bytes) -> None:
+    sock.sendall(frame)
+
+
+def _sendall_joined(sock: socket.socket, frames: Sequence[bytes]) -> None:
+    sock.sendall(b''.join(frames))
+
+
+def _sendmsg_all(sock: socket.socket, frames: Sequence[bytes]) -> None:
+    """sendmsg() until every byte is written, resuming after partial writes."""
+    buffers = list(frames)
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if sent:
+            buffers[0] = memoryview(buffers[0])[sent:]
+
+
+def _send(write: Callable[[socket.socket, Any], None], sock: socket.socket, payload: Any) -> bool:
     try:
-        message = line.rstrip('\n') + '\n'
-        sock.sendall(message.encode('utf-8'))
+        observer = _send_observer
+        if observer is None:
+            write(sock, payload)
+        else:
+            started = time.perf_counter()
+            write(sock, payload)
+            observer(time.perf_counter() - started)
         return True
         
     except BrokenPipeError as e:
@@ -86,31 +173,41 @@ def send_line(sock: socket.socket, line: str) -> bool:
         return False
 
 
-def recv_line(sock: socket.socket) -> str:
+def recv_line(sock: socket.socket, max_line_length: int = None) -> str:
     """Receive one line-delimited message from socket.
     
+    Peeks at the pending data, then consumes exactly up to and including
+    the newline, so nothing past the line is taken from the socket and no
+    state is kept between calls (typically two syscalls per line). For a
+    long-lived connection prefer BufferedLineReader, which needs fewer.
+    
     Args:
         sock: Connected socket object
+        max_line_length: Longest accepted line in bytes (defaults to
+            config.MAX_LINE_LENGTH)
         
     Returns:
         Received line as string (without newline), or empty string on error/disconnect.
     """
-    buf = []
+    if max_line_length is None:
+        max_line_length = MAX_LINE_LENGTH
+    buf = bytearray()
     try:
         while True:
-            ch = sock.recv(1)
-            
-            if not ch:
+            pending = sock.recv(min(RECV_CHUNK_SIZE, max_line_length + 1 - len(buf)), socket.MSG_PEEK)
+            if not pending:
                 logger.warning("Connection closed by peer during recv_line")
                 return ''
-            
-            if ch == b'\n':
+            newline = pending.find(b'\n')
+            take = len(pending) if newline < 0 else newline + 1
+            buf += sock.recv(take)
+            if newline >= 0:
                 break
-                
-            buf.append(ch)
+            if len(buf) > max_line_length:
+                logger.error(f"Line exceeds {max_line_length} bytes")
+                return ''
         
-        line = b''.join(buf).decode('utf-8').rstrip('\r')
-        return line
+        return buf[:-1].decode('utf-8').rstrip('\r')
         
     except socket.timeout as e:
         logger.error(f"Receive timeout: {e}")
@@ -126,6 +223,131 @@ def recv_line(sock: socket.socket) -> str:
         return ''
 
 
+class BufferedLineReader:
+    """Buffered line reader over a connected socket.
+    
+    Receives large chunks straight into one preallocated bytearray with
+    recv_into() and hands them to a core.framing.LineFramer, so a message
+    costs one slice instead of a syscall and an allocation per byte. Has
+    the readline() / iteration / close() surface of a socket file object
+    and can replace sock.makefile('r').
+    
+    A line longer than max_line_length is a protocol violation: the
+    reader logs it and reports EOF from then on.
+    """
+    
+    def __init__(
+        self,
+        sock: socket.socket,
+        max_line_length: int = None,
+        chunk_size: int = None,
+        encoding: str = 'utf-8'
+    ) -> None:
+        self.sock = sock
+        self.max_line_length = max_line_length or MAX_LINE_LENGTH
+        self._framer = self._make_framer(encoding)
+        self._chunk = bytearray(chunk_size or RECV_CHUNK_SIZE)
+        self._view = memoryview(self._chunk)
+        self._ready: Deque[Any] = deque()
+        self._eof = False
+        self.recv_calls = 0
+    
+    def _make_framer(self, encoding: str) -> LineFramer:
+        return LineFramer(self.max_line_length, encoding)
+    
+    def _next(self) -> Optional[Any]:
+        """Next framed item, receiving more data as needed; None at EOF."""
+        ready = self._ready
+        while not ready:
+            if self._eof:
+                return None
+            try:
+                self.recv_calls += 1
+                received = self.sock.recv_into(self._view)
+                if not received:
+                    self._eof = True
+                    return self._framer.flush()
+                ready.extend(self._framer.feed(self._view[:received]))
+            except FrameTooLongError as e:
+                logger.error(f"Protocol violation: {e}")
+                self._eof = True
+            except socket.timeout as e:
+                logger.error(f"Receive timeout: {e}")
+                self._eof = True
+            except OSError as e:
+                logger.error(f"Receive error: {e}")
+                self._eof = True
+        return ready.popleft()
+    
+    def read_line(self) -> Optional[str]:
+        """Return the next line without its terminator, or None at EOF."""
+        return self._next()
+    
+    def readline(self) -> str:
+        """Return the next line including its newline, or '' on EOF/error."""
+        line = self._next()
+        return '' if line is None else line + '\n'
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+    
+    def stop_after(self, predicate: Optional[Callable[[str], bool]]) -> None:
+        """Stop framing after the first line matching predicate.
+        
+        Bytes behind that line stay unframed, so switch_decoder() can hand
+        them to a different wire format.
+        """
+        self._framer.stop_after = predicate
+    
+    def switch_decoder(self, decoder: Any) -> None:
+        """Continue reading with another framer, e.g. core.protocol_v2.FrameDecoder.
+        
+        Bytes already received but not yet framed are passed to the new
+        decoder. Items framed before the switch are still returned first.
+        """
+        leftover = self._framer.detach()
+        self._framer = decoder
+        if leftover:
+            try:
+                self._ready.extend(decoder.feed(leftover))
+            except FrameTooLongError as e:
+                logger.error(f"Protocol violation: {e}")
+                self._eof = True
+    
+    def close(self) -> None:
+        """Stop reading; the socket itself is left open."""
+        self._eof = True
+        self._ready.clear()
+
+
+class MessageReader(BufferedLineReader):
+    """BufferedLineReader that yields typed messages.
+    
+    Args:
+        sock: Connected socket object
+        parse: Line parser from core.protocol, e.g. parse_client_message
+        max_line_length: Longest accepted line in bytes
+    """
+    
+    def __init__(self, sock: socket.socket, parse: Callable[[str], Any], max_line_length: int = None,
+                 chunk_size: int = None, encoding: str = 'utf-8') -> None:
+        self._parse = parse
+        super().__init__(sock, max_line_length, chunk_size, encoding)
+    
+    def _make_framer(self, encoding: str) -> LineFramer:
+        return MessageDecoder(self._parse, self.max_line_length, encoding)
+    
+    def read_message(self) -> Optional[Any]:
+        """Return the next parsed message, or None at EOF."""
+        return self._next()
+
+
 def close_socket_safely(sock: Optional[socket.socket]) -> None:
     """Safely close a socket, suppressing all errors.
     
@@ -153,26 +375,25 @@ def create_socket_with_file(
     encoding: str = 'utf-8',
     newline: str = '\n'
 ) -> Tuple[Optional[socket.socket], Optional[Any]]:
-    """Create socket connection and wrap with file object for line reading.
+    """Create socket connection and wrap it in a BufferedLineReader.
     
     Args:
         host: Server hostname or IP (defaults to config.DEFAULT_HOST)
         port: Server port (defaults to config.DEFAULT_PORT)
         timeout: Connection timeout in seconds (defaults to config.CONNECTION_TIMEOUT)
-        encoding: File encoding (default: 'utf-8')
-        newline: Line ending (default: '\\n')
+        encoding: Line encoding (default: 'utf-8')
+        newline: Kept for compatibility; LF and CRLF are always accepted
         
     Returns:
-        Tuple of (socket, file_object), or (None, None) if connection failed.
+        Tuple of (socket, line_reader), or (None, None) if connection failed.
     """
     sock = create_socket_connection(host, port, timeout)
     if sock is None:
         return None, None
     
     try:
-        file_obj = sock.makefile('r', encoding=encoding, newline=newline)
-        return sock, file_obj
+        return sock, BufferedLineReader(sock, encoding=encoding)
     except Exception as e:
-        logger.error(f"Failed to create file object: {e}")
+        logger.error(f"Failed to create line reader: {e}")
         close_socket_safely(sock)
         return None, None
@@ -1,12 +1,217 @@
-from typing import Optional, Tuple, List, Callable, Dict
+import re
+from typing import Optional, Tuple, List, Callable, Dict, NamedTuple, Union
+
+_SEPARATOR = re.compile(r'[|:]')
+
+
+def split_verb(line: str) -> Tuple[str, str, str]:
+    """Split a line at its first '|' or ':' into (verb, separator, rest).
+    
+    A line without separator is all verb, e.g. 'NAME_OK' -> ('NAME_OK', '', '').
+    """
+    match = _SEPARATOR.search(line)
+    if match is None:
+        return line, '', ''
+    i = match.start()
+    return line[:i], line[i], line[i + 1:]
+
+
+# Typed client->server messages, produced by parse_client_message()
+
+class NameRequest(NamedTuple):
+    """NAME|<name>, or NAME|<name>|v2 from a client asking for protocol v2"""
+    name: str
+    version: int = 1
+    verb = 'NAME'
+
+
+class Answer(NamedTuple):
+    """ANSWER:<qidx>|<letter>"""
+    qidx: str
+    letter: str
+    verb = 'ANSWER'
+
+
+class Unknown(NamedTuple):
+    """Any line that is not a well-formed message."""
+    line: str
+    verb = None
+
+
+ClientMessage = Union[NameRequest, Answer, Unknown]
+
+
+# NAME| suffix -> protocol version the client asks for
+PROTOCOL_TAGS: Dict[str, int] = {'v2': 2}
+
+
+def _parse_name(line: str, sep: str, rest: str):
+    if sep != '|':
+        return Unknown(line)
+    name, bar, tag = rest.rpartition('|')
+    version = PROTOCOL_TAGS.get(tag.strip().lower()) if bar else None
+    if version is None:
+        return NameRequest(rest.strip())
+    return NameRequest(name.strip(), version)
+
+
+def _parse_answer(line: str, sep: str, rest: str):
+    qidx, bar, letter = rest.partition('|')
+    if sep != ':' or not bar:
+        return Unknown(line)
+    return Answer(qidx.strip(), letter.strip())
+
+
+# verb -> parser(line, separator, rest)
+CLIENT_MESSAGE_PARSERS: Dict[str, Callable[[str, str, str], ClientMessage]] = {
+    'NAME': _parse_name,
+    'ANSWER': _parse_answer,
+}
+
+
+def parse_client_message(line: str) -> ClientMessage:
+    """Parse one client->server line (without newline) into a typed message.
+    
+    Args:
+        line: Raw protocol line
+        
+    Returns:
+        NameRequest, Answer, or Unknown for anything malformed.
+    """
+    line = line.strip()
+    verb, sep, rest = split_verb(line)
+    parser = CLIENT_MESSAGE_PARSERS.get(verb)
+    if parser is None:
+        # NAME is accepted in any case, as it always was; ANSWER never was
+        if verb.upper() != 'NAME':
+            return Unknown(line)
+        parser = _parse_name
+    return parser(line, sep, rest)
+
+
+# Typed server->client messages, produced by parse_server_message()
+
+class Notice(NamedTuple):
+    """A verb with an optional text payload: NAME_OK, WAIT, SCORE|3/10, ..."""
+    verb: str
+    payload: str
+
+
+class Question(NamedTuple):
+    """QUESTION:<qidx>|<text>|<opt1>,<opt2>,<opt3>,<opt4>"""
+    qidx: Union[int, str]
+    text: str
+    options: List[str]
+    verb = 'QUESTION'
+
+
+class Evaluation(NamedTuple):
+    """EVAL|RIGHT|<letter> or EVAL|WRONG|<letter>"""
+    tag: str
+    given: str
+    verb = 'EVAL'
+
+
+ServerMessage = Union[Notice, Question, Evaluation, Unknown]
+
+# Notice verbs -> payload used when the server sends none
+NOTICE_DEFAULTS: Dict[str, str] = {
+    'NAME_OK': '',
+    'NAME_TAKEN': '',
+    'WAIT': '',
+    'START': '',
+    'STOP': '',
+    'SERVER_PAUSED': 'Server đang tạm ngưng, vui lòng đợi...',
+    'GAME_STARTED': 'Game đã bắt đầu, không thể tham gia.',
+    'GAME_PAUSED': 'Game đã tạm dừng.',
+    'ERROR': '',
+    'SCORE': '',
+    'LEADERBOARD': '',
+}
+
+
+def _parse_question(line: str, sep: str, rest: str):
+    parts = rest.split('|')
+    if len(parts) < 2:
+        return Unknown(line)
+    raw_qidx = parts[0]
+    qidx = int(raw_qidx) if raw_qidx.isdigit() else raw_qidx
+    # Options are comma-separated, or pipe-separated in older servers
+    opts: List[str] = []
+    if len(parts) >= 3:
+        if ',' in parts[2] and len(parts) == 3:
+            opts = [o.strip() for o in parts[2].split(',') if o.strip()]
+        else:
+            opts = [p.strip() for p in parts[2:]]
+    return Question(qidx, parts[1], opts)
+
+
+def _parse_eval(line: str, sep: str, rest: str):
+    parts = rest.split('|')
+    if len(parts) < 2:
+        return Unknown(line)
+    return Evaluation(parts[0], parts[1])
+
+
+def _notice_parser(verb: str, default: str) -> Callable[[str, str, str], Notice]:
+    exact = Notice(verb, default)  # shared instance for the common no-payload case
+
+    def parse(line: str, sep: str, rest: str) -> Notice:
+        return Notice(verb, rest) if sep == '|' else exact
+    return parse
+
+
+# verb -> parser(line, separator, rest); one lookup per message however
+# many message types exist
+SERVER_MESSAGE_PARSERS: Dict[str, Callable[[str, str, str], ServerMessage]] = {
+    verb: _notice_parser(verb, default) for verb, default in NOTICE_DEFAULTS.items()
+}
+SERVER_MESSAGE_PARSERS['QUESTION'] = _parse_question
+SERVER_MESSAGE_PARSERS['EVAL'] = _parse_eval
+
+
+def parse_server_message(line: str) -> ServerMessage:
+    """Parse one server->client line (without newline) into a typed message.
+    
+    Args:
+        line: Raw protocol line
+        
+    Returns:
+        Notice, Question, Evaluation, or Unknown for anything unrecognized.
+    """
+    verb, sep, rest = split_verb(line)
+    parser = SERVER_MESSAGE_PARSERS.get(verb)
+    if parser is None:
+        return Unknown(line)
+    return parser(line, sep, rest)
+
 
 class ProtocolParser:
     """Parser for line-delimited text protocol messages.
     
-    Handles parsing of all server->client and client->server messages,
-    dispatching to appropriate callbacks.
+    Handles parsing of all server->client messages, dispatching to
+    appropriate callbacks through the verb table.
     """
     
+    # verb -> callback key accepted by register_callback()
+    CALLBACK_KEYS: Dict[str, str] = {
+        'NAME_OK': 'NAME_OK',
+        'NAME_TAKEN': 'NAME_TAKEN',
+        'WAIT': 'WAIT',
+        'START': 'START',
+        'STOP': 'STOP',
+        'SERVER_PAUSED': 'SERVER_PAUSED|',
+        'GAME_STARTED': 'GAME_STARTED|',
+        'GAME_PAUSED': 'GAME_PAUSED|',
+        'ERROR': 'ERROR|',
+        'SCORE': 'SCORE|',
+        'LEADERBOARD': 'LEADERBOARD|',
+        'QUESTION': 'QUESTION:',
+        'EVAL': 'EVAL|',
+    }
+    # Notices delivered without arguments; other notices pass their payload
+    NO_PAYLOAD = frozenset({'NAME_OK', 'NAME_TAKEN', 'WAIT', 'START', 'STOP'})
+    
     def __init__(self):
         """Initialize parser with callback handlers."""
         self.callbacks: Dict[str, Callable] = {}
@@ -32,122 +237,49 @@ class ProtocolParser:
         line = line.strip()
         if not line:
             return False
-            
-        # Exact match messages
-        exact_matches = ['NAME_OK', 'NAME_TAKEN', 'WAIT', 'START', 'STOP']
-        for msg_type in exact_matches:
-            if line == msg_type:
-                callback = self.callbacks.get(msg_type)
-                if callback:
-                    try:
-                        callback()
-                        return True
-                    except Exception as e:
-                        print(f"Error in callback for {msg_type}: {e}")
-                return True
-        
-        # Prefix match messages with payload
-        if line.startswith('SERVER_PAUSED|'):
-            return self._handle_with_payload(line, 'SERVER_PAUSED|', 
-                                             'Server đang tạm ngưng, vui lòng đợi...')
-        
-        if line.startswith('GAME_STARTED|'):
-            return self._handle_with_payload(line, 'GAME_STARTED|',
-                                             'Game đã bắt đầu, không thể tham gia.')
-        
-        if line.startswith('GAME_PAUSED|'):
-            return self._handle_with_payload(line, 'GAME_PAUSED|',
-                                             'Game đã tạm dừng.')
-        
-        if line.startswith('ERROR|'):
-            return self._handle_with_payload(line, 'ERROR|', '')
-        
-        if line.startswith('QUESTION:') or line.startswith('QUESTION|'):
-            return self._handle_question(line)
-        
-        if line.startswith('EVAL|'):
-            return self._handle_eval(line)
-        
-        if line.startswith('SCORE|'):
-            return self._handle_with_payload(line, 'SCORE|', '')
-        
-        if line.startswith('LEADERBOARD|'):
-            return self._handle_with_payload(line, 'LEADERBOARD|', '')
-        
-        # Unknown message
-        return False
+        return self.dispatch(parse_server_message(line))
     
-    def _handle_with_payload(self, line: str, prefix: str, default: str) -> bool:
-        """Handle message with payload after delimiter."""
-        payload = line.split('|', 1)[1] if '|' in line else default
-        callback = self.callbacks.get(prefix)
+    def dispatch(self, message: ServerMessage) -> bool:
+        """Invoke the callback registered for an already parsed message.
+        
+        Returns:
+            True if the message type is known, False otherwise
+        """
+        key = self.CALLBACK_KEYS.get(message.verb)
+        if key is None:
+            return False
+        callback = self.callbacks.get(key)
         if callback:
+            if isinstance(message, Notice):
+                args = () if message.verb in self.NO_PAYLOAD else (message.payload,)
+            else:
+                args = tuple(message)
             try:
-                callback(payload)
-                return True
+                callback(*args)
             except Exception as e:
-                print(f"Error in callback for {prefix}: {e}")
+                print(f"Error in callback for {key}: {e}")
         return True
-    
-    def _handle_question(self, line: str) -> bool:
-        """Parse QUESTION message: QUESTION:<qidx>|<text>|<opt1>,<opt2>,<opt3>,<opt4>"""
-        try:
-            sep = ':' if line.startswith('QUESTION:') else '|'
-            payload = line.split(sep, 1)[1]
-            parts = payload.split('|')
-            
-            if len(parts) < 2:
-                return False
-            
-            # Parse question index
-            raw_qidx = parts[0]
-            try:
-                qidx = int(raw_qidx) if raw_qidx.isdigit() else raw_qidx
-            except Exception:
-                qidx = raw_qidx
-            
-            qtext = parts[1]
-            
-            # Parse options (comma-separated or pipe-separated)
-            opts = []
-            if len(parts) >= 3:
-                if ',' in parts[2] and len(parts) == 3:
-                    opts = [o.strip() for o in parts[2].split(',') if o.strip()]
-                else:
-                    opts = [p.strip() for p in parts[2:]]
-            
-            callback = self.callbacks.get('QUESTION:')
-            if callback:
-                callback(qidx, qtext, opts)
-                return True
-                
-        except Exception as e:
-            print(f"Error parsing QUESTION: {e}")
-        
-        return False
-    
-    def _handle_eval(self, line: str) -> bool:
-        """Parse EVAL message: EVAL|RIGHT|<letter> or EVAL|WRONG|<letter>"""
-        try:
-            parts = line.split('|')
-            if len(parts) >= 3:
-                tag = parts[1]  # RIGHT or WRONG
-                given = parts[2]  # Letter answered
-                
-                callback = self.callbacks.get('EVAL|')
-                if callback:
-                    callback(tag, given)
-                    return True
-        except Exception as e:
-            print(f"Error parsing EVAL: {e}")
-        
-        return False
+
+
+def encode_frame(line: str) -> bytes:
+    """Encode one protocol line as a newline-terminated UTF-8 frame."""
+    return line.encode('utf-8') + b'\n'
+
+
+_EVAL_PREFIX = {True: b'EVAL|RIGHT|', False: b'EVAL|WRONG|'}
+# Every EVAL a well-behaved client can trigger, interned
+_EVAL_FRAMES: Dict[Tuple[bool, str], bytes] = {
+    (ok, letter): _EVAL_PREFIX[ok] + letter.encode('ascii') + b'\n'
+    for ok in (True, False) for letter in 'ABCDabcd'
+}
 
 
 class MessageBuilder:
     """Builder for constructing protocol messages.
     
     Provides consistent message formatting for client->server and server->client.
+    The *_frame methods return ready-to-send bytes (newline included), so
+    hot paths skip the str build / rstrip / encode round trip of send_line().
     """
     
     @staticmethod
@@ -191,3 +323,26 @@ class MessageBuilder:
     def game_started(message: str = 'Game đã bắt đầu, không thể tham gia.') -> str:
         """Build GAME_STARTED message."""
         return f'GAME_STARTED|{message}'
+    
+    @staticmethod
+    def eval_frame(is_correct: bool, letter: str) -> bytes:
+        """Build EVAL frame; answers A-D come from a precomputed table."""
+        frame = _EVAL_FRAMES.get((is_correct, letter))
+        if frame is None:
+            frame = _EVAL_PREFIX[bool(is_correct)] + letter.encode('utf-8') + b'\n'
+        return frame
+    
+    @staticmethod
+    def score_frame(points: int, total: int) -> bytes:
+        """Build SCORE frame."""
+        return b'SCORE|%d/%d\n' % (points, total)
+    
+    @staticmethod
+    def question_frame(qidx, text: str, options: List[str]) -> bytes:
+        """Build QUESTION frame with a single encode."""
+        return f'QUESTION:{qidx}|{text}|{",".join(options)}\n'.encode('utf-8')
+    
+    @staticmethod
+    def notice_frame(frame: bytes) -> bytes:
+        """Frame a pre-encoded notice (MSG_* constant); v1 sends it as is."""
+        return frame
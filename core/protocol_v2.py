@@ -0,0 +1,211 @@
+"""Protocol v2: length-prefixed binary frames.
+
+Negotiated during the handshake: a client that speaks v2 sends
+`NAME|<name>|v2`; a server that agrees answers `NAME_OK|2` (still a v1
+text line) and from then on both directions use v2 frames. Clients that
+send a plain `NAME|<name>` stay on the v1 text protocol.
+
+Frame layout (network byte order):
+
+    u32 length   bytes that follow (type + body)
+    u8  type
+    body
+
+    QUESTION  u16 qidx, u8 option count, then text and each option as
+              u16 length + UTF-8 bytes (commas and pipes are safe)
+    EVAL      u8 correct (0/1), u8 option index (0xFF: not an option)
+    SCORE     u16 points, u16 total
+    ANSWER    u16 qidx, u8 option index
+    TEXT      a v1 protocol line as UTF-8 (notices such as WAIT or
+              SERVER_PAUSED|..., which have no structured form)
+
+Decoding yields the same typed messages as core.protocol, so code above
+the transport does not care which version a connection speaks.
+"""
+import struct
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.framing import FrameTooLongError, MAX_LINE_LENGTH
+from core.protocol import Answer, Evaluation, Notice, Question, Unknown
+
+VERSION = 2
+VERSION_TAG = 'v2'  # appended to NAME| by clients asking for v2
+NAME_OK_LINE = 'NAME_OK|2'  # v1 text reply; every later frame is v2
+
+T_QUESTION = 1
+T_EVAL = 2
+T_SCORE = 3
+T_ANSWER = 4
+T_TEXT = 5
+
+NO_OPTION = 0xFF
+LETTERS = 'ABCD'
+
+_HEADER = struct.Struct('!IB')
+_U16 = struct.Struct('!H')
+_QUESTION_HEAD = struct.Struct('!HB')
+_EVAL = struct.Struct('!BB')
+_SCORE = struct.Struct('!HH')
+_ANSWER = struct.Struct('!HB')
+
+
+def _frame(frame_type: int, body: bytes) -> bytes:
+    return _HEADER.pack(len(body) + 1, frame_type) + body
+
+
+def letter_index(letter: str) -> int:
+    """Option index of an answer letter (A-D, any case), or NO_OPTION."""
+    index = LETTERS.find(letter.upper()) if len(letter) == 1 else -1
+    return NO_OPTION if index < 0 else index
+
+
+def index_letter(index: int) -> str:
+    return LETTERS[index] if index < len(LETTERS) else ''
+
+
+# Every EVAL a client can trigger, interned
+_EVAL_FRAMES = {
+    (ok, index): _frame(T_EVAL, _EVAL.pack(ok, index))
+    for ok in (0, 1) for index in list(range(len(LETTERS))) + [NO_OPTION]
+}
+
+
+class FrameBuilder:
+    """v2 counterpart of core.protocol.MessageBuilder's *_frame methods."""
+    
+    @staticmethod
+    def question_frame(qidx, text: str, options: Sequence[str]) -> bytes:
+        parts = [_QUESTION_HEAD.pack(int(qidx), len(options))]
+        for value in (text, *options):
+            data = value.encode('utf-8')
+            parts.append(_U16.pack(len(data)))
+            parts.append(data)
+        return _frame(T_QUESTION, b''.join(parts))
+    
+    @staticmethod
+    def eval_frame(is_correct: bool, letter: str) -> bytes:
+        return _EVAL_FRAMES[(int(bool(is_correct)), letter_index(letter))]
+    
+    @staticmethod
+    def score_frame(points: int, total: int) -> bytes:
+        return _frame(T_SCORE, _SCORE.pack(points, total))
+    
+    @staticmethod
+    def answer_frame(qidx, letter: str) -> bytes:
+        return _frame(T_ANSWER, _ANSWER.pack(int(qidx), letter_index(letter)))
+    
+    @staticmethod
+    def notice_frame(frame: bytes) -> bytes:
+        """Wrap a v1 text frame (e.g. a pre-encoded MSG_* constant)."""
+        return _frame(T_TEXT, frame.rstrip(b'\n'))
+    
+    @staticmethod
+    def text_frame(line: str) -> bytes:
+        return _frame(T_TEXT, line.encode('utf-8'))
+
+
+def _decode_question(buf: bytearray, start: int, end: int) -> Question:
+    qidx, count = _QUESTION_HEAD.unpack_from(buf, start)
+    pos = start + _QUESTION_HEAD.size
+    unpack = _U16.unpack_from
+    values = []
+    for _ in range(count + 1):
+        size = unpack(buf, pos)[0]
+        pos += 2
+        if pos + size > end:
+            raise ValueError('string runs past frame')
+        values.append(buf[pos:pos + size].decode('utf-8', 'replace'))
+        pos += size
+    return Question(qidx, values[0], values[1:])
+
+
+# EVAL body -> interned Evaluation
+_EVALUATIONS = {
+    _EVAL.pack(ok, index): Evaluation('RIGHT' if ok else 'WRONG', index_letter(index))
+    for ok, index in _EVAL_FRAMES
+}
+
+
+def _decode_eval(buf: bytearray, start: int, end: int) -> Evaluation:
+    return _EVALUATIONS[bytes(buf[start:end])]
+
+
+def _decode_score(buf: bytearray, start: int, end: int) -> Notice:
+    return Notice('SCORE', '%d/%d' % _SCORE.unpack_from(buf, start))
+
+
+def _decode_answer(buf: bytearray, start: int, end: int) -> Answer:
+    qidx, index = _ANSWER.unpack_from(buf, start)
+    return Answer(str(qidx), index_letter(index))
+
+
+# frame type -> decoder(buf, body start, body end); TEXT is handled by the
+# FrameDecoder's own v1 parser
+_DECODERS: Dict[int, Callable[[bytearray, int, int], Any]] = {
+    T_QUESTION: _decode_question,
+    T_EVAL: _decode_eval,
+    T_SCORE: _decode_score,
+    T_ANSWER: _decode_answer,
+}
+
+
+class FrameDecoder:
+    """Incremental v2 decoder with the LineFramer/MessageDecoder interface.
+    
+    Args:
+        parse_text: v1 parser for TEXT frames, e.g. parse_server_message
+        max_frame_length: Largest accepted frame body in bytes
+    """
+    
+    def __init__(self, parse_text: Callable[[str], Any], max_frame_length: int = None) -> None:
+        self.parse_text = parse_text
+        self.max_frame_length = max_frame_length or MAX_LINE_LENGTH
+        self._buf = bytearray()
+    
+    def feed(self, data) -> List[Any]:
+        """Add received bytes; return the messages they complete."""
+        buf = self._buf
+        buf += data
+        messages: List[Any] = []
+        unpack = _HEADER.unpack_from
+        header = _HEADER.size
+        start = 0
+        end = len(buf)
+        while end - start >= header:
+            length, frame_type = unpack(buf, start)
+            if length > self.max_frame_length or length < 1:
+                raise FrameTooLongError(f'frame length {length} out of range')
+            body_end = start + 4 + length  # length counts the type byte
+            if body_end > end:
+                break
+            messages.append(self._decode(frame_type, buf, start + header, body_end))
+            start = body_end
+        if start:
+            del buf[:start]
+        return messages
+    
+    def _decode(self, frame_type: int, buf: bytearray, start: int, end: int) -> Any:
+        decode = _DECODERS.get(frame_type)
+        try:
+            if decode is not None:
+                return decode(buf, start, end)
+            if frame_type == T_TEXT:
+                return self.parse_text(buf[start:end].decode('utf-8', 'replace'))
+        except (struct.error, KeyError, ValueError):
+            pass
+        return Unknown(bytes(buf[start:end]).hex())
+    
+    def flush(self) -> Optional[Any]:
+        """At EOF a partial frame is discarded."""
+        self._buf.clear()
+        return None
+    
+    def detach(self) -> bytes:
+        """Return and clear undecoded bytes."""
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+    
+    @property
+    def buffered(self) -> int:
+        return len(self._buf)
@@ -0,0 +1,170 @@
+import codecs
+import csv
+import functools
+import itertools
+import os
+import threading
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from core.question_cache import load_cached_questions, open_question_cache
+from core.shared_logic import (
+    CompiledQuestion,
+    column_candidates,
+    load_compiled_questions,
+    normalize_category,
+    parse_difficulty,
+    resolve_path,
+    row_compiler,
+)
+
+LOADERS = ('memory', 'indexed', 'mmap')
+DEFAULT_CACHE_SIZE = 4096  # compiled questions kept per indexed bank
+
+
+class IndexedQuestionBank(Sequence[CompiledQuestion]):
+    """Question bank that keeps only the byte offset of each row in memory.
+
+    The CSV is read once, front to back, to record where every valid row
+    starts and how long it is (12 bytes per row in two arrays). A question
+    is parsed from disk when it is first asked for and kept in a small LRU
+    cache, so a bank with millions of rows costs megabytes, not gigabytes
+    of row dicts. Used with QuizPlan, which samples bank indexes uniformly
+    without replacement, every row is equally likely in every session.
+
+    Args:
+        path: CSV file with the load_questions() columns
+        cache_size: Compiled questions kept in memory
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.path = resolve_path(path)
+        self._offsets = array('q')
+        self._lengths = array('I')
+        # Optional metadata columns, kept per row for QuestionIndex
+        self._category_ids = array('I')
+        self._categories: List[str] = []
+        self._difficulties = array('B')
+        self._file = open(self.path, 'rb')
+        self._lock = threading.Lock()  # seek + read when os.pread is unavailable
+        self.fieldnames = self._build_index()
+        self._compile_row = row_compiler(self.fieldnames, share_strings=False)
+        self._get = functools.lru_cache(maxsize=cache_size)(self._load)
+
+    def _build_index(self) -> List[str]:
+        consumed = 0
+
+        def lines() -> Iterator[str]:
+            # csv.reader pulls one physical line at a time, so `consumed`
+            # is the end offset of the row it has just returned
+            nonlocal consumed
+            # utf-8-sig drops a BOM at the start of the file only, as open() does
+            decode = codecs.getincrementaldecoder('utf-8-sig')().decode
+            for raw in self._file:
+                consumed += len(raw)
+                yield decode(raw)
+
+        reader = csv.reader(lines())
+        fieldnames = next(reader, None) or []
+        # Columns row_compiler() reads these fields from, in order
+        text_at = column_candidates(fieldnames, 'question')
+        category_at = column_candidates(fieldnames, 'category')
+        difficulty_at = column_candidates(fieldnames, 'difficulty')
+
+        def field(values: List[str], at: Tuple[int, ...]) -> str:
+            return next((values[i] for i in at if i < len(values) and values[i]), '')
+
+        category_ids: Dict[str, int] = {}
+        offsets, lengths = self._offsets, self._lengths
+        start = consumed
+        for values in reader:
+            end = consumed
+            if field(values, text_at).strip():
+                offsets.append(start)
+                lengths.append(end - start)
+                if category_at or difficulty_at:
+                    category = normalize_category(field(values, category_at))
+                    if category not in category_ids:
+                        category_ids[category] = len(self._categories)
+                        self._categories.append(category)
+                    self._category_ids.append(category_ids[category])
+                    self._difficulties.append(parse_difficulty(field(values, difficulty_at)))
+            start = end
+        return fieldnames
+
+    def _read(self, offset: int, length: int) -> bytes:
+        if hasattr(os, 'pread'):
+            return os.pread(self._file.fileno(), length, offset)
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def _load(self, index: int) -> CompiledQuestion:
+        record = self._read(self._offsets[index], self._lengths[index]).decode('utf-8')
+        # One record, embedded newlines included; splitlines() would also cut at U+2028, \x1c...
+        return self._compile_row(next(csv.reader([record])))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def metadata(self) -> Iterator[Tuple[str, int]]:
+        """(category, difficulty) of every question, from the index alone."""
+        if not self._difficulties:
+            return itertools.repeat(('', 0), len(self))
+        categories = self._categories
+        return zip((categories[i] for i in self._category_ids), self._difficulties)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('question index out of range')
+        return self._get(index)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _compile_csv(path) -> List[CompiledQuestion]:
+    return load_compiled_questions(str(path))
+
+
+def open_question_bank(path: Union[str, os.PathLike], loader: str = 'memory',
+                       cache: bool = True) -> Sequence[CompiledQuestion]:
+    """Load every question of a bank, compiled, by the chosen loader.
+
+    'memory' keeps the whole bank in memory: with `cache` it is read from
+    the compiled cache next to the CSV (see core.question_cache), parsing
+    and rewriting the cache only when the CSV changed. 'indexed' keeps only
+    row offsets (see IndexedQuestionBank). 'mmap' maps that compiled cache
+    read-only (see MappedQuestionStore), building it first if needed, so it
+    ignores `cache`. All return an empty sequence when the file is missing
+    or has no questions.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f'loader must be one of {LOADERS}')
+    if loader == 'memory':
+        if not cache:
+            return _compile_csv(path)
+        questions, cached = load_cached_questions(path, _compile_csv)
+        if cached:
+            print(f"Loaded {len(questions)} questions from cache of {resolve_path(path)}")
+        return questions
+    if loader == 'mmap':
+        store = open_question_cache(path, use_mmap=True)
+        if store is None:
+            questions, _ = load_cached_questions(path, _compile_csv)
+            store = open_question_cache(path, use_mmap=True)
+            if store is None:
+                return questions  # cache could not be written; serve from memory
+        print(f"Mapped {len(store)} questions from cache of {resolve_path(path)}")
+        return store
+    try:
+        bank = IndexedQuestionBank(path)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Cannot index questions from {path}: {e}")
+        return []
+    print(f"Indexed {len(bank)} questions from {bank.path}")
+    return bank
@@ -0,0 +1,305 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from core.shared_logic import (
+    _OPTION_GETTERS,
+    LETTERS,
+    OPTION_POSITIONS,
+    CompiledQuestion,
+    resolve_path,
+)
+
+CACHE_SUFFIX = '.qcache'
+CACHE_MAGIC = b'QZBC'
+CACHE_VERSION = 2
+
+# magic, format version, byte order of the offset table (1 = little),
+# source size, source mtime_ns, question count, source digest, pool size;
+# 72 bytes, so the offset table that follows stays aligned
+_HEADER = struct.Struct('<4sHHQqQ32sQ')
+_MTIME = struct.Struct('<q')
+_MTIME_AT = 16  # offset of source mtime_ns in the header
+_FIELDS = 1 + len(LETTERS) + 1  # text, one string per option, category
+_CATEGORY = _FIELDS - 1
+_LITTLE = 1 if sys.byteorder == 'little' else 0
+_OFFSETS = array('I')  # pool offsets are uint32: banks up to 4 GiB of text
+
+
+def cache_path(source: Union[str, os.PathLike]) -> Path:
+    """Where the compiled cache of a question bank lives: next to the source."""
+    source = resolve_path(source)
+    return source.with_name(source.name + CACHE_SUFFIX)
+
+
+def source_digest(source: Union[str, os.PathLike]) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+class QuestionCache(Sequence[CompiledQuestion]):
+    """Compiled questions read straight from a cache file image.
+
+    Layout after the header: one uint32 end offset per string (text, A-D,
+    category) into a UTF-8 string pool, preceded by a 0, then one
+    correct-option byte and one difficulty byte per question, then the pool. Opening only checks the header and wraps
+    the buffer in memoryviews, so it costs the same for ten questions or a
+    million; a question is decoded when it is indexed.
+
+    Args:
+        buffer: Whole cache file, as bytes or an mmap
+    """
+
+    def __init__(self, buffer) -> None:
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError('truncated question cache')
+        magic, version, little, size, mtime_ns, count, digest, pool_size = _HEADER.unpack_from(view)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or little != _LITTLE:
+            raise ValueError('not a question cache of this format')
+        bounds_end = _HEADER.size + (count * _FIELDS + 1) * _OFFSETS.itemsize
+        if len(view) != bounds_end + 2 * count + pool_size:
+            raise ValueError('truncated question cache')
+        self.source_size, self.source_mtime_ns, self.source_digest = size, mtime_ns, digest
+        self._buffer = buffer
+        self._bounds = view[_HEADER.size:bounds_end].cast(_OFFSETS.typecode)
+        self._answers = view[bounds_end:bounds_end + count]
+        self._difficulties = view[bounds_end + count:bounds_end + 2 * count]
+        self._pool = view[bounds_end + 2 * count:]
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, i: int) -> str:
+        return str(self._pool[self._bounds[i]:self._bounds[i + 1]], 'utf-8')
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('question index out of range')
+        return index
+
+    def get(self, index: int) -> 'QuestionView':
+        """Question `index` as a view that decodes each field when read."""
+        return QuestionView(self, self._check_index(index))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._check_index(index)
+        base = index * _FIELDS
+        text, *options, category = [self._string(i) for i in range(base, base + _FIELDS)]
+        return CompiledQuestion(text, tuple(options), self._answers[index], category, self._difficulties[index])
+
+    def metadata(self) -> Iterator[Tuple[str, int]]:
+        """(category, difficulty) of every question, decoding nothing else."""
+        pool, bounds, difficulties = self._pool, self._bounds, self._difficulties
+        categories: Dict[bytes, str] = {}
+        for index in range(self._count):
+            i = index * _FIELDS + _CATEGORY
+            raw = pool[bounds[i]:bounds[i + 1]].tobytes()
+            category = categories.get(raw)
+            if category is None:
+                category = categories[raw] = raw.decode('utf-8')
+            yield category, difficulties[index]
+
+    def close(self) -> None:
+        self._bounds.release()
+        self._answers.release()
+        self._difficulties.release()
+        self._pool.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+class MappedQuestionStore(QuestionCache):
+    """Read-only question store over an mmap of the cache file.
+
+    Indexing returns a QuestionView, so a session decodes only the strings
+    it sends and nothing per question stays on the Python heap. The pages
+    belong to the OS page cache: worker processes mapping the same file
+    share one copy, and resident memory does not grow with the bank.
+
+    Args:
+        buffer: mmap of the whole cache file
+    """
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        super().__init__(buffer)
+        if hasattr(buffer, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            buffer.madvise(mmap.MADV_RANDOM)  # sessions sample rows; skip readahead
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.get(index)
+
+
+class QuestionView:
+    """One question of a QuestionCache, decoded on demand.
+
+    Reads like a CompiledQuestion (text, options, correct, permuted) but
+    holds only the store and the index.
+    """
+
+    __slots__ = ('_cache', 'index')
+
+    def __init__(self, cache: QuestionCache, index: int) -> None:
+        self._cache = cache
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        return self._cache._string(self.index * _FIELDS)
+
+    @property
+    def options(self) -> Tuple[str, ...]:
+        base = self.index * _FIELDS
+        return tuple(self._cache._string(i) for i in range(base + 1, base + _CATEGORY))
+
+    @property
+    def category(self) -> str:
+        return self._cache._string(self.index * _FIELDS + _CATEGORY)
+
+    @property
+    def difficulty(self) -> int:
+        return self._cache._difficulties[self.index]
+
+    @property
+    def correct(self) -> int:
+        return self._cache._answers[self.index]
+
+    def permuted(self, perm_id: int) -> Tuple[int, Tuple[str, ...]]:
+        """Same as CompiledQuestion.permuted()."""
+        return OPTION_POSITIONS[perm_id][self.correct], _OPTION_GETTERS[perm_id](self.options)
+
+    def compiled(self) -> CompiledQuestion:
+        return CompiledQuestion(self.text, self.options, self.correct, self.category, self.difficulty)
+
+    def __repr__(self) -> str:
+        return f'QuestionView({self.index}, {self.text!r})'
+
+
+def write_question_cache(source: Union[str, os.PathLike], questions: Sequence[CompiledQuestion],
+                         stat: Optional[os.stat_result] = None, digest: Optional[bytes] = None) -> Path:
+    """Compile questions into the cache file of `source`, atomically.
+
+    Pass the stat and digest taken before the source was parsed, so an
+    edit made while parsing leaves the cache stale instead of wrong.
+    """
+    source = resolve_path(source)
+    stat = stat or os.stat(source)
+    digest = digest or source_digest(source)
+    strings = []
+    categories: Dict[str, bytes] = {}
+    for question in questions:
+        strings.append(question.text.encode('utf-8'))
+        strings.extend(option.encode('utf-8') for option in question.options)
+        category = categories.get(question.category)
+        if category is None:
+            category = categories[question.category] = question.category.encode('utf-8')
+        strings.append(category)
+    bounds = [0] * (len(strings) + 1)
+    end = 0
+    for i, encoded in enumerate(strings, 1):
+        end += len(encoded)
+        bounds[i] = end
+    header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, _LITTLE, stat.st_size, stat.st_mtime_ns,
+                          len(questions), digest, end)
+
+    target = cache_path(source)
+    fd, tmp = tempfile.mkstemp(prefix=target.name, dir=target.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(array(_OFFSETS.typecode, bounds).tobytes())
+            f.write(bytes(question.correct for question in questions))
+            f.write(bytes(question.difficulty for question in questions))
+            f.write(b''.join(strings))
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return target
+
+
+def open_question_cache(source: Union[str, os.PathLike], use_mmap: bool = False) -> Optional[QuestionCache]:
+    """Open the cache of `source` if it still matches the source file.
+
+    Size and mtime are compared first; when only the mtime moved (touch,
+    git checkout) the source is hashed, and a matching digest refreshes the
+    cached mtime so the next start takes the fast path again.
+
+    Args:
+        source: Question bank file
+        use_mmap: Map the cache (MappedQuestionStore) instead of reading it
+
+    Returns:
+        The cached questions, or None when the cache is missing or stale
+    """
+    source = resolve_path(source)
+    try:
+        stat = os.stat(source)
+        with open(cache_path(source), 'rb') as f:
+            if use_mmap:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+        cache = MappedQuestionStore(buffer) if use_mmap else QuestionCache(buffer)
+        if cache.source_size != stat.st_size:
+            cache.close()
+            return None
+        if cache.source_mtime_ns != stat.st_mtime_ns:
+            if cache.source_digest != source_digest(source):
+                cache.close()
+                return None
+            try:
+                with open(cache_path(source), 'r+b') as f:
+                    f.seek(_MTIME_AT)
+                    f.write(_MTIME.pack(stat.st_mtime_ns))
+            except OSError:
+                pass  # read-only checkout: hash again next start
+        return cache
+    except (OSError, ValueError):
+        return None
+
+
+def load_cached_questions(source: Union[str, os.PathLike],
+                          loader: Callable[[Path], Sequence[CompiledQuestion]]) -> Tuple[Sequence[CompiledQuestion], bool]:
+    """Questions of `source` from its cache, or from `loader` refilling the cache.
+
+    Args:
+        source: Question bank file
+        loader: Called with the path when the cache is stale; returns the
+            compiled questions
+
+    Returns:
+        (questions, whether they came from the cache)
+    """
+    cache = open_question_cache(source)
+    if cache is not None:
+        return cache, True
+    source = resolve_path(source)
+    try:
+        stat = os.stat(source)
+        digest = source_digest(source)
+    except OSError:
+        return loader(source), False
+    questions = loader(source)
+    if questions:
+        try:
+            write_question_cache(source, questions, stat, digest)
+        except (OSError, OverflowError) as e:
+            print(f"Cannot write question cache for {source}: {e}")
+    return questions, False
@@ -0,0 +1,180 @@
+import bisect
+import functools
+import re
+import threading
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from core.shared_logic import MAX_DIFFICULTY, CompiledQuestion, normalize_category
+
+POOL_CACHE_SIZE = 16  # filter pools kept per bank version
+
+_CLAUSE = re.compile(r'^\s*(category|difficulty)\s*(<=|>=|=|<|>)\s*(.*?)\s*$', re.IGNORECASE)
+
+
+class GameFilter(NamedTuple):
+    """Which questions a game draws from, e.g. "category=geography, difficulty<=2".
+
+    Clauses are separated by ',' or ';' and all must hold. category=
+    takes one or more names separated by '|'. difficulty accepts =, <, <=,
+    > and >=; any difficulty clause leaves out unrated (0) questions.
+    """
+    categories: Tuple[str, ...] = ()  # empty: any category
+    min_difficulty: int = 0
+    max_difficulty: int = MAX_DIFFICULTY
+
+    @classmethod
+    def parse(cls, text: str) -> 'GameFilter':
+        """Parse filter text; '' means no filter.
+
+        Raises:
+            ValueError: On an unknown clause or a bad difficulty
+        """
+        categories: List[str] = []
+        low, high = 0, MAX_DIFFICULTY
+        for clause in filter(str.strip, re.split(r'[,;]', text or '')):
+            match = _CLAUSE.match(clause)
+            if not match:
+                raise ValueError(f'bad filter clause {clause.strip()!r} (use category=... or difficulty<=N)')
+            key, op, value = match.group(1).lower(), match.group(2), match.group(3)
+            if key == 'category':
+                if op != '=':
+                    raise ValueError('category only supports =')
+                categories.extend(normalize_category(name) for name in value.split('|') if name.strip())
+                continue
+            try:
+                level = int(value)
+            except ValueError:
+                raise ValueError(f'difficulty must be a number, got {value!r}') from None
+            low = max(low, 1)
+            if op in ('=', '>='):
+                low = max(low, level)
+            if op in ('=', '<='):
+                high = min(high, level)
+            if op == '>':
+                low = max(low, level + 1)
+            if op == '<':
+                high = min(high, level - 1)
+        return cls(tuple(sorted(set(categories))), low, high)
+
+    @property
+    def is_any(self) -> bool:
+        return not self.categories and self.min_difficulty == 0 and self.max_difficulty == MAX_DIFFICULTY
+
+    @property
+    def is_empty(self) -> bool:
+        """True if no difficulty can match, e.g. difficulty>=300 or difficulty<=0."""
+        return self.min_difficulty > self.max_difficulty
+
+    def matches(self, category: str, difficulty: int) -> bool:
+        return ((not self.categories or category in self.categories)
+                and self.min_difficulty <= difficulty <= self.max_difficulty)
+
+    def __str__(self) -> str:
+        """Canonical filter text; parse(str(f)) == f."""
+        clauses = []
+        if self.categories:
+            clauses.append('category=' + '|'.join(self.categories))
+        low, high = self.min_difficulty, self.max_difficulty
+        if (low, high) != (0, MAX_DIFFICULTY):
+            if low == high:
+                clauses.append(f'difficulty={low}')
+            else:
+                if low > 1 or high == MAX_DIFFICULTY:
+                    clauses.append(f'difficulty>={low}')
+                if high < MAX_DIFFICULTY:
+                    clauses.append(f'difficulty<={high}')
+        return ', '.join(clauses)
+
+
+NO_FILTER = GameFilter()
+
+
+class QuestionPool(Sequence[int]):
+    """Bank ids matching a filter, read through the index buckets without copying.
+
+    pool[i] costs O(log buckets), so sampling k questions is O(k log b)
+    whatever the size of the bank or of the pool.
+    """
+
+    def __init__(self, parts: List[array]) -> None:
+        self._parts = parts
+        self._starts = []
+        total = 0
+        for part in parts:
+            self._starts.append(total)
+            total += len(part)
+        self._len = total
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('pool index out of range')
+        part = bisect.bisect_right(self._starts, index) - 1
+        return self._parts[part][index - self._starts[part]]
+
+
+def question_metadata(questions: Sequence[CompiledQuestion]) -> Iterator[Tuple[str, int]]:
+    """(category, difficulty) per question; banks with a metadata() method
+    provide it without decoding whole questions."""
+    metadata = getattr(questions, 'metadata', None)
+    if metadata is not None:
+        return metadata()
+    return ((question.category, question.difficulty) for question in questions)
+
+
+class QuestionIndex:
+    """Inverted indexes over one bank: (category, difficulty) -> array of bank ids.
+
+    Built once per bank version, in one pass, the first time a filtered
+    game needs it (or ahead of time with build()). A filter then resolves
+    to the buckets it matches, and the resulting pool is kept for the
+    POOL_CACHE_SIZE most recent filters, so choosing a session's questions
+    never scans the bank.
+
+    Args:
+        questions: The bank to index
+    """
+
+    def __init__(self, questions: Sequence[CompiledQuestion]) -> None:
+        self._questions = questions
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int], array] = {}
+        self._pool = functools.lru_cache(maxsize=POOL_CACHE_SIZE)(self._build_pool)
+        self._built = False
+
+    def build(self) -> None:
+        with self._lock:
+            if self._built:
+                return
+            buckets = self._buckets
+            for question_id, key in enumerate(question_metadata(self._questions)):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = array('I')
+                bucket.append(question_id)
+            self._built = True
+
+    def categories(self) -> Dict[str, int]:
+        """Question count per category ('' for uncategorised)."""
+        self.build()
+        counts: Dict[str, int] = {}
+        for (category, _difficulty), bucket in self._buckets.items():
+            counts[category] = counts.get(category, 0) + len(bucket)
+        return counts
+
+    def select(self, game_filter: GameFilter) -> Sequence[int]:
+        """Bank ids a game with this filter draws from."""
+        if game_filter.is_any:
+            return range(len(self._questions))
+        return self._pool(game_filter)
+
+    def _build_pool(self, game_filter: GameFilter) -> QuestionPool:
+        self.build()
+        return QuestionPool([bucket for key, bucket in sorted(self._buckets.items()) if game_filter.matches(*key)])
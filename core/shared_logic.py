@@ -1,7 +1,64 @@
 import csv
-from typing import List, Union
+import itertools
+import operator
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple, Union
 from pathlib import Path
 
+LETTERS = 'ABCD'
+
+# Every display order of four options, as original option indexes; a
+# player's shuffle is a random index into this table
+OPTION_PERMUTATIONS: Tuple[Tuple[int, ...], ...] = tuple(itertools.permutations(range(len(LETTERS))))
+PERMUTATION_COUNT = len(OPTION_PERMUTATIONS)
+_OPTION_GETTERS = tuple(operator.itemgetter(*perm) for perm in OPTION_PERMUTATIONS)
+# OPTION_POSITIONS[perm_id][original index] -> displayed index
+OPTION_POSITIONS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(perm.index(i) for i in range(len(LETTERS))) for perm in OPTION_PERMUTATIONS
+)
+MAX_DIFFICULTY = 255
+
+# Answer letter, either case -> option index
+LETTER_INDEX: Dict[str, int] = {letter: i % len(LETTERS) for i, letter in enumerate(LETTERS + LETTERS.lower())}
+
+
+class CompiledQuestion(NamedTuple):
+    """A question compiled once at load time: options plus the correct index.
+
+    category (lowercase) and difficulty (1-MAX_DIFFICULTY) come from the
+    optional CSV columns of the same names; '' and 0 mean not set.
+    """
+    text: str
+    options: Tuple[str, ...]
+    correct: int
+    category: str = ''
+    difficulty: int = 0
+
+    def permuted(self, perm_id: int) -> Tuple[int, Tuple[str, ...]]:
+        """Options in the order of OPTION_PERMUTATIONS[perm_id].
+
+        Returns:
+            (displayed index of the correct option, displayed options)
+        """
+        return OPTION_POSITIONS[perm_id][self.correct], _OPTION_GETTERS[perm_id](self.options)
+
+
+def compile_question(question: dict) -> CompiledQuestion:
+    """Compile a normalized question dict (see load_questions).
+
+    An answer that is not A-D counts as A, as it always has.
+    """
+    return CompiledQuestion(
+        question['question'],
+        tuple(question.get(letter, '') for letter in LETTERS),
+        LETTER_INDEX.get(question.get('answer', 'A'), 0),
+        normalize_category(question.get('category', '')),
+        parse_difficulty(question.get('difficulty', '')),
+    )
+
+
+def compile_questions(questions: Iterable[dict]) -> List[CompiledQuestion]:
+    return [compile_question(q) for q in questions]
+
 
 def _normalize_row(row: dict) -> dict:
     def get(k, alt=''):
@@ -13,45 +70,182 @@ def _normalize_row(row: dict) -> dict:
         'B': get('B', ''),
         'C': get('C', ''),
         'D': get('D', ''),
-        'answer': get('answer', '').upper()
+        'answer': get('answer', '').upper(),
+        'category': get('category', ''),
+        'difficulty': get('difficulty', ''),
     }
 
 
+def resolve_path(filename: Union[str, Path]) -> Path:
+    """Resolve a relative filename against the project root (parent of this core package)."""
+    path = Path(filename)
+    if not path.is_absolute():
+        path = (Path(__file__).resolve().parent.parent / path).resolve()
+    return path
+
+
+def column_candidates(fieldnames: Sequence[str], key: str) -> Tuple[int, ...]:
+    """Indexes of the columns holding `key`, in _normalize_row() fallback order."""
+    columns = {name: i for i, name in enumerate(fieldnames)}
+    names = (key, key.lower(), key.upper())
+    return tuple(dict.fromkeys(columns[name] for name in names if name in columns))
+
+
+def normalize_category(value: str) -> str:
+    return value.strip().lower()
+
+
+def parse_difficulty(value: str) -> int:
+    """Difficulty column value as 1-255; blank or invalid is 0 (unrated)."""
+    try:
+        return min(max(int(value.strip()), 0), MAX_DIFFICULTY)
+    except ValueError:
+        return 0
+
+
+def row_compiler(fieldnames: Sequence[str],
+                 share_strings: bool = True) -> Callable[[Sequence[str]], Optional[CompiledQuestion]]:
+    """Build a function compiling one csv.reader row under this header.
+
+    Columns are resolved once, with the same case fallbacks as
+    _normalize_row(), so rows go straight to CompiledQuestion without a
+    dict per row. The category and difficulty columns are optional. The
+    returned function gives None for rows without question text.
+
+    Args:
+        fieldnames: Header row
+        share_strings: Reuse one str object for equal option texts; only
+            worth it (and bounded) when compiling a whole bank in one go
+    """
+    text_at = column_candidates(fieldnames, 'question')
+    option_at = [column_candidates(fieldnames, letter) for letter in LETTERS]
+    answer_at = column_candidates(fieldnames, 'answer')
+    category_at = column_candidates(fieldnames, 'category')
+    difficulty_at = column_candidates(fieldnames, 'difficulty')
+    strings: Dict[str, str] = {}  # shares repeated option texts ("Đúng", "Sai", numbers)
+    categories: Dict[str, str] = {}  # one str per category, whatever share_strings says
+
+    def field(values: Sequence[str], at: Tuple[int, ...]) -> str:
+        for i in at:
+            if i < len(values) and values[i]:
+                return values[i].strip()
+        return ''
+
+    def compile_row(values: Sequence[str]) -> Optional[CompiledQuestion]:
+        text = field(values, text_at)
+        if not text:
+            return None
+        options = tuple(field(values, at) for at in option_at)
+        if share_strings:
+            options = tuple(strings.setdefault(option, option) for option in options)
+        category = normalize_category(field(values, category_at))
+        return CompiledQuestion(text, options, LETTER_INDEX.get(field(values, answer_at).upper(), 0),
+                                categories.setdefault(category, category),
+                                parse_difficulty(field(values, difficulty_at)))
+
+    all_at = [text_at, *option_at, answer_at]
+    metadata_at = [at for at in (category_at, difficulty_at) if at]
+    if any(len(at) != 1 for at in all_at + metadata_at) or (metadata_at and len(metadata_at) != 2):
+        return compile_row
+
+    # Usual header, one column per field: pick every field with one itemgetter
+    all_at += metadata_at
+    width = max(at[0] for at in all_at) + 1
+    pick = operator.itemgetter(*(at[0] for at in all_at))
+    shared = strings.setdefault if share_strings else None
+
+    def compile_full_row(values: Sequence[str]) -> Optional[CompiledQuestion]:
+        if len(values) < width:
+            return compile_row(values)
+        text, a, b, c, d, answer, *metadata = pick(values)
+        text = text.strip()
+        if not text:
+            return None
+        a, b, c, d = a.strip(), b.strip(), c.strip(), d.strip()
+        if shared is not None:
+            a, b, c, d = shared(a, a), shared(b, b), shared(c, c), shared(d, d)
+        correct = LETTER_INDEX.get(answer.strip().upper(), 0)
+        if not metadata:
+            return CompiledQuestion(text, (a, b, c, d), correct)
+        category = normalize_category(metadata[0])
+        return CompiledQuestion(text, (a, b, c, d), correct,
+                                categories.setdefault(category, category), parse_difficulty(metadata[1]))
+
+    return compile_full_row
+
+
+def _read_dicts(f: TextIO, max_questions: Optional[int]) -> List[dict]:
+    questions: List[dict] = []
+    for row in csv.DictReader(f):
+        q = _normalize_row(row)
+        if not q['question']:
+            continue
+        questions.append(q)
+        if max_questions is not None and len(questions) >= max_questions:
+            break
+    return questions
+
+
+def _read_compiled(f: TextIO, max_questions: Optional[int]) -> List[CompiledQuestion]:
+    reader = csv.reader(f)
+    compile_row = row_compiler(next(reader, None) or [])
+    questions: List[CompiledQuestion] = []
+    for values in reader:
+        question = compile_row(values)
+        if question is None:
+            continue
+        questions.append(question)
+        if max_questions is not None and len(questions) >= max_questions:
+            break
+    return questions
+
+
 def load_questions(filenames: Union[str, List[str]] = 'data/questions.csv', max_questions: int = None) -> List[dict]:
     """Load questions from a filename or a list of candidate filenames.
 
+    Only the first candidate that yields questions is used; unreadable
+    candidates are reported and skipped. To merge several files into one
+    bank, see core.ingest.
+
     Returns a list of normalized question dicts with keys:
-      'question', 'A', 'B', 'C', 'D', 'answer'
+      'question', 'A', 'B', 'C', 'D', 'answer', 'category', 'difficulty'
+    ('' when the optional category / difficulty columns are absent)
     """
+    return _load_first(filenames, max_questions, _read_dicts)
+
+
+def load_compiled_questions(filenames: Union[str, List[str]] = 'data/questions.csv',
+                            max_questions: int = None) -> List[CompiledQuestion]:
+    """Same as compile_questions(load_questions(...)), without the row dicts.
+
+    Rows are compiled as they are read, so the whole bank never exists as
+    six-key dicts, not even while loading.
+    """
+    return _load_first(filenames, max_questions, _read_compiled)
+
+
+def _load_first(filenames: Union[str, List[str]], max_questions: Optional[int],
+                read: Callable[[TextIO, Optional[int]], list]) -> list:
     if isinstance(filenames, str):
         candidates = [filenames]
     else:
         candidates = list(filenames)
 
-    # Resolve relative filenames against the project root (parent of this core package)
-    project_root = Path(__file__).resolve().parent.parent
     for filename in candidates:
-        questions: List[dict] = []
+        candidate_path = resolve_path(filename)
         try:
-            candidate_path = Path(filename)
-            if not candidate_path.is_absolute():
-                candidate_path = (project_root / candidate_path).resolve()
-            with open(candidate_path, encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    q = _normalize_row(row)
-                    if not q['question']:
-                        continue
-                    questions.append(q)
-                    if max_questions is not None and len(questions) >= max_questions:
-                        break
+            # utf-8-sig: Excel's "CSV UTF-8" starts the file with a BOM
+            with open(candidate_path, encoding='utf-8-sig') as f:
+                questions = read(f, max_questions)
             if questions:
                 print(f"Loaded {len(questions)} questions from {candidate_path}")
                 return questions
+            print(f"No questions in {candidate_path}")
         except FileNotFoundError:
             continue
-        except Exception:
-            # ignore parse errors and try next candidate
+        except Exception as e:
+            # report, then try the next candidate
+            print(f"Cannot load questions from {candidate_path}: {e}")
             continue
 
     # nothing found or parsed
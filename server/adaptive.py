@@ -0,0 +1,437 @@
+import collections
+import hashlib
+import json
+import math
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from config.server_config import server_config
+from core.shared_logic import PERMUTATION_COUNT, CompiledQuestion, resolve_path
+from server.question_reload import BankVersion
+from server.ui_logger import ui_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: one server process, no lock needed
+    fcntl = None
+
+INITIAL_RATING = 1500.0
+PLAYER_K = 32.0  # rating points a player moves per fully unexpected result
+QUESTION_K = 16.0  # same for a question; smaller, questions are answered far more often
+MATCH_BAND = 50.0  # questions within this many points of the player count as a good match
+_RANDOM_TRIES = 8  # random picks inside the band before walking outward from the target
+
+BUCKET_POINTS = 8.0  # rating width of one RatingIndex bucket
+INDEX_CACHE_SIZE = 8  # rating indexes kept per engine (bank version x game filter)
+
+
+def expected_score(player: float, question: float) -> float:
+    """Elo probability that a player rated `player` answers a question rated `question`."""
+    return 1.0 / (1.0 + 10.0 ** ((question - player) / 400.0))
+
+
+def question_key(text: str) -> str:
+    """Stable id of a question across reloads and loaders: a hash of its text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _add(ratings: Dict[str, float], deltas: Dict[str, float], base: float = INITIAL_RATING) -> None:
+    for key, delta in deltas.items():
+        ratings[key] = ratings.get(key, base) + delta
+
+
+def _level(rating: float) -> int:
+    return math.floor(rating / BUCKET_POINTS)
+
+
+class RatingStore:
+    """Player and question ratings, persisted as JSON between games.
+
+    Rating changes are kept as deltas until the next save(). save() merges
+    them into whatever is on disk under an exclusive file lock, so worker
+    processes sharing the file add up their updates instead of overwriting
+    each other, and each picks up the others' ratings.
+
+    Args:
+        path: Ratings file; created on the first save
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = resolve_path(path)
+        self._lock = threading.Lock()
+        self._player_deltas: Dict[str, float] = {}
+        self._question_deltas: Dict[str, float] = {}
+        self._loaded_mtime: Optional[int] = None
+        self.players, self.questions = self._read()
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        self._loaded_mtime = self._mtime()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError) as e:
+            ui_logger.send_log(f'[ADAPTIVE] Cannot read {self.path}: {e}; starting from {INITIAL_RATING:.0f}')
+            return {}, {}
+        return dict(data.get('players', {})), dict(data.get('questions', {}))
+
+    def player(self, name: str) -> float:
+        return self.players.get(name, INITIAL_RATING)
+
+    def question(self, key: str) -> float:
+        return self.questions.get(key, INITIAL_RATING)
+
+    def update(self, player: str, key: str, expected: float, correct: bool) -> float:
+        """Apply one answer's Elo update.
+
+        Returns:
+            The question's new rating
+        """
+        surprise = (1.0 if correct else 0.0) - expected
+        with self._lock:
+            self.players[player] = self.players.get(player, INITIAL_RATING) + PLAYER_K * surprise
+            self._player_deltas[player] = self._player_deltas.get(player, 0.0) + PLAYER_K * surprise
+            rating = self.questions[key] = self.questions.get(key, INITIAL_RATING) - QUESTION_K * surprise
+            self._question_deltas[key] = self._question_deltas.get(key, 0.0) - QUESTION_K * surprise
+        return rating
+
+    def save(self) -> bool:
+        """Merge pending deltas into the file, then adopt the merged ratings.
+
+        Returns:
+            True if anything was written or re-read
+        """
+        with self._lock:
+            player_deltas, self._player_deltas = self._player_deltas, {}
+            question_deltas, self._question_deltas = self._question_deltas, {}
+        if not player_deltas and not question_deltas and self._mtime() == self._loaded_mtime:
+            return False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(f'{self.path}.lock', 'a') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                players, questions = self._read()
+                _add(players, player_deltas)
+                _add(questions, question_deltas)
+                if player_deltas or question_deltas:
+                    self._write(players, questions)
+        except BaseException:
+            with self._lock:
+                _add(self._player_deltas, player_deltas, 0.0)
+                _add(self._question_deltas, question_deltas, 0.0)
+            raise
+        with self._lock:
+            # Keep updates made while the file was being written
+            _add(players, self._player_deltas)
+            _add(questions, self._question_deltas)
+            self.players, self.questions = players, questions
+        return True
+
+    def _write(self, players: Dict[str, float], questions: Dict[str, float]) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=self.path.name, dir=self.path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'players': players, 'questions': questions}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._loaded_mtime = self._mtime()
+
+
+class RatingIndex:
+    """Questions of one pool bucketed by rating, for adaptive picks in O(band).
+
+    Positions are indexes into `pool`. A bucket holds the positions rated
+    within one BUCKET_POINTS-wide range, in no particular order, and every
+    position remembers its slot in its bucket: a re-rated question moves
+    to another bucket in O(1) (its slot is filled with the bucket's last
+    entry), so rating updates never shift the rest of the index and pick()
+    never waits behind one.
+
+    Args:
+        questions: Bank the pool indexes into
+        pool: Bank ids a game may ask
+        store: Source of the starting question ratings
+    """
+
+    def __init__(self, questions: Sequence[CompiledQuestion], pool: Sequence[int], store: RatingStore) -> None:
+        self.questions = questions
+        self.pool = pool
+        self._lock = threading.Lock()
+        count = len(pool)
+        self.ratings = array('d', [INITIAL_RATING]) * count
+        self._slots = array('I', range(count))
+        self._buckets: Dict[int, array] = {_level(INITIAL_RATING): array('I', range(count))} if count else {}
+        if store.questions:
+            # Only rated banks pay for hashing every question text
+            self._buckets = {}
+            for position, question_id in enumerate(pool):
+                rating = self.ratings[position] = store.question(question_key(questions[question_id].text))
+                self._insert(_level(rating), position)
+        levels = self._buckets.keys()
+        # Levels ever used; _nearest() walks no further
+        self._low, self._high = (min(levels), max(levels)) if levels else (0, -1)
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    def key(self, position: int) -> str:
+        return question_key(self.questions[self.pool[position]].text)
+
+    def pick(self, target: float, asked: Set[int]) -> int:
+        """A pool position rated close to `target` that is not in `asked`.
+
+        Random among the questions within MATCH_BAND of the target; if none
+        is left there, random around the nearest rating that is.
+        """
+        with self._lock:
+            position = self._pick_in_band(target, asked)
+            if position is None:
+                nearest = self._nearest(target, asked)
+                position = self._pick_in_band(self.ratings[nearest], asked)
+                if position is None:
+                    position = nearest
+        return position
+
+    def _pick_in_band(self, target: float, asked: Set[int]) -> Optional[int]:
+        buckets = []
+        for level in range(_level(target - MATCH_BAND), _level(target + MATCH_BAND) + 1):
+            bucket = self._buckets.get(level)
+            if bucket:
+                buckets.append(bucket)
+        total = sum(map(len, buckets))
+        ratings = self.ratings
+        # Uniform over the overlapping buckets, then rejected unless in the band:
+        # uniform over the questions within MATCH_BAND
+        for _ in range(_RANDOM_TRIES if total else 0):
+            i = random.randrange(total)
+            for bucket in buckets:
+                if i < len(bucket):
+                    break
+                i -= len(bucket)
+            position = bucket[i]
+            if position not in asked and abs(ratings[position] - target) <= MATCH_BAND:
+                return position
+        return None
+
+    def _nearest(self, target: float, asked: Set[int]) -> int:
+        """An unasked position from the non-empty bucket nearest to `target`."""
+        center = _level(target)
+        upper_first = target / BUCKET_POINTS - center >= 0.5
+        for distance in range(max(center - self._low, self._high - center) + 1):
+            levels = (center + distance, center - distance) if upper_first else (center - distance, center + distance)
+            for level in levels[:2 if distance else 1]:
+                # At most len(asked) + 1 entries are looked at
+                for position in self._buckets.get(level, ()):
+                    if position not in asked:
+                        return position
+        raise LookupError('every question in the pool was asked')
+
+    def update(self, position: int, rating: float) -> None:
+        with self._lock:
+            old, new = _level(self.ratings[position]), _level(rating)
+            self.ratings[position] = rating
+            if old != new:
+                self._remove(old, position)
+                self._insert(new, position)
+                self._low, self._high = min(self._low, new), max(self._high, new)
+
+    def _insert(self, level: int, position: int) -> None:
+        bucket = self._buckets.get(level)
+        if bucket is None:
+            bucket = self._buckets[level] = array('I')
+        self._slots[position] = len(bucket)
+        bucket.append(position)
+
+    def _remove(self, level: int, position: int) -> None:
+        bucket = self._buckets[level]
+        last = bucket.pop()
+        if last != position:
+            slot = self._slots[position]
+            bucket[slot] = last
+            self._slots[last] = slot
+        elif not bucket:
+            del self._buckets[level]
+
+
+class _Answer(NamedTuple):
+    index: RatingIndex
+    position: int
+    key: str  # question_key(), taken by the session while its bank version is live
+    player: str
+    expected: float
+    correct: bool
+
+
+class AdaptiveQuiz:
+    """One player's adaptive quiz: each question is chosen after the previous answer.
+
+    Duck-types QuizPlan for the session loops (count, turns(), record()).
+    The player's rating is tracked here with the same arithmetic the
+    background updater applies to the store, so choosing the next question
+    never waits for the store.
+    """
+
+    def __init__(self, engine: 'AdaptiveEngine', index: RatingIndex, player: str, count: int) -> None:
+        self.engine = engine
+        self.index = index
+        self.player = player
+        self.rating = engine.store.player(player)
+        self.count = count
+        self._asked: Set[int] = set()
+        self._pending: Optional[Tuple[int, float]] = None
+
+    def turns(self) -> Iterator[Tuple[int, int]]:
+        """Yield (pool position, option permutation id), one per answer recorded."""
+        for _ in range(self.count):
+            position = self.index.pick(self.rating, self._asked)
+            self._asked.add(position)
+            self._pending = position, expected_score(self.rating, self.index.ratings[position])
+            yield position, random.randrange(PERMUTATION_COUNT)
+
+    def record(self, correct: bool) -> None:
+        """Rate the answer to the last question; the store is updated in the background."""
+        if self._pending is None:
+            return
+        position, expected = self._pending
+        self._pending = None
+        self.rating += PLAYER_K * ((1.0 if correct else 0.0) - expected)
+        self.engine.submit(_Answer(self.index, position, self.index.key(position), self.player, expected, correct))
+
+
+class AdaptiveEngine:
+    """Adaptive question selection: rating indexes per bank version and filter,
+    plus the thread that applies rating updates in batches and saves them.
+
+    Args:
+        store: Persistent ratings
+        save_interval: Seconds between saves of changed ratings
+    """
+
+    def __init__(self, store: RatingStore, save_interval: float = server_config.RATINGS_SAVE_INTERVAL) -> None:
+        self.store = store
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # one index build at a time, without blocking lookups
+        # Most recently used last; an evicted index is rebuilt from the store's current ratings
+        self._indexes: 'collections.OrderedDict[Tuple[int, Sequence[int]], RatingIndex]' = collections.OrderedDict()
+        self._queue: 'queue.SimpleQueue[Optional[_Answer]]' = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='rating-updater', daemon=True)
+        self._thread.start()
+
+    def index(self, bank_version: BankVersion, pool: Sequence[int]) -> RatingIndex:
+        """The rating index of this bank version and game filter, built on first use.
+
+        Building reads (and, for a rated bank, hashes) every question of the
+        pool, so it runs outside the engine lock: sessions whose index exists
+        carry on meanwhile. Servers build it ahead of time when a bank loads.
+        """
+        key = (bank_version.version, pool)  # filtered pools are cached per filter by QuestionIndex
+        index = self._cached(key)
+        if index is not None:
+            return index
+        with self._build_lock:
+            index = self._cached(key)
+            if index is not None:
+                return index
+            started = time.perf_counter()
+            index = RatingIndex(bank_version.questions, pool, self.store)
+            with self._lock:
+                # Older bank versions keep their index only through running quizzes
+                for stale in [k for k in self._indexes if k[0] < bank_version.version]:
+                    del self._indexes[stale]
+                self._indexes[key] = index
+                while len(self._indexes) > INDEX_CACHE_SIZE:
+                    self._indexes.popitem(last=False)
+        ui_logger.send_log(f'[ADAPTIVE] Rated {len(index)} questions of bank v{bank_version.version} '
+                           f'in {(time.perf_counter() - started) * 1000:.0f} ms')
+        return index
+
+    def _cached(self, key: Tuple[int, Sequence[int]]) -> Optional[RatingIndex]:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+            return index
+
+    def start_quiz(self, bank_version: BankVersion, pool: Sequence[int], player: str, count: int) -> AdaptiveQuiz:
+        return AdaptiveQuiz(self, self.index(bank_version, pool), player, min(count, len(pool)))
+
+    def submit(self, answer: _Answer) -> None:
+        self._queue.put(answer)
+
+    def _apply(self, batch: List[_Answer]) -> None:
+        for answer in batch:
+            rating = self.store.update(answer.player, answer.key, answer.expected, answer.correct)
+            answer.index.update(answer.position, rating)
+
+    def _run(self) -> None:
+        saved_at = time.monotonic()
+        running = True
+        while running:
+            batch: List[_Answer] = []
+            try:
+                item = self._queue.get(timeout=self.save_interval)
+                while True:
+                    if item is None:
+                        running = False
+                        break
+                    batch.append(item)
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._apply(batch)
+                if not running or time.monotonic() - saved_at >= self.save_interval:
+                    saved_at = time.monotonic()
+                    self.store.save()
+            except Exception as e:
+                ui_logger.send_log(f'[ADAPTIVE] Rating update failed: {e}')
+
+    def stop(self) -> None:
+        """Apply queued answers, save, and end the updater thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+_engine: Optional[AdaptiveEngine] = None
+
+
+def enable(path: str = server_config.RATINGS_PATH,
+           save_interval: float = server_config.RATINGS_SAVE_INTERVAL) -> AdaptiveEngine:
+    """Switch this process to adaptive selection with ratings kept in `path`."""
+    global _engine
+    if _engine is None:
+        store = RatingStore(path)
+        _engine = AdaptiveEngine(store, save_interval)
+        ui_logger.send_log(f'[ADAPTIVE] Ratings for {len(store.players)} players and '
+                           f'{len(store.questions)} questions from {store.path}')
+    return _engine
+
+
+def engine() -> Optional[AdaptiveEngine]:
+    """The adaptive engine, or None when questions are sampled at random."""
+    return _engine
+
+
+def disable() -> None:
+    """Save pending ratings and go back to random selection."""
+    global _engine
+    if _engine is not None:
+        _engine.stop()
+        _engine = None
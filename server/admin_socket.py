@@ -0,0 +1,202 @@
+import argparse
+import json
+import math
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config.server_config import server_config
+from server.control import GameControl
+from server.ui_logger import ui_logger
+
+ADMIN_SOCKET_PATH = server_config.ADMIN_SOCKET_PATH
+MAX_COMMAND_LENGTH = 65536  # bytes per JSON command line
+
+
+def admin_socket_supported() -> bool:
+    return hasattr(socket, 'AF_UNIX')
+
+
+class AdminCommands:
+    """Line-delimited JSON admin API.
+
+    Each request is one JSON object with a "cmd" key, e.g.
+    {"cmd": "pause"}, {"cmd": "set_timeout", "seconds": 30} or
+    {"cmd": "set_filter", "filter": "category=geography, difficulty<=2"}. Each reply is
+    one JSON object with "ok" and either the result fields or "error".
+    Reads go through ui_logger.snapshot(), which only holds the state lock
+    while copying.
+    """
+
+    def __init__(self, control: GameControl) -> None:
+        self.control = control
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            'start': self._game_action(control.start),
+            'stop': self._game_action(control.stop),
+            'pause': self._game_action(control.pause),
+            'resume': self._game_action(control.resume),
+            'reset': self._game_action(control.reset),
+            'stats': lambda req: {'stats': ui_logger.get_statistics(), 'state': control.state},
+            'players': lambda req: {'players': ui_logger.snapshot()['players']},
+            'scoreboard': lambda req: {'scoreboard': ui_logger.get_scoreboard_rows()},
+            'snapshot': self._snapshot,
+            'set_timeout': self._set_timeout,
+            'set_filter': self._set_filter,
+            'help': lambda req: {'commands': sorted(self._handlers)},
+        }
+
+    def _game_action(self, action: Callable[[], bool]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        def handler(_request: Dict[str, Any]) -> Dict[str, Any]:
+            return {'changed': action(), 'state': self.control.state}
+        return handler
+
+    def _snapshot(self, _request: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = ui_logger.snapshot()
+        snapshot['state'] = self.control.state
+        return snapshot
+
+    def _set_timeout(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        seconds = float(request['seconds'])
+        if not (math.isfinite(seconds) and seconds > 0):
+            raise ValueError('seconds must be a finite number > 0')
+        ui_logger.set_question_timeout(seconds)
+        return {'question_timeout': seconds}
+
+    def _set_filter(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {'game_filter': self.control.set_game_filter(str(request.get('filter', '')))}
+
+    def execute(self, line: str) -> Dict[str, Any]:
+        """Run one command line and return the reply object."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('command must be a JSON object')
+            cmd = request.get('cmd')
+            handler = self._handlers.get(cmd)
+            if handler is None:
+                return {'ok': False, 'error': f'unknown command: {cmd!r}'}
+            return {'ok': True, **handler(request)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+
+
+class _AdminHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        commands: AdminCommands = self.server.commands
+        while True:
+            line = self.rfile.readline(MAX_COMMAND_LENGTH + 1)
+            if not line:
+                return
+            if len(line) > MAX_COMMAND_LENGTH:
+                reply = {'ok': False, 'error': 'command too long'}
+            elif not line.strip():
+                continue
+            else:
+                reply = commands.execute(line.decode('utf-8', errors='replace'))
+            try:
+                self.wfile.write((json.dumps(reply, ensure_ascii=False) + '\n').encode('utf-8'))
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class AdminServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start_admin_socket(path: str, control: GameControl) -> Optional[AdminServer]:
+    """Serve the admin API on a Unix socket from a daemon thread.
+
+    The socket file is created owner-only (0600). A stale file left by a
+    crashed server is replaced; a live one is left alone.
+
+    Returns:
+        The running server, or None if it could not be started.
+    """
+    if not admin_socket_supported():
+        ui_logger.send_log('Admin socket unavailable: this platform has no Unix domain sockets')
+        return None
+    if os.path.exists(path):
+        if _is_socket_alive(path):
+            ui_logger.send_log(f'Admin socket {path} is in use by another server; not starting')
+            return None
+        os.unlink(path)
+    old_umask = os.umask(0o177)
+    try:
+        server = AdminServer(path, _AdminHandler)
+    except OSError as e:
+        ui_logger.send_log(f'Admin socket failed to start on {path}: {e}')
+        return None
+    finally:
+        os.umask(old_umask)
+    server.commands = AdminCommands(control)
+    threading.Thread(target=server.serve_forever, name='admin-socket', daemon=True).start()
+    ui_logger.send_log(f'Admin socket listening on {path}')
+    return server
+
+
+def stop_admin_socket(server: Optional[AdminServer]) -> None:
+    if server is None:
+        return
+    server.shutdown()
+    server.server_close()
+    try:
+        if stat.S_ISSOCK(os.stat(server.server_address).st_mode):
+            os.unlink(server.server_address)
+    except OSError:
+        pass
+
+
+def _is_socket_alive(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def send_command(path: str, request: Dict[str, Any], timeout: float = 5.0) -> Dict[str, Any]:
+    """Send one command to a running server and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as f:
+            return json.loads(f.readline())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Send one command to the quiz server admin socket')
+    parser.add_argument('--socket', default=ADMIN_SOCKET_PATH, help='Admin socket path (default: %(default)s)')
+    parser.add_argument('cmd', help='start, stop, pause, resume, reset, stats, players, scoreboard, '
+                                    'snapshot, set_timeout, set_filter, help')
+    parser.add_argument('value', nargs='?',
+                        help='Seconds per question (set_timeout) or filter text (set_filter; omit to clear)')
+    args = parser.parse_args(argv)
+
+    request: Dict[str, Any] = {'cmd': args.cmd}
+    if args.cmd == 'set_filter':
+        request['filter'] = args.value or ''
+    elif args.value is not None:
+        try:
+            request['seconds'] = float(args.value)
+        except ValueError:
+            parser.error(f'seconds must be a number, got {args.value!r}')
+    try:
+        reply = send_command(args.socket, request)
+    except OSError as e:
+        print(f'Cannot reach admin socket {args.socket}: {e}', file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(reply, ensure_ascii=False, indent=2))
+    sys.exit(0 if reply.get('ok') else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+import asyncio
+import collections
+import time
+from typing import Any, Callable, Deque, Optional, Tuple, TypeVar
+
+from config.server_config import server_config
+from core.framing import FrameTooLongError, MessageDecoder
+from core.protocol import ClientMessage, NameRequest, parse_client_message
+from core.protocol_v2 import FrameBuilder, FrameDecoder
+from server.server import (
+    ACCEPT_TIMEOUT,
+    LISTEN_BACKLOG,
+    MSG_ERROR_NAME_TAKEN,
+    MSG_GAME_STARTED,
+    MSG_NAME_TAKEN,
+    MSG_SERVER_PAUSED,
+    QUESTION_TIMEOUT,
+    REGISTRY,
+    _evaluate_answer,
+    _finish_quiz,
+    _handle_disconnect_mid_quiz,
+    _handle_quiz_timeout,
+    _is_name_taken,
+    _log_start_skew,
+    _parse_answer,
+    accept_protocol,
+    select_question_pool,
+    shuffle_question_options,
+    start_quiz,
+)
+from server import metrics
+from server.outbound import AsyncConnection
+from server.question_reload import VersionedBank
+from server.timer_wheel import question_timers
+from server.ui_logger import ui_logger
+
+MAX_LINE_LENGTH = server_config.MAX_LINE_LENGTH
+READ_CHUNK_SIZE = 65536  # bytes per StreamReader.read()
+
+T = TypeVar('T')
+
+
+class StateBroadcast:
+    """Wake every coroutine waiting for a game state change at once.
+
+    Each notify() sets the current event and swaps in a fresh one, so waiters
+    never miss a transition and never need to poll.
+    """
+
+    def __init__(self) -> None:
+        self._event: Optional[asyncio.Event] = None
+
+    def _current(self) -> asyncio.Event:
+        if self._event is None:
+            self._event = asyncio.Event()
+        return self._event
+
+    def notify(self) -> None:
+        event = self._current()
+        self._event = asyncio.Event()
+        event.set()
+
+    async def wait(self) -> None:
+        await self._current().wait()
+
+
+STATE_BROADCAST = StateBroadcast()
+
+
+class AsyncMessageReader:
+    """Typed client messages from a StreamReader, via the shared MessageDecoder.
+
+    Reads whatever bytes are available and lets the decoder frame and parse
+    them, so the event loop uses the same hot path as the thread engine.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, max_line_length: int = MAX_LINE_LENGTH) -> None:
+        self._reader = reader
+        self._decoder = MessageDecoder(parse_client_message, max_line_length)
+        self._ready: Deque[ClientMessage] = collections.deque()
+        self._eof = False
+
+    async def read_message(self) -> Optional[ClientMessage]:
+        """Return the next parsed message, or None on EOF / oversized line."""
+        while not self._ready:
+            if self._eof:
+                return None
+            try:
+                data = await self._reader.read(READ_CHUNK_SIZE)
+            except (ConnectionError, OSError):
+                data = b''
+            if not data:
+                self._eof = True
+                return self._decoder.flush()
+            try:
+                self._ready.extend(self._decoder.feed(data))
+            except FrameTooLongError:
+                # Line longer than MAX_LINE_LENGTH: treat as a protocol violation
+                self._eof = True
+        return self._ready.popleft()
+
+    def switch_decoder(self, decoder) -> None:
+        """Continue with another decoder; unframed bytes are handed over."""
+        leftover = self._decoder.detach()
+        self._decoder = decoder
+        if leftover:
+            try:
+                self._ready.extend(decoder.feed(leftover))
+            except FrameTooLongError:
+                self._eof = True
+
+
+async def _off_loop_if_coordinated(func: Callable[..., T], *args: Any) -> T:
+    """Call func(*args), on the default executor in a worker process.
+
+    There the handshake's ui_logger calls are blocking round trips to the
+    master; running them off the loop keeps every other connection of this
+    worker moving meanwhile. In a single process they are plain lock-protected
+    lookups and run inline.
+    """
+    if not ui_logger.is_coordinated():
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def perform_name_handshake_async(
+    reader: AsyncMessageReader,
+    conn: AsyncConnection,
+    addr: Tuple
+) -> Optional[str]:
+    """Coroutine version of server.perform_name_handshake.
+
+    Returns:
+        player_name if successful, None if rejected or disconnected.
+    """
+    started = time.perf_counter()
+    game_state = ui_logger.get_game_state()
+
+    if game_state == 'STARTED':
+        metrics.REJECTS.labels('game_started').inc()
+        ui_logger.send_log(f'[REJECT] Client {addr}: Game already started')
+        conn.send(MSG_GAME_STARTED)
+        await asyncio.sleep(0.5)
+        return None
+
+    if game_state != 'NOT_STARTED':
+        metrics.REJECTS.labels('paused').inc()
+        ui_logger.send_log(f'[REJECT] Client {addr}: Invalid state {game_state}')
+        conn.send(MSG_SERVER_PAUSED)
+        await asyncio.sleep(0.5)
+        return None
+
+    while True:
+        message = await reader.read_message()
+        if message is None:
+            metrics.REJECTS.labels('disconnected').inc()
+            ui_logger.send_log(f"Client {addr} disconnected before naming")
+            return None
+
+        if not isinstance(message, NameRequest):
+            continue
+
+        name = message.name
+        taken = bool(name) and await _off_loop_if_coordinated(_is_name_taken, name)
+
+        if not name or taken:
+            if taken:
+                metrics.REJECTS.labels('name_taken').inc()
+                ui_logger.send_log(f'[LOBBY] Name rejected (already in use): {name}')
+                conn.send(MSG_ERROR_NAME_TAKEN)
+            else:
+                metrics.REJECTS.labels('empty_name').inc()
+                conn.send(MSG_NAME_TAKEN)
+            ui_logger.update_active_players(REGISTRY.list_names())
+            ui_logger.send_log('Active names: ' + str(REGISTRY.list_names()))
+            continue
+
+        if not await _off_loop_if_coordinated(ui_logger.add_to_waiting_room, name):
+            current_state = ui_logger.get_game_state()
+            metrics.REJECTS.labels('game_started' if current_state == 'STARTED' else 'paused').inc()
+            ui_logger.send_log(f'[REJECT] {name} rejected: state is now {current_state}')
+            if current_state == 'STARTED':
+                conn.send(MSG_GAME_STARTED)
+            else:
+                conn.send(MSG_SERVER_PAUSED)
+            await asyncio.sleep(0.5)
+            return None
+
+        conn.name = name
+        # Negotiate before REGISTRY.add so a broadcast never sees the old
+        # builder after NAME_OK|2 went out
+        conn.send(accept_protocol(conn, message))
+        if conn.builder is FrameBuilder:
+            reader.switch_decoder(FrameDecoder(parse_client_message, MAX_LINE_LENGTH))
+        REGISTRY.add(name, conn)
+        metrics.HANDSHAKE_SECONDS.observe(time.perf_counter() - started)
+        ui_logger.send_log(f'[WAITING ROOM] {name} added - waiting for game START')
+        ui_logger.mark_started(name)
+        ui_logger.update_active_players(REGISTRY.list_names())
+        ui_logger.send_log('Active names: ' + str(REGISTRY.list_names()))
+        return name
+
+
+async def run_quiz_session_async(
+    reader: AsyncMessageReader,
+    conn: AsyncConnection,
+    player_name: str,
+    bank: VersionedBank
+) -> None:
+    """Coroutine version of server.run_quiz_session."""
+    ui_logger.send_log(f'[WAITING] {player_name} waiting for game to START...')
+    game_state = ui_logger.get_game_state()
+    while game_state == 'NOT_STARTED' and not ui_logger.is_shutdown_requested():
+        await STATE_BROADCAST.wait()
+        game_state = ui_logger.get_game_state()
+
+    if game_state != 'STARTED':
+        ui_logger.send_log(f'[ABORT] {player_name} cannot start quiz, game state: {game_state}')
+        return
+
+    with bank.session() as bank_version:
+        questions = bank_version.questions
+        pool, _fell_back = select_question_pool(bank_version)
+        plan = start_quiz(bank_version, pool, player_name)
+
+        total = plan.count
+        score = 0
+
+        ui_logger.set_player_status(player_name, 'in_quiz')
+
+        try:
+            for idx, (question_id, perm_id) in enumerate(plan.turns()):
+                qid = str(idx)
+                question = questions[pool[question_id]]
+                correct, shuffled_opts = shuffle_question_options(question, perm_id)
+
+                conn.send(conn.builder.question_frame(qid, question.text, shuffled_opts))
+                conn.uncork()
+                if idx == 0:
+                    _log_start_skew(player_name)
+
+                timeout = ui_logger.get_question_timeout(QUESTION_TIMEOUT)
+                deadline = question_timers.schedule(timeout, conn.interrupt_read)
+                asked_at = time.perf_counter()
+                read = asyncio.create_task(reader.read_message())
+                conn.watch_read(read)
+                try:
+                    message = await read
+                except asyncio.CancelledError:
+                    if not deadline.fired:
+                        raise  # the session itself is being cancelled
+                    message = None
+                finally:
+                    conn.watch_read(None)
+                    question_timers.cancel(deadline)
+                if deadline.fired:
+                    conn.send(conn.builder.score_frame(score, max(idx, 1)))
+                    _handle_quiz_timeout(player_name, score, idx, timeout)
+                    return
+
+                if message is None:
+                    _handle_disconnect_mid_quiz(player_name, score, idx, total, conn)
+                    return
+                metrics.ANSWER_SECONDS.observe(time.perf_counter() - asked_at)
+
+                conn.cork()
+                is_valid, given, matches_qid = _parse_answer(message, qid)
+                is_correct = _evaluate_answer(is_valid, matches_qid, given, correct, conn)
+                if is_correct:
+                    score += 1
+                plan.record(is_correct)
+
+            _finish_quiz(player_name, score, total, conn, 'done')
+
+        except Exception as e:
+            ui_logger.send_log(f"Error in quiz session for {player_name}: {e}")
+            questions_attempted = score + 1
+            conn.send(conn.builder.score_frame(score, questions_attempted))
+            conn.uncork()
+            ui_logger.update_scoreboard(player_name, score, questions_attempted, status='error')
+            ui_logger.set_player_status(player_name, 'error')
+            ui_logger.mark_finished(player_name)
+
+
+async def handle_client_async(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    bank: VersionedBank
+) -> None:
+    """Handle a single client connection through the full lifecycle."""
+    addr = writer.get_extra_info('peername')
+    ui_logger.send_log(f"Client connected: {addr}")
+    metrics.CONNECTIONS.inc()
+    metrics.ACTIVE_CONNECTIONS.inc()
+    player_name = None
+    conn = AsyncConnection(writer, addr)
+
+    try:
+        messages = AsyncMessageReader(reader)
+        player_name = await perform_name_handshake_async(messages, conn, addr)
+        if not player_name:
+            return
+
+        await run_quiz_session_async(messages, conn, player_name, bank)
+
+    except asyncio.CancelledError:
+        # Event loop shutting down with this client still connected
+        conn.abort()
+    except Exception as e:
+        ui_logger.send_log(f"Error with client {addr}: {e}")
+    finally:
+        try:
+            await conn.aclose()
+        except asyncio.CancelledError:
+            pass
+        metrics.ACTIVE_CONNECTIONS.dec()
+
+        if player_name:
+            ui_logger.send_log(f'{player_name} disconnected (name still reserved)')
+
+
+async def serve(bank: VersionedBank, host: str, port: int, reuse_port: bool = False) -> None:
+    """Accept clients on one event loop until shutdown is requested."""
+    loop = asyncio.get_running_loop()
+
+    def on_state_change(_state: str) -> None:
+        loop.call_soon_threadsafe(STATE_BROADCAST.notify)
+
+    ui_logger.add_state_listener(on_state_change)
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_client_async(r, w, bank),
+        host,
+        port,
+        limit=MAX_LINE_LENGTH,
+        backlog=LISTEN_BACKLOG,
+        reuse_address=True,
+        reuse_port=reuse_port or None,
+    )
+    ui_logger.send_log(f"Quiz server listening on {host}:{port} (asyncio)")
+
+    try:
+        async with server:
+            while not ui_logger.is_shutdown_requested():
+                await asyncio.sleep(ACCEPT_TIMEOUT)
+    finally:
+        ui_logger.remove_state_listener(on_state_change)
+
+
+def start_async_server(bank: VersionedBank, host: str, port: int, reuse_port: bool = False) -> None:
+    """Run the asyncio engine in the calling thread until shutdown."""
+    try:
+        asyncio.run(serve(bank, host, port, reuse_port))
+    except KeyboardInterrupt:
+        ui_logger.send_log('KeyboardInterrupt received, shutting down')
+    finally:
+        ui_logger.send_log('Server main loop exiting')
@@ -0,0 +1,159 @@
+import sys
+import threading
+from typing import Any, Callable, Dict
+
+from server.ui_logger import ui_logger
+
+
+class GameControl:
+    """START/STOP/PAUSE/RESET without a GUI.
+
+    Mirrors the dashboard buttons (_on_start_game, _on_stop_game,
+    _on_pause_game, _on_reset_scores) on top of ui_logger, so a headless
+    server can be driven from a console or any other non-Tk front end.
+    Pause is STOP that remembers it can be resumed, exactly as on the
+    dashboard.
+    """
+
+    def __init__(self, name_registry=None) -> None:
+        self.name_registry = name_registry
+        self._lock = threading.Lock()
+        self._paused = False
+
+    @property
+    def state(self) -> str:
+        """'running', 'paused' or 'stopped'."""
+        with self._lock:
+            if ui_logger.is_server_running():
+                self._paused = False
+                return 'running'
+            return 'paused' if self._paused else 'stopped'
+
+    def start(self) -> bool:
+        if self.state == 'running':
+            ui_logger.send_log('⚠️ Game is already running')
+            return False
+        ui_logger.set_server_running(True)
+        ui_logger.send_log('🎮 Game started by admin')
+        return True
+
+    def stop(self) -> bool:
+        if self.state == 'stopped':
+            ui_logger.send_log('⚠️ Game is already stopped')
+            return False
+        ui_logger.set_server_running(False)
+        with self._lock:
+            self._paused = False
+        ui_logger.send_log('🛑 Game stopped by admin')
+        return True
+
+    def pause(self) -> bool:
+        if self.state != 'running':
+            ui_logger.send_log('⚠️ Cannot pause - game is not running')
+            return False
+        ui_logger.set_server_running(False)
+        with self._lock:
+            self._paused = True
+        ui_logger.send_log('⏸ Game paused by admin')
+        return True
+
+    def resume(self) -> bool:
+        if self.state != 'paused':
+            ui_logger.send_log('⚠️ Cannot resume - game is not paused')
+            return False
+        ui_logger.set_server_running(True)
+        ui_logger.send_log('▶ Game resumed by admin')
+        return True
+
+    def set_game_filter(self, text: str) -> str:
+        """Filter the questions of quizzes starting from now on; '' or 'none' clears it.
+
+        Raises:
+            ValueError: If the filter text is invalid
+        """
+        if text.strip().lower() == 'none':
+            text = ''
+        return str(ui_logger.set_game_filter(text))
+
+    def reset(self) -> bool:
+        if self.state != 'stopped':
+            self.stop()
+        ui_logger.reset_scores_and_names(self.name_registry)
+        ui_logger.send_log('🔄 Scores and game state reset')
+        return True
+
+
+def _print_stats(control: GameControl) -> None:
+    print(f'state: {control.state}')
+    for key, value in ui_logger.get_statistics().items():
+        print(f'  {key}: {value}')
+
+
+def _print_scores(_control: GameControl) -> None:
+    rows = ui_logger.get_scoreboard_rows()
+    if not rows:
+        print('  (no scores yet)')
+    for row in rows:
+        print(f"  {row['name']:<20} {row['score']}/{row['total']}  {row['status']}")
+
+
+def _filter(control: GameControl, text: str) -> None:
+    if text:
+        control.set_game_filter(text)
+    print(f'filter: {ui_logger.get_game_filter() or "none (whole bank)"}')
+
+
+def run_console(control: GameControl, stream=None) -> None:
+    """Read operator commands line by line until EOF, 'quit' or shutdown.
+
+    Commands: start, stop, pause, resume, reset, stats, scores, help, quit,
+    and "filter [FILTER]" to show or set the question filter of the next
+    games ("filter none" clears it).
+    """
+    stream = stream or sys.stdin
+    commands: Dict[str, Callable[[GameControl], Any]] = {
+        'start': GameControl.start,
+        'stop': GameControl.stop,
+        'pause': GameControl.pause,
+        'resume': GameControl.resume,
+        'reset': GameControl.reset,
+        'stats': _print_stats,
+        'scores': _print_scores,
+    }
+    # Commands followed by free text, e.g. "filter category=geography"
+    text_commands: Dict[str, Callable[[GameControl, str], Any]] = {
+        'filter': _filter,
+    }
+    names = ', '.join([*commands, *text_commands])
+    print(f'Headless console ready. Commands: {names}, help, quit')
+    while not ui_logger.is_shutdown_requested():
+        line = stream.readline()
+        if not line:
+            # EOF (e.g. stdin is /dev/null under a service manager): keep
+            # serving, the operator just has no console
+            return
+        command, _, text = line.strip().partition(' ')
+        command = command.lower()
+        if not command:
+            continue
+        if command in ('quit', 'exit'):
+            ui_logger.request_shutdown()
+            return
+        try:
+            if command in text_commands:
+                text_commands[command](control, text.strip())
+                continue
+            handler = commands.get(command)
+            if handler is None or text:
+                print(f'Commands: {names}, help, quit')
+                continue
+            handler(control)
+        except Exception as e:
+            ui_logger.send_log(f'Console command {command!r} failed: {e}')
+
+
+def start_console(control: GameControl, stream=None) -> threading.Thread:
+    """Run the operator console on a daemon thread."""
+    thread = threading.Thread(target=run_console, args=(control, stream), name='console', daemon=True)
+    thread.start()
+    return thread
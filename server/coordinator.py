@@ -0,0 +1,197 @@
+import queue
+import threading
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple
+
+from server.metrics import METRICS
+from server.ui_logger import UILogger
+
+
+class GameCoordinator:
+    """Authoritative game state shared by every worker process.
+
+    Lives in the master process next to the real ui_logger (and dashboard);
+    workers reach it through a CoordinatorManager proxy. It keeps the
+    UILogger game-state semantics global:
+      - START/STOP/shutdown are published with a version counter that
+        workers long-poll through wait_for_change()
+      - name uniqueness and the waiting-room check happen atomically here
+      - scoreboard / player updates from workers are applied in batches
+
+    It also implements the NameRegistry subset the dashboard uses
+    (clear_all, list_names, get_queue_depths), so the dashboard can be handed
+    the coordinator instead of a local registry.
+    """
+
+    # Methods a worker may invoke through apply_batch()
+    _POSTABLE = frozenset({
+        'send_log', 'set_player_status', 'update_scoreboard', 'mark_started',
+        'mark_finished', 'record_start_skew', 'report_queue_depths', 'report_metrics',
+        'set_question_bank',
+    })
+
+    def __init__(self, logger: UILogger) -> None:
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._version = 0
+        self._reset_epoch = 0
+        self._names: set[str] = set()
+        self._queue_depths: Dict[int, Dict[str, int]] = {}
+        logger.add_state_listener(self._on_state_change)
+
+    def _on_state_change(self, _state: str) -> None:
+        with self._lock:
+            self._version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float) -> Tuple:
+        """Long-poll for a state change newer than `version`.
+
+        Returns:
+            (version, reset_epoch, game_state, shutdown, question_timeout, started_at, game_filter)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+            version, epoch = self._version, self._reset_epoch
+        return (version, epoch) + self._logger.get_state_snapshot()
+
+    def join_waiting_room(self, name: str) -> bool:
+        """Reserve a name and add it to the waiting room in one step."""
+        with self._lock:
+            if name in self._names:
+                return False
+            if not self._logger.add_to_waiting_room(name):
+                return False
+            self._names.add(name)
+            return True
+
+    def is_name_reserved(self, name: str) -> bool:
+        with self._lock:
+            return name in self._names
+
+    def apply_batch(self, ops: List[Tuple[str, Tuple[Any, ...]]]) -> None:
+        """Apply fire-and-forget updates posted by a worker, in order."""
+        for method, args in ops:
+            if method in self._POSTABLE:
+                try:
+                    getattr(self, method)(*args)
+                except Exception as e:
+                    self._logger.send_log(f'Coordinator: {method} failed: {e}')
+
+    # Forwarded UILogger updates
+    def send_log(self, message: str) -> None:
+        self._logger.send_log(message)
+
+    def set_player_status(self, name: str, status: str) -> None:
+        self._logger.set_player_status(name, status)
+
+    def update_scoreboard(self, name: str, score: int, total: int, status: str = 'done') -> None:
+        self._logger.update_scoreboard(name, score, total, status)
+
+    def mark_started(self, name: str) -> None:
+        self._logger.mark_started(name)
+
+    def mark_finished(self, name: str) -> None:
+        self._logger.mark_finished(name)
+
+    def record_start_skew(self, name: str, at: float) -> None:
+        self._logger.record_start_skew(name, at)
+
+    def set_question_bank(self, version: int, count: int, load_seconds: float) -> None:
+        self._logger.set_question_bank(version, count, load_seconds)
+
+    def report_queue_depths(self, worker_id: int, depths: Dict[str, int]) -> None:
+        with self._lock:
+            self._queue_depths[worker_id] = depths
+
+    def report_metrics(self, worker_id: int, families: List[Tuple]) -> None:
+        METRICS.report_remote(worker_id, families)
+
+    # NameRegistry interface for the dashboard
+    def clear_all(self) -> None:
+        """Release every name; workers clear their local registries too."""
+        with self._lock:
+            self._names.clear()
+            self._queue_depths.clear()
+            self._reset_epoch += 1
+            self._version += 1
+            self._changed.notify_all()
+
+    def list_names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._names)
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        with self._lock:
+            merged: Dict[str, int] = {}
+            for depths in self._queue_depths.values():
+                merged.update(depths)
+            return merged
+
+
+_coordinator: Optional[GameCoordinator] = None
+
+
+def _get_coordinator() -> GameCoordinator:
+    return _coordinator
+
+
+class CoordinatorManager(BaseManager):
+    """multiprocessing manager serving the GameCoordinator to workers."""
+
+
+CoordinatorManager.register('coordinator', callable=_get_coordinator)
+
+
+def serve_coordinator(coordinator: GameCoordinator, authkey: bytes) -> Tuple[str, int]:
+    """Serve `coordinator` from this process on a loopback port.
+
+    Returns:
+        The address workers should connect to.
+    """
+    global _coordinator
+    _coordinator = coordinator
+    manager = CoordinatorManager(address=('127.0.0.1', 0), authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, name='coordinator', daemon=True).start()
+    return server.address
+
+
+class CoordinatorLink:
+    """Worker-side connection to the coordinator.
+
+    post() queues an update and returns immediately; a single uplink thread
+    ships queued updates in batches, so session threads and the event loop
+    never wait on the master for scoreboard or log traffic. call() is a
+    synchronous round trip, used only where an answer is needed (joining).
+    """
+
+    MAX_BATCH = 256
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes) -> None:
+        manager = CoordinatorManager(address=address, authkey=authkey)
+        manager.connect()
+        self._proxy = manager.coordinator()
+        self._outbox: queue.SimpleQueue = queue.SimpleQueue()
+        threading.Thread(target=self._uplink, name='coordinator-uplink', daemon=True).start()
+
+    def call(self, method: str, *args: Any) -> Any:
+        return getattr(self._proxy, method)(*args)
+
+    def post(self, method: str, *args: Any) -> None:
+        self._outbox.put((method, args))
+
+    def _uplink(self) -> None:
+        while True:
+            batch = [self._outbox.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._proxy.apply_batch(batch)
+            except Exception as e:
+                print(f'[WORKER] Lost connection to coordinator: {e}')
+                return
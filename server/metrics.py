@@ -0,0 +1,240 @@
+import abc
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from server.ui_logger import ui_logger
+
+# One exported sample: (sample name, ((label, value), ...), value)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+# One metric family: (name, type, help, samples)
+Family = Tuple[str, str, str, List[Sample]]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric(abc.ABC):
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], '_Metric'] = {}
+
+    def labels(self, *values: str) -> '_Metric':
+        """Child metric for one label combination (cache it on hot paths)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> '_Metric':
+        return type(self)(self.name, self.help)
+
+    def _label_pairs(self, key: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        if not self.labelnames:
+            return self._own_samples(())
+        out: List[Sample] = []
+        for key, child in sorted(self._children.items()):
+            out.extend(child._own_samples(self._label_pairs(key)))
+        return out
+
+    @abc.abstractmethod
+    def _own_samples(self, labels: Tuple[Tuple[str, str], ...]) -> List[Sample]:
+        """Samples of this (unlabelled or child) metric under `labels`."""
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def _own_samples(self, labels):
+        return [(self.name, labels, self._value)]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = float(value)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+
+    def _new_child(self) -> 'Histogram':
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def _own_samples(self, labels):
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+        out: List[Sample] = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            out.append((f'{self.name}_bucket', labels + (('le', le),), cumulative))
+        out.append((f'{self.name}_sum', labels, total_sum))
+        out.append((f'{self.name}_count', labels, cumulative))
+        return out
+
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in Prometheus text exposition format.
+
+    Recording is a lock-protected add; nothing is formatted until a scrape
+    calls render(), so an unscraped server pays almost nothing.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+        self._remote: Dict[int, List[Family]] = {}  # worker_id -> last collect()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def collect(self) -> List[Family]:
+        """Plain-data copy of every metric (picklable, for worker reports)."""
+        return [(m.name, m.kind, m.help, m.samples()) for m in self._metrics]
+
+    def report_remote(self, worker_id: int, families: List[Family]) -> None:
+        """Store the latest collect() of a worker process for aggregation."""
+        with self._lock:
+            self._remote[worker_id] = families
+
+    def clear_remote(self) -> None:
+        with self._lock:
+            self._remote.clear()
+
+    def render(self) -> str:
+        """Text exposition of local metrics plus the sum over worker reports."""
+        with self._lock:
+            reports = [self.collect()] + list(self._remote.values())
+        merged: Dict[str, Tuple[str, str, Dict[Tuple[str, tuple], float]]] = {}
+        for families in reports:
+            for name, kind, help_text, samples in families:
+                _, _, values = merged.setdefault(name, (kind, help_text, {}))
+                for sample_name, labels, value in samples:
+                    key = (sample_name, labels)
+                    values[key] = values.get(key, 0.0) + value
+        lines: List[str] = []
+        for name, (kind, help_text, values) in merged.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (sample_name, labels), value in values.items():
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+METRICS = MetricsRegistry()
+
+CONNECTIONS = METRICS.counter('quiz_connections_total', 'Client connections accepted')
+ACTIVE_CONNECTIONS = METRICS.gauge('quiz_connections_active', 'Client connections currently open')
+REJECTS = METRICS.counter('quiz_handshake_rejects_total', 'Handshake rejections by reason', ('reason',))
+ANSWERS = METRICS.counter('quiz_answers_total', 'Answers evaluated by result', ('result',))
+TIMEOUTS = METRICS.counter('quiz_question_timeouts_total', 'Sessions ended by a question deadline')
+DISCONNECTS = METRICS.counter('quiz_disconnects_total', 'Players who disconnected mid-quiz')
+HANDSHAKE_SECONDS = METRICS.histogram('quiz_handshake_seconds', 'Connect to NAME_OK duration')
+ANSWER_SECONDS = METRICS.histogram('quiz_answer_latency_seconds', 'QUESTION sent to answer received')
+SEND_SECONDS = METRICS.histogram('quiz_send_seconds', 'Time to write one outbound batch to the socket')
+SEND_BATCH_FRAMES = METRICS.histogram('quiz_send_batch_frames', 'Frames per socket write (count = writes)',
+                                      buckets=(1, 2, 3, 4, 6, 8, 16, 32, 64))
+
+# Hot-path children, resolved once
+ANSWERS_RIGHT = ANSWERS.labels('right')
+ANSWERS_WRONG = ANSWERS.labels('wrong')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = METRICS.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start_metrics_server(host: str, port: int) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics over HTTP from a daemon thread.
+
+    Returns:
+        The running server, or None if the port could not be bound.
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        ui_logger.send_log(f'Metrics endpoint failed to start on {host}:{port}: {e}')
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    ui_logger.send_log(f'Metrics available at http://{host}:{port}/metrics')
+    return server
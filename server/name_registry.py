@@ -40,3 +40,9 @@ class NameRegistry:
         """Get all active socket connections."""
         with self._lock:
             return list(self._names.values())
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Get pending outbound messages per player name."""
+        with self._lock:
+            items = list(self._names.items())
+        return {name: conn.queue_depth() for name, conn in items}
@@ -0,0 +1,336 @@
+import abc
+import asyncio
+import collections
+import queue
+import socket
+import threading
+import time
+from typing import Any, Deque, List, Optional, Tuple, Union
+
+from config.server_config import server_config
+from core.network_utils import MAX_BATCH_FRAMES, close_socket_safely, get_send_observer, send_frames
+from core.protocol import MessageBuilder
+from server import metrics
+from server.ui_logger import ui_logger
+
+OVERFLOW_POLICIES = ('disconnect', 'drop')
+
+_defaults = {
+    'max_queue': server_config.OUTBOUND_QUEUE_SIZE,
+    'overflow_policy': server_config.OUTBOUND_OVERFLOW_POLICY,
+    'coalesce': server_config.OUTBOUND_COALESCE,
+}
+FLUSH_TIMEOUT = server_config.OUTBOUND_FLUSH_TIMEOUT
+
+
+def configure(max_queue: Optional[int] = None, overflow_policy: Optional[str] = None,
+              coalesce: Optional[bool] = None) -> None:
+    """Override queue size / overflow policy / coalescing for connections created afterwards."""
+    if max_queue is not None:
+        if max_queue < 1:
+            raise ValueError('max_queue must be >= 1')
+        _defaults['max_queue'] = int(max_queue)
+    if overflow_policy is not None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'overflow_policy must be one of {OVERFLOW_POLICIES}')
+        _defaults['overflow_policy'] = overflow_policy
+    if coalesce is not None:
+        _defaults['coalesce'] = bool(coalesce)
+
+
+def _encode(message: Union[str, bytes]) -> bytes:
+    if isinstance(message, bytes):
+        return message
+    return (message.rstrip('\n') + '\n').encode('utf-8')
+
+
+def _add_frames(frames: List[bytes], item: Union[str, bytes, Tuple[bytes, ...]]) -> None:
+    """Append one queue item (a message or an uncorked batch) as frames."""
+    if isinstance(item, tuple):
+        frames.extend(item)
+    else:
+        frames.append(_encode(item))
+
+
+class ClientConnection(abc.ABC):
+    """Outbound side of one client connection.
+
+    send() only appends to a bounded per-connection queue, so it is O(1) and
+    never blocks the caller (session, dashboard or broadcast). An engine
+    specific subclass drains the queue to the socket. When the queue is full
+    the overflow policy applies:
+      - 'disconnect': the slow client is dropped
+      - 'drop': the message is discarded and the client stays connected
+
+    With coalescing on, writers send everything queued at once as a single
+    vectored write, and cork() / uncork() let a session group the frames
+    of one turn (EVAL, then the next QUESTION) into one write explicitly.
+    """
+
+    def __init__(self, addr: Any, max_queue: Optional[int] = None, overflow_policy: Optional[str] = None) -> None:
+        self.addr = addr
+        self.name: Optional[str] = None
+        self.max_queue = max_queue or _defaults['max_queue']
+        self.overflow_policy = overflow_policy or _defaults['overflow_policy']
+        self.coalesce = _defaults['coalesce']
+        self.closed = False
+        self.dropped = 0
+        self._corked: Optional[List[bytes]] = None
+        self._cork_lock = threading.Lock()
+        # Frame builder for the negotiated wire format; the handshake swaps in
+        # core.protocol_v2.FrameBuilder for v2 clients
+        self.builder = MessageBuilder
+
+    @property
+    def label(self) -> str:
+        return self.name or str(self.addr)
+
+    @abc.abstractmethod
+    def queue_depth(self) -> int:
+        """Queued items not yet written."""
+
+    def send(self, line: Union[str, bytes]) -> bool:
+        """Queue one protocol line for this client.
+
+        `line` is either a str or a pre-encoded frame (bytes from
+        self.builder, see core.protocol.MessageBuilder); frames are written
+        as is.
+
+        Returns:
+            True if queued, False if the connection is closed or overflowed.
+        """
+        if self.closed:
+            return False
+        if self._corked is not None:
+            with self._cork_lock:
+                if self._corked is not None:
+                    self._corked.append(_encode(line))
+                    return True
+        if self._enqueue(line):
+            return True
+        self._on_overflow()
+        return False
+
+    def cork(self) -> None:
+        """Hold sends until uncork(), which queues them as one batch.
+
+        A no-op when coalescing is off.
+        """
+        if self.coalesce:
+            with self._cork_lock:
+                if self._corked is None:
+                    self._corked = []
+
+    def uncork(self) -> bool:
+        """Queue the frames held since cork() as one write."""
+        with self._cork_lock:
+            batch, self._corked = self._corked, None
+        if not batch or self.closed:
+            return not self.closed
+        if self._enqueue(batch[0] if len(batch) == 1 else tuple(batch)):
+            return True
+        self._on_overflow()
+        return False
+
+    @abc.abstractmethod
+    def abort(self) -> None:
+        """Drop the connection immediately, discarding pending output."""
+
+    @abc.abstractmethod
+    def interrupt_read(self) -> None:
+        """Make the session's pending read return EOF (used by deadlines).
+
+        The write side stays open so a final SCORE can still be delivered.
+        """
+
+    @abc.abstractmethod
+    def _enqueue(self, line: Union[str, bytes]) -> bool:
+        """Append to the engine's queue without blocking; False when full."""
+
+    def _on_overflow(self) -> None:
+        if self.overflow_policy == 'drop':
+            self.dropped += 1
+            if self.dropped == 1:
+                ui_logger.send_log(f'[OUTBOUND] {self.label}: queue full, dropping messages')
+            return
+        ui_logger.send_log(
+            f'[OUTBOUND] {self.label}: queue full ({self.max_queue}), disconnecting slow client'
+        )
+        self.abort()
+
+
+class ThreadedConnection(ClientConnection):
+    """Connection drained by a dedicated writer thread (thread engine).
+
+    This doubles the thread engine's thread count (a session thread and a
+    writer per client), which is what keeps a broadcast from ever blocking
+    on one slow socket; use the asyncio engine for very large rooms.
+    """
+
+    def __init__(self, sock: socket.socket, addr: Any, **kwargs) -> None:
+        super().__init__(addr, **kwargs)
+        self.sock = sock
+        self._queue: queue.Queue = queue.Queue(self.max_queue)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _enqueue(self, line: Union[str, bytes]) -> bool:
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            return False
+
+    def _writer_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            frames: List[bytes] = []
+            _add_frames(frames, item)
+            if self.coalesce:
+                # Whatever else is already queued goes out in the same write
+                while len(frames) < MAX_BATCH_FRAMES:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    _add_frames(frames, item)
+            metrics.SEND_BATCH_FRAMES.observe(len(frames))
+            if not send_frames(self.sock, frames):
+                self.closed = True
+                break
+
+    def close(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        """Flush pending messages (bounded by timeout) and stop the writer."""
+        self.uncork()
+        if not self.closed:
+            self.closed = True
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        self._writer.join(timeout)
+
+    def interrupt_read(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+
+    def abort(self) -> None:
+        self.closed = True
+        # Closing the socket unblocks both the writer and the session's reader
+        close_socket_safely(self.sock)
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class AsyncConnection(ClientConnection):
+    """Connection drained by a writer task on the event loop (asyncio engine).
+
+    Must be created on the loop thread; send() may be called from any thread.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, addr: Any, **kwargs) -> None:
+        super().__init__(addr, **kwargs)
+        self._writer = writer
+        self._read_task: Optional[asyncio.Future] = None
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._pending: Deque[Union[str, bytes, Tuple[bytes, ...]]] = collections.deque()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._drain_loop())
+
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def _call_in_loop(self, callback) -> None:
+        if threading.get_ident() == self._loop_thread:
+            callback()
+        else:
+            self._loop.call_soon_threadsafe(callback)
+
+    def _enqueue(self, line: Union[str, bytes]) -> bool:
+        if len(self._pending) >= self.max_queue:
+            return False
+        self._pending.append(line)
+        self._call_in_loop(self._wakeup.set)
+        return True
+
+    async def _drain_loop(self) -> None:
+        try:
+            while True:
+                while not self._pending:
+                    if self.closed:
+                        return
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                frames: List[bytes] = []
+                _add_frames(frames, self._pending.popleft())
+                if self.coalesce:
+                    while self._pending and len(frames) < MAX_BATCH_FRAMES:
+                        _add_frames(frames, self._pending.popleft())
+                metrics.SEND_BATCH_FRAMES.observe(len(frames))
+                observer = get_send_observer()
+                if observer is None:
+                    self._writer.writelines(frames)
+                    await self._writer.drain()
+                else:
+                    started = time.perf_counter()
+                    self._writer.writelines(frames)
+                    await self._writer.drain()
+                    observer(time.perf_counter() - started)
+        except (ConnectionError, OSError):
+            self.closed = True
+
+    async def aclose(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        """Flush pending messages (bounded by timeout) and close the stream."""
+        self.uncork()
+        self.closed = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except Exception:
+            pass
+        try:
+            self._writer.close()
+            await self._writer.wait_closed()
+        except Exception:
+            pass
+
+    def watch_read(self, task: Optional[asyncio.Future]) -> None:
+        """Register the session's pending read (None when it is over).
+
+        interrupt_read() cancels that task instead of feeding EOF to the
+        StreamReader: an answer arriving after the deadline must not hit a
+        reader already at EOF, which would abort the transport before the
+        final SCORE is written. Late bytes just stay unread in the buffer.
+        """
+        self._read_task = task
+
+    def interrupt_read(self) -> None:
+        def _interrupt() -> None:
+            if self._read_task is not None:
+                self._read_task.cancel()
+
+        self._call_in_loop(_interrupt)
+
+    def abort(self) -> None:
+        self.closed = True
+        self._pending.clear()
+
+        def _abort() -> None:
+            self._wakeup.set()
+            self._writer.transport.abort()
+
+        self._call_in_loop(_abort)
@@ -0,0 +1,192 @@
+import contextlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from core.question_bank import open_question_bank
+from core.question_index import QuestionIndex
+from core.shared_logic import LETTERS, CompiledQuestion
+from server.ui_logger import ui_logger
+
+VALIDATE_SAMPLE = 100  # questions decoded to validate a reloaded bank
+
+
+class BankVersion(NamedTuple):
+    """One loaded question bank, its filter index and when/how fast it was loaded."""
+    version: int
+    questions: Sequence[CompiledQuestion]
+    loaded_at: float  # time.time()
+    load_seconds: float
+    index: QuestionIndex
+
+
+class VersionedBank:
+    """The question bank new sessions draw from, replaced atomically on reload.
+
+    A quiz holds the version that is live when it starts through session()
+    and keeps it to the end, so a reload never changes the questions of a
+    running quiz. A replaced version is closed (its file handle or mapping
+    released) once no quiz holds it any more.
+    """
+
+    def __init__(self, questions: Sequence[CompiledQuestion], load_seconds: float = 0.0) -> None:
+        self._lock = threading.Lock()
+        self._current = BankVersion(1, questions, time.time(), load_seconds, QuestionIndex(questions))
+        self._sessions: Dict[int, int] = {}  # version -> quizzes holding it
+
+    @property
+    def current(self) -> BankVersion:
+        return self._current
+
+    def swap(self, questions: Sequence[CompiledQuestion], load_seconds: float,
+             index: Optional[QuestionIndex] = None) -> BankVersion:
+        """Publish a new bank; sessions starting from now on use it."""
+        with self._lock:
+            previous = self._current
+            self._current = BankVersion(previous.version + 1, questions, time.time(), load_seconds,
+                                        index or QuestionIndex(questions))
+            current = self._current
+            idle = previous.version not in self._sessions
+        if idle:
+            close_bank(previous.questions)
+        return current
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[BankVersion]:
+        """Hold the current version for one quiz."""
+        with self._lock:
+            version = self._current
+            self._sessions[version.version] = self._sessions.get(version.version, 0) + 1
+        try:
+            yield version
+        finally:
+            with self._lock:
+                left = self._sessions.pop(version.version) - 1
+                if left:
+                    self._sessions[version.version] = left
+                retired = not left and version is not self._current
+            if retired:
+                close_bank(version.questions)
+
+    def report(self) -> None:
+        """Show the current version on the dashboard."""
+        current = self._current
+        ui_logger.set_question_bank(current.version, len(current.questions), current.load_seconds)
+
+
+def close_bank(questions: Sequence[CompiledQuestion]) -> None:
+    """Release the file or mapping behind a bank; in-memory banks have none."""
+    close = getattr(questions, 'close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            ui_logger.send_log(f'[RELOAD] Cannot close replaced bank: {e}')
+
+
+def validate_bank(questions: Sequence[CompiledQuestion]) -> Optional[str]:
+    """Check a freshly loaded bank before it replaces the live one.
+
+    Decodes up to VALIDATE_SAMPLE evenly spaced questions, so lazily
+    decoded banks (indexed, mmap) are checked without reading every row.
+
+    Returns:
+        Why the bank is unusable, or None if it looks valid
+    """
+    if not questions:
+        return 'no questions'
+    step = max(1, len(questions) // VALIDATE_SAMPLE)
+    for index in range(0, len(questions), step):
+        try:
+            question = questions[index]
+            text, options, correct = question.text, question.options, question.correct
+        except Exception as e:
+            return f'question {index} unreadable: {e}'
+        if not text or len(options) != len(LETTERS) or not 0 <= correct < len(LETTERS):
+            return f'question {index} is malformed'
+    return None
+
+
+class BankWatcher:
+    """Reload the question bank when its file changes.
+
+    Polls os.stat() every `interval` seconds from a daemon thread and
+    reloads once the file has stopped changing for one interval, so a save
+    in progress is not picked up half written. Loading and validation run
+    on the watcher thread; serving threads only see the final swap.
+
+    Args:
+        bank: Bank to swap new versions into
+        path: Question file to watch
+        loader: open_question_bank() loader
+        cache: open_question_bank() cache flag
+        interval: Seconds between stat() calls
+        prepare: Called with each new version right after it is published,
+            on the watcher thread, to build indexes ahead of its sessions
+    """
+
+    def __init__(self, bank: VersionedBank, path: str, loader: str, cache: bool, interval: float,
+                 prepare: Optional[Callable[[BankVersion], None]] = None) -> None:
+        self.bank = bank
+        self.path = path
+        self.loader = loader
+        self.cache = cache
+        self.interval = interval
+        self.prepare = prepare
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='bank-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        loaded = previous = self._signature()
+        while not self._stop.wait(self.interval) and not ui_logger.is_shutdown_requested():
+            signature = self._signature()
+            if signature is not None and signature != loaded and signature == previous:
+                loaded = signature
+                self.reload()
+            previous = signature
+
+    def reload(self) -> Optional[BankVersion]:
+        """Load, validate and publish the bank file now.
+
+        Returns:
+            The new version, or None if the live bank was kept
+        """
+        live = self.bank.current.version
+        started = time.perf_counter()
+        try:
+            questions = open_question_bank(self.path, self.loader, self.cache)
+        except Exception as e:
+            ui_logger.send_log(f'[RELOAD] Cannot load {self.path}: {e}; keeping bank v{live}')
+            return None
+        problem = validate_bank(questions)
+        if problem:
+            ui_logger.send_log(f'[RELOAD] Rejected {self.path}: {problem}; keeping bank v{live}')
+            return None
+        index = QuestionIndex(questions)
+        if not ui_logger.get_game_filter().is_any:
+            index.build()  # here, not in the first filtered session after the swap
+        elapsed = time.perf_counter() - started
+        version = self.bank.swap(questions, elapsed, index)
+        self.bank.report()
+        ui_logger.send_log(
+            f'[RELOAD] Question bank v{version.version}: {len(questions)} questions '
+            f'loaded in {elapsed * 1000:.0f} ms'
+        )
+        if self.prepare is not None:
+            self.prepare(version)
+        return version
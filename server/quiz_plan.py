@@ -0,0 +1,43 @@
+import random
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from core.shared_logic import PERMUTATION_COUNT
+
+
+class QuizPlan(NamedTuple):
+    """Which questions a session asks, in which order, with which option order.
+
+    A session keeps only these three integers. Everything else is derived
+    from the seed on demand, so the exact sequence can be regenerated later
+    (audit, resume) and nothing proportional to the bank is copied per
+    player.
+    """
+    seed: int
+    bank_size: int
+    count: int
+
+    @classmethod
+    def new(cls, bank_size: int, max_questions: int, seed: Optional[int] = None) -> 'QuizPlan':
+        if seed is None:
+            seed = random.getrandbits(63)
+        return cls(seed, bank_size, min(max_questions, bank_size))
+
+    def question_ids(self) -> List[int]:
+        """Bank indexes to ask, sampled without replacement in O(count)."""
+        return random.Random(self.seed).sample(range(self.bank_size), self.count)
+
+    def turns(self) -> Iterator[Tuple[int, int]]:
+        """Yield (bank index, option permutation id) per question, lazily."""
+        rng = random.Random(self.seed)
+        for question_id in rng.sample(range(self.bank_size), self.count):
+            yield question_id, rng.randrange(PERMUTATION_COUNT)
+
+    def record(self, correct: bool) -> None:
+        """Answers do not change a random plan (see adaptive.AdaptiveQuiz)."""
+
+    def turn(self, idx: int) -> Tuple[int, int]:
+        """The idx-th (bank index, permutation id), e.g. to resume a session."""
+        for i, turn in enumerate(self.turns()):
+            if i == idx:
+                return turn
+        raise IndexError(f'plan has {self.count} questions')
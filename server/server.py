@@ -1,40 +1,63 @@
+import argparse
 import errno
+import functools
 import random
 import socket
 import sys
 import threading
 import time
-import tkinter as tk
-from tkinter import messagebox
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
 
 from config.server_config import server_config
-from core.network_utils import close_socket_safely, send_line
-from core.shared_logic import load_questions
+from core.network_utils import MessageReader, close_socket_safely, set_send_observer
+from core.protocol import Answer, ClientMessage, NameRequest, encode_frame, parse_client_message
+from core.protocol_v2 import NAME_OK_LINE, FrameBuilder, FrameDecoder
+from core.question_bank import LOADERS, open_question_bank
+from core.question_index import POOL_CACHE_SIZE, GameFilter
+from core.shared_logic import LETTER_INDEX, PERMUTATION_COUNT, CompiledQuestion
+from server import adaptive, metrics
+from server.control import GameControl, start_console
 from server.name_registry import NameRegistry
+from server import outbound
+from server.outbound import OVERFLOW_POLICIES, ClientConnection, ThreadedConnection
+from server.question_reload import BankVersion, BankWatcher, VersionedBank
+from server.quiz_plan import QuizPlan
+from server.timer_wheel import question_timers
 from server.ui_logger import ui_logger
 
 HOST = server_config.HOST
 PORT = server_config.PORT
+LISTEN_BACKLOG = server_config.LISTEN_BACKLOG
+MAX_LINE_LENGTH = server_config.MAX_LINE_LENGTH
+PROTOCOL_V2 = server_config.PROTOCOL_V2
+ENGINE = server_config.ENGINE
+HEADLESS = server_config.HEADLESS
 QUESTIONS_PATH = server_config.QUESTIONS_PATH
+QUESTION_LOADER = server_config.QUESTION_LOADER
+QUESTION_CACHE = server_config.QUESTION_CACHE
+QUESTION_RELOAD_INTERVAL = server_config.QUESTION_RELOAD_INTERVAL
 MAX_QUESTIONS = server_config.MAX_QUESTIONS
+GAME_FILTER = server_config.GAME_FILTER
+QUESTION_SELECTION = server_config.QUESTION_SELECTION
+RATINGS_PATH = server_config.RATINGS_PATH
 
 # Protocol timing
 WAIT_SIGNAL_INTERVAL = server_config.WAIT_SIGNAL_INTERVAL
 ACCEPT_TIMEOUT = server_config.ACCEPT_TIMEOUT
 QUESTION_TIMEOUT = server_config.QUESTION_TIMEOUT
 
-# Protocol messages
-MSG_NAME_OK = server_config.MSG_NAME_OK
-MSG_NAME_TAKEN = server_config.MSG_NAME_TAKEN
-MSG_WAIT = server_config.MSG_WAIT
-MSG_START = server_config.MSG_START
-MSG_STOP = server_config.MSG_STOP
-MSG_ERROR_NAME_TAKEN = server_config.MSG_ERROR_NAME_TAKEN
-MSG_SERVER_PAUSED = server_config.MSG_SERVER_PAUSED
-MSG_GAME_STARTED = server_config.MSG_GAME_STARTED
-MSG_SERVER_CLOSED = server_config.MSG_SERVER_CLOSED
-MSG_SERVER_READY = server_config.MSG_SERVER_READY
+# Protocol messages, pre-encoded once as ready-to-send frames
+MSG_NAME_OK = encode_frame(server_config.MSG_NAME_OK)
+MSG_NAME_OK_V2 = encode_frame(NAME_OK_LINE)
+MSG_NAME_TAKEN = encode_frame(server_config.MSG_NAME_TAKEN)
+MSG_WAIT = encode_frame(server_config.MSG_WAIT)
+MSG_START = encode_frame(server_config.MSG_START)
+MSG_STOP = encode_frame(server_config.MSG_STOP)
+MSG_ERROR_NAME_TAKEN = encode_frame(server_config.MSG_ERROR_NAME_TAKEN)
+MSG_SERVER_PAUSED = encode_frame(server_config.MSG_SERVER_PAUSED)
+MSG_GAME_STARTED = encode_frame(server_config.MSG_GAME_STARTED)
+MSG_SERVER_CLOSED = encode_frame(server_config.MSG_SERVER_CLOSED)
+MSG_SERVER_READY = encode_frame(server_config.MSG_SERVER_READY)
 
 REGISTRY = NameRegistry()
 
@@ -65,15 +88,24 @@ def check_server_status() -> bool:
 
 
 def broadcast_stop_to_clients() -> None:
-    """Broadcast message tạm ngưng đến tất cả client đang kết nối."""
+    """Broadcast message tạm ngưng đến tất cả client đang kết nối.
+
+    Only enqueues on each connection's outbound queue, so a stalled client
+    can never block the caller (the dashboard's Tk thread).
+    """
     connections = REGISTRY.get_all_connections()
     ui_logger.send_log(f'Broadcasting SERVER_PAUSED to {len(connections)} clients')
     
     for conn in connections:
-        try:
-            send_line(conn, MSG_SERVER_PAUSED)
-        except Exception as e:
-            ui_logger.send_log(f'Failed to send STOP to a client: {e}')
+        conn.send(conn.builder.notice_frame(MSG_SERVER_PAUSED))
+
+
+def _sync_question_timers(game_state: str) -> None:
+    """Freeze pending answer deadlines while the game is stopped or paused."""
+    if game_state == 'STARTED':
+        question_timers.resume()
+    else:
+        question_timers.pause()
 
 
 def is_client_connected(conn: socket.socket) -> bool:
@@ -90,21 +122,43 @@ def is_client_connected(conn: socket.socket) -> bool:
         return False
 
 
-def perform_name_handshake(conn: socket.socket, addr: Tuple, f) -> Optional[str]:
+def _is_name_taken(name: str) -> bool:
+    """Check this process's registry, then other worker processes (if any)."""
+    return REGISTRY.exists(name) or ui_logger.is_name_reserved(name)
+
+
+def accept_protocol(conn: ClientConnection, message: NameRequest) -> bytes:
+    """Pick the wire format for a named client.
+    
+    A client asking for v2 (NAME|<name>|v2) gets binary frames from the
+    next frame on, if the server allows it; everyone else stays on v1.
+    
+    Returns:
+        The NAME_OK frame to send, still in v1 text.
+    """
+    if message.version >= 2 and PROTOCOL_V2:
+        conn.builder = FrameBuilder
+        return MSG_NAME_OK_V2
+    return MSG_NAME_OK
+
+
+def perform_name_handshake(conn: ClientConnection, addr: Tuple, reader: MessageReader) -> Optional[str]:
     """Perform name registration handshake.
     
     Returns:
         player_name if successful, None if rejected or disconnected.
     """
+    started = time.perf_counter()
     # NOTE: Initial state check is still racy but reduces unnecessary work
     # The atomic check happens inside add_to_waiting_room() which holds the lock
     game_state = ui_logger.get_game_state()
     
     # Quick reject if clearly not accepting (optimization)
     if game_state == 'STARTED':
+        metrics.REJECTS.labels('game_started').inc()
         ui_logger.send_log(f'[REJECT] Client {addr}: Game already started')
         try:
-            send_line(conn, MSG_GAME_STARTED)
+            conn.send(MSG_GAME_STARTED)
             time.sleep(0.5)
         except Exception:
             pass
@@ -112,32 +166,36 @@ def perform_name_handshake(conn: socket.socket, addr: Tuple, f) -> Optional[str]
     
     # Only NOT_STARTED state allows new connections
     if game_state != 'NOT_STARTED':
+        metrics.REJECTS.labels('paused').inc()
         ui_logger.send_log(f'[REJECT] Client {addr}: Invalid state {game_state}')
         try:
-            send_line(conn, MSG_SERVER_PAUSED)
+            conn.send(MSG_SERVER_PAUSED)
             time.sleep(0.5)
         except Exception:
             pass
         return None
     
     while True:
-        line = f.readline()
-        if not line:
+        message = reader.read_message()
+        if message is None:
+            metrics.REJECTS.labels('disconnected').inc()
             ui_logger.send_log(f"Client {addr} disconnected before naming")
             return None
             
-        line = line.strip()
-        if not line.upper().startswith('NAME|'):
+        if not isinstance(message, NameRequest):
             continue
         
-        name = line.split('|', 1)[1].strip()
+        name = message.name
+        taken = bool(name) and _is_name_taken(name)
         
-        if not name or REGISTRY.exists(name):
-            if REGISTRY.exists(name):
+        if not name or taken:
+            if taken:
+                metrics.REJECTS.labels('name_taken').inc()
                 ui_logger.send_log(f'[LOBBY] Name rejected (already in use): {name}')
-                send_line(conn, MSG_ERROR_NAME_TAKEN)
+                conn.send(MSG_ERROR_NAME_TAKEN)
             else:
-                send_line(conn, MSG_NAME_TAKEN)
+                metrics.REJECTS.labels('empty_name').inc()
+                conn.send(MSG_NAME_TAKEN)
             ui_logger.update_active_players(REGISTRY.list_names())
             ui_logger.send_log('Active names: ' + str(REGISTRY.list_names()))
             continue
@@ -147,17 +205,24 @@ def perform_name_handshake(conn: socket.socket, addr: Tuple, f) -> Optional[str]
         if not ui_logger.add_to_waiting_room(name):
             # State changed to STARTED during handshake - reject atomically
             current_state = ui_logger.get_game_state()
+            metrics.REJECTS.labels('game_started' if current_state == 'STARTED' else 'paused').inc()
             ui_logger.send_log(f'[REJECT] {name} rejected: state is now {current_state}')
             if current_state == 'STARTED':
-                send_line(conn, MSG_GAME_STARTED)
+                conn.send(MSG_GAME_STARTED)
             else:
-                send_line(conn, MSG_SERVER_PAUSED)
+                conn.send(MSG_SERVER_PAUSED)
             time.sleep(0.5)
             return None
         
         # Successfully added to waiting room
+        conn.name = name
+        # Negotiate before REGISTRY.add so a broadcast never sees the old
+        # builder after NAME_OK|2 went out
+        conn.send(accept_protocol(conn, message))
+        if conn.builder is FrameBuilder:
+            reader.switch_decoder(FrameDecoder(parse_client_message, MAX_LINE_LENGTH))
         REGISTRY.add(name, conn)
-        send_line(conn, MSG_NAME_OK)
+        metrics.HANDSHAKE_SECONDS.observe(time.perf_counter() - started)
         ui_logger.send_log(f'[WAITING ROOM] {name} added - waiting for game START')
         ui_logger.mark_started(name)
         ui_logger.update_active_players(REGISTRY.list_names())
@@ -165,47 +230,81 @@ def perform_name_handshake(conn: socket.socket, addr: Tuple, f) -> Optional[str]
         return name
 
 
-def prepare_quiz_questions(questions: List[Dict]) -> List[Dict]:
-    """Prepare shuffled subset of questions for a client."""
-    client_questions = list(questions)
-    random.shuffle(client_questions)
-    if len(client_questions) > MAX_QUESTIONS:
-        client_questions = client_questions[:MAX_QUESTIONS]
-    return client_questions
+def plan_quiz(pool: Sequence[int], seed: Optional[int] = None) -> QuizPlan:
+    """Pick a client's questions (positions in `pool`) and option orders; only the seed is stored."""
+    return QuizPlan.new(len(pool), MAX_QUESTIONS, seed)
+
+
+def select_question_pool(bank_version: BankVersion) -> Tuple[Sequence[int], bool]:
+    """Bank ids a quiz on this bank version draws from under the current game filter.
 
+    A filter matching nothing in this bank version falls back to the whole
+    bank rather than sending an empty quiz; that is logged once per bank
+    version and filter, not on every session.
 
-def shuffle_question_options(question: Dict) -> Tuple[str, List[str]]:
+    Returns:
+        (pool, fell_back): fell_back is True when pool is the whole bank
+        because the filter matched nothing
     """
-    Shuffle question options and return new correct letter and shuffled options.
-    Returns (new_answer_letter, shuffled_options_list)
+    game_filter = ui_logger.get_game_filter()
+    pool = bank_version.index.select(game_filter)
+    if pool:
+        return pool, False
+    _log_filter_fallback(bank_version.version, game_filter)
+    return range(len(bank_version.questions)), True
+
+
+@functools.lru_cache(maxsize=POOL_CACHE_SIZE)
+def _log_filter_fallback(version: int, game_filter: GameFilter) -> None:
+    # Cached so a (bank version, filter) pair is only reported the first time
+    ui_logger.send_log(f'[FILTER] No question in bank v{version} matches "{game_filter}"; '
+                       f'quizzes will use the whole bank')
+
+
+def prepare_bank(bank_version: BankVersion) -> None:
+    """Build what the first sessions on a newly loaded bank would otherwise
+    build: its filter index under a game filter, and its rating index with
+    adaptive selection."""
+    pool, _fell_back = select_question_pool(bank_version)
+    engine = adaptive.engine()
+    if engine is not None:
+        engine.index(bank_version, pool)
+
+
+def start_quiz(bank_version: BankVersion, pool: Sequence[int],
+               player_name: str) -> Union[QuizPlan, adaptive.AdaptiveQuiz]:
+    """The player's quiz over `pool`: a random plan, or adaptive when enabled."""
+    engine = adaptive.engine()
+    if engine is None:
+        plan = plan_quiz(pool)
+        ui_logger.send_log(
+            f'[QUIZ START] {player_name} beginning quiz (bank v{bank_version.version}, '
+            f'{len(pool)} eligible questions, plan seed {plan.seed})'
+        )
+        return plan
+    quiz = engine.start_quiz(bank_version, pool, player_name, MAX_QUESTIONS)
+    ui_logger.send_log(
+        f'[QUIZ START] {player_name} beginning adaptive quiz (bank v{bank_version.version}, '
+        f'{len(pool)} eligible questions, rating {quiz.rating:.0f})'
+    )
+    return quiz
+
+
+def shuffle_question_options(question: CompiledQuestion, perm_id: Optional[int] = None) -> Tuple[int, Tuple[str, ...]]:
     """
-    orig_opts = [
-        question.get('A', ''),
-        question.get('B', ''),
-        question.get('C', ''),
-        question.get('D', '')
-    ]
-    
-    orig_correct_letter = question.get('answer', 'A').upper()
-    orig_correct_text = question.get(orig_correct_letter, '')
-    
-    shuffled_opts = list(orig_opts)
-    random.shuffle(shuffled_opts)
-    
-    letters = ['A', 'B', 'C', 'D']
-    new_answer_letter = 'A'
-    for i, text in enumerate(shuffled_opts):
-        if text == orig_correct_text:
-            new_answer_letter = letters[i]
-            break
-    
-    return new_answer_letter, shuffled_opts
+    Pick an option order for one player from the precomputed permutations.
+    Returns (index of the correct option as displayed, displayed options)
+    """
+    if perm_id is None:
+        perm_id = random.randrange(PERMUTATION_COUNT)
+    return question.permuted(perm_id)
 
 
-def _handle_quiz_timeout(player_name: str, score: int, idx: int) -> None:
+def _handle_quiz_timeout(player_name: str, score: int, idx: int, timeout: float = QUESTION_TIMEOUT) -> None:
     """Handle player timeout during quiz."""
+    metrics.TIMEOUTS.inc()
     ui_logger.send_log(
-        f"Client {player_name} timed out after {QUESTION_TIMEOUT/60:.1f} minutes "
+        f"Client {player_name} timed out after {timeout/60:.1f} minutes "
         f"on question {idx+1}"
     )
     send_line_safe = lambda c, m: None  # Will be passed from caller
@@ -215,13 +314,20 @@ def _handle_quiz_timeout(player_name: str, score: int, idx: int) -> None:
     ui_logger.send_log(f"Player {player_name} auto-finished (timeout): {score}/{idx}")
 
 
-def _handle_disconnect_mid_quiz(player_name: str, score: int, idx: int, total: int, conn: socket.socket) -> None:
+def _handle_disconnect_mid_quiz(player_name: str, score: int, idx: int, total: int, conn: ClientConnection) -> None:
     """Handle player disconnect during quiz."""
     ui_logger.send_log(
         f"Client {player_name} disconnected mid-quiz at question {idx+1}/{total}"
     )
     if idx > 0:
-        send_line(conn, f"SCORE|{score}/{idx}")
+        conn.send(conn.builder.score_frame(score, idx))
+    _record_disconnect_mid_quiz(player_name, score, idx)
+
+
+def _record_disconnect_mid_quiz(player_name: str, score: int, idx: int) -> None:
+    """Record a partial result for a player who left mid-quiz."""
+    metrics.DISCONNECTS.inc()
+    if idx > 0:
         ui_logger.update_scoreboard(player_name, score, idx, status='incomplete')
         ui_logger.mark_finished(player_name)
         ui_logger.send_log(f"Player {player_name} incomplete: {score}/{idx}")
@@ -230,144 +336,186 @@ def _handle_disconnect_mid_quiz(player_name: str, score: int, idx: int, total: i
     ui_logger.set_player_status(player_name, 'incomplete')
 
 
-def _parse_answer(line: str, qid: str) -> tuple:
-    """Parse ANSWER message. Returns (is_valid, given_answer, matches_qid)."""
-    if not line.startswith('ANSWER:'):
-        return False, line, False
-    
-    try:
-        _, payload = line.split(':', 1)
-        rid, given = payload.split('|', 1)
-        return True, given.strip(), rid.strip() == qid
-    except Exception:
-        return False, line, False
+def _parse_answer(message: ClientMessage, qid: str) -> tuple:
+    """Check a parsed client message. Returns (is_valid, given_answer, matches_qid)."""
+    if isinstance(message, Answer):
+        return True, message.letter, message.qidx == qid
+    if isinstance(message, NameRequest):
+        return False, f'NAME|{message.name}', False
+    return False, message.line, False
 
 
-def _evaluate_answer(is_valid: bool, matches_qid: bool, given: str, correct: str, conn: socket.socket) -> bool:
-    """Evaluate answer and send feedback. Returns True if correct."""
+def _judge_answer(is_valid: bool, matches_qid: bool, given: str, correct: int) -> bool:
+    """Return True if a parsed answer is valid, for this question and picks option `correct`."""
     if not is_valid or not matches_qid:
-        send_line(conn, f"EVAL|WRONG|{given}")
         return False
-    
-    if given.upper() == correct.upper():
-        send_line(conn, f"EVAL|RIGHT|{given}")
+    return LETTER_INDEX.get(given) == correct
+
+
+def _evaluate_answer(is_valid: bool, matches_qid: bool, given: str, correct: int, conn: ClientConnection) -> bool:
+    """Evaluate answer and send feedback. Returns True if correct."""
+    if _judge_answer(is_valid, matches_qid, given, correct):
+        metrics.ANSWERS_RIGHT.inc()
+        conn.send(conn.builder.eval_frame(True, given))
         return True
-    else:
-        send_line(conn, f"EVAL|WRONG|{given}")
-        return False
+    metrics.ANSWERS_WRONG.inc()
+    conn.send(conn.builder.eval_frame(False, given))
+    return False
 
 
-def _finish_quiz(player_name: str, score: int, total: int, conn: socket.socket, status: str = 'done') -> None:
-    """Send final score and update player status."""
-    send_line(conn, f"SCORE|{score}/{total}")
+def _record_result(player_name: str, score: int, total: int, status: str = 'done') -> None:
+    """Update scoreboard and player status once a quiz is over."""
     ui_logger.update_scoreboard(player_name, score, total, status=status)
     ui_logger.set_player_status(player_name, status)
     ui_logger.mark_finished(player_name)
     ui_logger.send_log(f"Player {player_name} {status}: {score}/{total}")
 
 
-def run_quiz_session(conn: socket.socket, f, player_name: str, questions: List[Dict]) -> None:
-    """Run the quiz session for a connected player."""
-    # Wait until game starts (if in waiting room)
-    while ui_logger.get_game_state() == 'NOT_STARTED':
-        ui_logger.send_log(f'[WAITING] {player_name} waiting for game to START...')
-        time.sleep(1.0)
+def _finish_quiz(player_name: str, score: int, total: int, conn: ClientConnection, status: str = 'done') -> None:
+    """Send final score and update player status."""
+    conn.send(conn.builder.score_frame(score, total))
+    conn.uncork()
+    _record_result(player_name, score, total, status)
+
+
+def _log_start_skew(player_name: str) -> None:
+    """Record how long after the START press the first QUESTION went out."""
+    skew = ui_logger.record_start_skew(player_name)
+    if skew is not None:
+        ui_logger.send_log(f'[QUIZ START] {player_name} first question sent {skew * 1000:.1f} ms after START')
+
+
+def run_quiz_session(conn: ClientConnection, reader: MessageReader, player_name: str,
+                     bank: VersionedBank) -> None:
+    """Run the quiz session for a connected player.
+
+    The session uses the bank version that is live when its quiz starts,
+    even if the bank is reloaded before it finishes.
+    """
+    # Wait until game starts (if in waiting room); woken by the START broadcast
+    ui_logger.send_log(f'[WAITING] {player_name} waiting for game to START...')
+    game_state = ui_logger.wait_while_game_state('NOT_STARTED')
     
     # Check if game was started or closed
-    if ui_logger.get_game_state() != 'STARTED':
-        ui_logger.send_log(f'[ABORT] {player_name} cannot start quiz, game state: {ui_logger.get_game_state()}')
+    if game_state != 'STARTED':
+        ui_logger.send_log(f'[ABORT] {player_name} cannot start quiz, game state: {game_state}')
         return
     
-    ui_logger.send_log(f'[QUIZ START] {player_name} beginning quiz')
+    with bank.session() as bank_version:
+        questions = bank_version.questions
+        pool, _fell_back = select_question_pool(bank_version)
+        plan = start_quiz(bank_version, pool, player_name)
     
-    client_questions = prepare_quiz_questions(questions)
-    total = len(client_questions)
-    score = 0
+        total = plan.count
+        score = 0
     
-    ui_logger.set_player_status(player_name, 'in_quiz')
+        ui_logger.set_player_status(player_name, 'in_quiz')
     
-    try:
-        for idx, question in enumerate(client_questions):
-            qid = str(idx)
-            new_answer_letter, shuffled_opts = shuffle_question_options(question)
+        try:
+            for idx, (question_id, perm_id) in enumerate(plan.turns()):
+                qid = str(idx)
+                question = questions[pool[question_id]]
+                correct, shuffled_opts = shuffle_question_options(question, perm_id)
             
-            opts_str = ','.join(shuffled_opts)
-            send_line(conn, f"QUESTION:{qid}|{question['question']}|{opts_str}")
+                conn.send(conn.builder.question_frame(qid, question.text, shuffled_opts))
+                # One write for the previous EVAL and this QUESTION
+                conn.uncork()
+                if idx == 0:
+                    _log_start_skew(player_name)
             
-            try:
-                conn.settimeout(QUESTION_TIMEOUT)
-                line = f.readline()
-                conn.settimeout(None)
-            except socket.timeout:
-                send_line(conn, f"SCORE|{score}/{max(idx, 1)}")
-                _handle_quiz_timeout(player_name, score, idx)
-                return
+                # The timer wheel owns the deadline; on expiry it interrupts the read
+                timeout = ui_logger.get_question_timeout(QUESTION_TIMEOUT)
+                deadline = question_timers.schedule(timeout, conn.interrupt_read)
+                asked_at = time.perf_counter()
+                try:
+                    message = reader.read_message()
+                finally:
+                    question_timers.cancel(deadline)
+                if deadline.fired:
+                    conn.send(conn.builder.score_frame(score, max(idx, 1)))
+                    _handle_quiz_timeout(player_name, score, idx, timeout)
+                    return
             
-            if not line:
-                _handle_disconnect_mid_quiz(player_name, score, idx, total, conn)
-                return
+                if message is None:
+                    _handle_disconnect_mid_quiz(player_name, score, idx, total, conn)
+                    return
+                metrics.ANSWER_SECONDS.observe(time.perf_counter() - asked_at)
             
-            is_valid, given, matches_qid = _parse_answer(line.strip(), qid)
-            if _evaluate_answer(is_valid, matches_qid, given, new_answer_letter, conn):
-                score += 1
+                # Hold EVAL until the next QUESTION (or SCORE) joins it
+                conn.cork()
+                is_valid, given, matches_qid = _parse_answer(message, qid)
+                is_correct = _evaluate_answer(is_valid, matches_qid, given, correct, conn)
+                if is_correct:
+                    score += 1
+                plan.record(is_correct)
         
-        _finish_quiz(player_name, score, total, conn, 'done')
+            _finish_quiz(player_name, score, total, conn, 'done')
         
-    except Exception as e:
-        ui_logger.send_log(f"Error in quiz session for {player_name}: {e}")
-        questions_attempted = score + 1
-        try:
-            send_line(conn, f"SCORE|{score}/{questions_attempted}")
-        except Exception:
-            pass
-        ui_logger.update_scoreboard(player_name, score, questions_attempted, status='error')
-        ui_logger.set_player_status(player_name, 'error')
-        ui_logger.mark_finished(player_name)
+        except Exception as e:
+            ui_logger.send_log(f"Error in quiz session for {player_name}: {e}")
+            questions_attempted = score + 1
+            try:
+                conn.send(conn.builder.score_frame(score, questions_attempted))
+                conn.uncork()
+            except Exception:
+                pass
+            ui_logger.update_scoreboard(player_name, score, questions_attempted, status='error')
+            ui_logger.set_player_status(player_name, 'error')
+            ui_logger.mark_finished(player_name)
 
 
-def handle_client(conn: socket.socket, addr: Tuple, questions: List[Dict]) -> None:
+def handle_client(conn: socket.socket, addr: Tuple, bank: VersionedBank) -> None:
     """Handle a single client connection through the full lifecycle."""
     ui_logger.send_log(f"Client connected: {addr}")
+    metrics.CONNECTIONS.inc()
+    metrics.ACTIVE_CONNECTIONS.inc()
     player_name = None
-    f = None  # Initialize to None to prevent NameError in finally
-    
+    client = ThreadedConnection(conn, addr)
+    reader = MessageReader(conn, parse_client_message, max_line_length=MAX_LINE_LENGTH)
+
     try:
-        f = conn.makefile('r', encoding='utf-8')
-        
-        player_name = perform_name_handshake(conn, addr, f)
+        player_name = perform_name_handshake(client, addr, reader)
         if not player_name:
             return
-        
-        run_quiz_session(conn, f, player_name, questions)
-        
+
+        run_quiz_session(client, reader, player_name, bank)
+
     except Exception as e:
         ui_logger.send_log(f"Error with client {addr}: {e}")
     finally:
-        # Close file handle first (if created), then socket
-        if f is not None:
-            try:
-                f.close()
-            except Exception:
-                pass
-        
+        # Stop reading, flush pending output, then close the socket
+        reader.close()
+        client.close()
         try:
             conn.close()
         except Exception:
             pass
+        metrics.ACTIVE_CONNECTIONS.dec()
         
         if player_name:
             ui_logger.send_log(f'{player_name} disconnected (name still reserved)')
 
 
-def start_server_socket(questions: List[Dict]) -> None:
-    """Start the main server socket and accept loop."""
+def start_server_socket(
+    bank: VersionedBank,
+    host: str = HOST,
+    port: int = PORT,
+    reuse_port: bool = False
+) -> None:
+    """Start the main server socket and accept loop (one thread per client).
+
+    With reuse_port=True several worker processes can bind the same port and
+    the kernel spreads incoming connections across them.
+    """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind((HOST, PORT))
-        server_socket.listen()
+        if reuse_port:
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server_socket.bind((host, port))
+        server_socket.listen(LISTEN_BACKLOG)
         server_socket.settimeout(ACCEPT_TIMEOUT)
         
-        ui_logger.send_log(f"Quiz server listening on {HOST}:{PORT}")
+        ui_logger.send_log(f"Quiz server listening on {host}:{port}")
         
         try:
             while not ui_logger.is_shutdown_requested():
@@ -376,7 +524,7 @@ def start_server_socket(questions: List[Dict]) -> None:
                     # Handle each client in a separate thread
                     client_thread = threading.Thread(
                         target=handle_client,
-                        args=(conn, addr, questions),
+                        args=(conn, addr, bank),
                         daemon=True
                     )
                     client_thread.start()
@@ -394,6 +542,8 @@ def start_server_socket(questions: List[Dict]) -> None:
 
 def show_port_in_use_error(port: int) -> None:
     try:
+        # Imported here so headless runs never load Tcl/Tk
+        import tkinter as tk
         root = tk.Tk()
         root.title("❌ Lỗi Khởi Động Server")
         root.geometry("500x300")
@@ -459,18 +609,153 @@ def show_port_in_use_error(port: int) -> None:
         print(f"[GUI Error] Không thể hiển thị popup: {e}")
 
 
-def main() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Quiz game server')
+    parser.add_argument('--host', default=HOST, help='Address to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=PORT, help='Port to bind (default: %(default)s)')
+    parser.add_argument(
+        '--engine',
+        choices=('thread', 'asyncio'),
+        default=ENGINE,
+        help='Connection engine: one thread per client, or a single asyncio event loop '
+             '(default: %(default)s)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Accept worker processes sharing the port via SO_REUSEPORT (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--question-timeout',
+        type=float,
+        default=None,
+        help=f'Seconds to answer each question (default: {QUESTION_TIMEOUT:.0f})'
+    )
+    parser.add_argument(
+        '--question-loader',
+        choices=LOADERS,
+        default=QUESTION_LOADER,
+        help='Keep the whole question bank in memory, only an index of row offsets, '
+             'or mmap its compiled cache shared by all workers (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--no-question-cache',
+        dest='question_cache',
+        action='store_false',
+        default=QUESTION_CACHE,
+        help='Always parse the question CSV instead of reusing its compiled cache'
+    )
+    parser.add_argument(
+        '--game-filter',
+        default=GAME_FILTER,
+        metavar='FILTER',
+        help='Draw questions only from matching rows, e.g. "category=geography, difficulty<=2" '
+             '(needs the optional category / difficulty columns; change it later from the console)'
+    )
+    parser.add_argument(
+        '--selection',
+        choices=('random', 'adaptive'),
+        default=QUESTION_SELECTION,
+        help='Sample each quiz at random, or pick each question by Elo rating to match the player '
+             '(default: %(default)s)'
+    )
+    parser.add_argument(
+        '--ratings',
+        default=RATINGS_PATH,
+        metavar='PATH',
+        help='Where adaptive selection keeps player and question ratings (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--reload-interval',
+        type=float,
+        default=QUESTION_RELOAD_INTERVAL,
+        metavar='SECONDS',
+        help='Check the question file this often and reload it when it changes; '
+             '0 disables hot reload (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--outbound-queue-size',
+        type=int,
+        default=server_config.OUTBOUND_QUEUE_SIZE,
+        help='Pending messages allowed per client before overflow (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--overflow-policy',
+        choices=OVERFLOW_POLICIES,
+        default=server_config.OUTBOUND_OVERFLOW_POLICY,
+        help='What to do when a client queue overflows (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--no-coalesce',
+        dest='coalesce',
+        action='store_false',
+        default=server_config.OUTBOUND_COALESCE,
+        help='Write every outbound frame separately instead of one vectored write per turn'
+    )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        default=HEADLESS,
+        help='Run without the Tk dashboard; control the game from the console'
+    )
+    parser.add_argument(
+        '--admin-socket',
+        nargs='?',
+        const=server_config.ADMIN_SOCKET_PATH,
+        default=None,
+        metavar='PATH',
+        help='Serve the JSON admin API on a Unix socket (default path: %(const)s)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=server_config.METRICS_PORT,
+        help='Serve Prometheus metrics on this local HTTP port, 0 to disable (default: %(default)s)'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    host, port = args.host, args.port
+    outbound.configure(args.outbound_queue_size, args.overflow_policy, args.coalesce)
+
     # Register broadcast callback for dependency injection (avoids circular import)
     ui_logger.register_broadcast_stop_callback(broadcast_stop_to_clients)
+    ui_logger.add_state_listener(_sync_question_timers)
+    if args.question_timeout is not None:
+        try:
+            ui_logger.set_question_timeout(args.question_timeout)
+        except ValueError as e:
+            print(f'Invalid --question-timeout: {e}')
+            sys.exit(2)
+    if args.game_filter:
+        try:
+            ui_logger.set_game_filter(args.game_filter)
+        except ValueError as e:
+            print(f'Invalid --game-filter: {e}')
+            sys.exit(2)
     
-    if is_port_in_use(HOST, PORT):
-        show_port_in_use_error(PORT)
+    if args.workers > 1:
+        from server.workers import reuse_port_supported
+        if not reuse_port_supported():
+            print('SO_REUSEPORT is not available on this platform; use --workers 1')
+            sys.exit(1)
+    
+    if args.headless:
+        # Nothing drains the dashboard log queue; stdout still gets every line
+        ui_logger.set_log_streaming(False)
+
+    if is_port_in_use(host, port):
+        if not args.headless:
+            show_port_in_use_error(port)
         
         error_msg = (
             f"╔{'═' * 60}╗\n"
             f"║  KHÔNG THỂ KHỞI ĐỘNG SERVER                               ║\n"
             f"║                                                            ║\n"
-            f"║  Server đã chạy trên cổng {PORT:<5}                            ║\n"
+            f"║  Server đã chạy trên cổng {port:<5}                            ║\n"
             f"║  Không thể khởi động thêm instance mới!                    ║\n"
             f"║                                                            ║\n"
             f"║  Vui lòng:                                                 ║\n"
@@ -479,31 +764,79 @@ def main() -> None:
             f"╚{'═' * 60}╝"
         )
         print(error_msg)
-        ui_logger.send_log(f"Server đã chạy trên cổng {PORT}, không thể khởi động lại")
+        ui_logger.send_log(f"Server đã chạy trên cổng {port}, không thể khởi động lại")
         sys.exit(1)
     
-    questions = load_questions(QUESTIONS_PATH, max_questions=MAX_QUESTIONS)
+    started = time.perf_counter()
+    questions = open_question_bank(QUESTIONS_PATH, args.question_loader, args.question_cache)
     if not questions:
         ui_logger.send_log(f"No questions found at {QUESTIONS_PATH}; server exiting.")
         sys.exit(1)
+    bank = VersionedBank(questions, time.perf_counter() - started)
+    bank.report()
     
     ui_logger.send_log(
         f"Loaded {len(questions)} questions from {QUESTIONS_PATH} "
         f"(max per-client: {MAX_QUESTIONS})"
     )
     
-    try:
-        from server.server_dashboard import start_dashboard
-        dashboard_thread = threading.Thread(
-            target=lambda: start_dashboard(REGISTRY),
-            daemon=True
-        )
-        dashboard_thread.start()
-    except Exception as e:
-        ui_logger.send_log(f"Dashboard failed to start: {e}")
+    # In worker mode this process only coordinates; workers own the connections
+    name_registry = REGISTRY
+    pool = None
+    if args.workers > 1:
+        from server.workers import WorkerPool
+        pool = WorkerPool(args.workers, vars(args))
+        name_registry = pool.coordinator
     
-    ui_logger.send_log(f"Starting server on {HOST}:{PORT}...")
-    start_server_socket(questions)
+    control = GameControl(name_registry)
+    admin_server = None
+    if args.admin_socket:
+        from server.admin_socket import start_admin_socket
+        admin_server = start_admin_socket(args.admin_socket, control)
+    if args.metrics_port:
+        set_send_observer(metrics.SEND_SECONDS.observe)
+        metrics.start_metrics_server(server_config.METRICS_HOST, args.metrics_port)
+
+    if args.headless:
+        start_console(control)
+    else:
+        try:
+            from server.server_dashboard import start_dashboard
+            dashboard_thread = threading.Thread(
+                target=lambda: start_dashboard(name_registry),
+                daemon=True
+            )
+            dashboard_thread.start()
+        except Exception as e:
+            ui_logger.send_log(f"Dashboard failed to start: {e}")
+    
+    # Workers watch the bank themselves; each serves its own copy
+    watcher = None
+    if args.selection == 'adaptive' and pool is None:
+        adaptive.enable(args.ratings)
+    prepare_bank(bank.current)
+    if args.reload_interval > 0 and pool is None:
+        watcher = BankWatcher(bank, QUESTIONS_PATH, args.question_loader, args.question_cache,
+                              args.reload_interval, prepare_bank)
+        watcher.start()
+
+    ui_logger.send_log(f"Starting server on {host}:{port} ({args.engine} engine)...")
+    try:
+        if pool is not None:
+            pool.start()
+            pool.wait()
+        elif args.engine == 'asyncio':
+            from server.async_server import start_async_server
+            start_async_server(bank, host, port)
+        else:
+            start_server_socket(bank, host, port)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        adaptive.disable()
+        if admin_server is not None:
+            from server.admin_socket import stop_admin_socket
+            stop_admin_socket(admin_server)
 
 
 if __name__ == '__main__':
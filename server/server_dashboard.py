@@ -319,6 +319,8 @@ class Dashboard(tk.Frame):
         self.var_low = tk.StringVar(value='-')
         self.var_completion = tk.StringVar(value='0%')
         self.var_top_player = tk.StringVar(value='-')
+        self.var_start_skew = tk.StringVar(value='-')
+        self.var_bank = tk.StringVar(value='-')
 
         stats_grid = tk.Frame(stats_body, bg='white')
         stats_grid.pack(fill='x', pady=(0, 10))
@@ -334,6 +336,11 @@ class Dashboard(tk.Frame):
         # Row 3: Completion and Top Player
         self._create_stat_box(stats_grid, '✅ Completion', self.var_completion, COLORS['secondary'], 2, 0)
         self._create_stat_box(stats_grid, '🏆 Top Player', self.var_top_player, COLORS['primary'], 2, 1)
+        
+        # Row 4: Start skew (START press -> first question, slowest player)
+        # and the live question bank version (hot reload)
+        self._create_stat_box(stats_grid, '⏱ Start Skew', self.var_start_skew, COLORS['dark'], 3, 0)
+        self._create_stat_box(stats_grid, '📚 Question Bank', self.var_bank, COLORS['info'], 3, 1)
 
         # Chart area
         chart_frame = tk.Frame(stats_card, bg='white')
@@ -362,13 +369,15 @@ class Dashboard(tk.Frame):
                 fg='white').pack(side='left', padx=10, pady=6)
 
         self.tree_players = ttk.Treeview(players_card,
-                                        columns=('name', 'status'),
+                                        columns=('name', 'status', 'queue'),
                                         show='headings',
                                         height=4)
         self.tree_players.heading('name', text='Player')
         self.tree_players.heading('status', text='Status')
+        self.tree_players.heading('queue', text='Queue')
         self.tree_players.column('name', width=150, anchor='w')
         self.tree_players.column('status', width=100, anchor='center')
+        self.tree_players.column('queue', width=50, anchor='center')
         
         players_scroll = ttk.Scrollbar(players_card, orient='vertical', command=self.tree_players.yview)
         self.tree_players.configure(yscroll=players_scroll.set)
@@ -468,7 +477,8 @@ class Dashboard(tk.Frame):
 
         # Players
         players = ui_logger.get_active_players_with_status()
-        self._refresh_players(players)
+        depths = self.name_registry.get_queue_depths() if self.name_registry is not None else {}
+        self._refresh_players(players, depths)
 
         # Scoreboard
         rows = ui_logger.get_scoreboard_rows()
@@ -556,7 +566,7 @@ class Dashboard(tk.Frame):
         if lines:
             self._append_logs(lines)
 
-    def _refresh_players(self, players: List[Tuple[str, str]]) -> None:
+    def _refresh_players(self, players: List[Tuple[str, str]], depths: Dict[str, int] | None = None) -> None:
         # Rebuild list with color coding
         for iid in self.tree_players.get_children(''):
             self.tree_players.delete(iid)
@@ -571,7 +581,8 @@ class Dashboard(tk.Frame):
                 'error': '❌ Error'
             }.get(status, status)
             
-            iid = self.tree_players.insert('', 'end', values=(name, status_display))
+            depth = (depths or {}).get(name)
+            iid = self.tree_players.insert('', 'end', values=(name, status_display, '-' if depth is None else depth))
             
             # Alternate row colors for better readability
             if i % 2 == 0:
@@ -642,6 +653,11 @@ class Dashboard(tk.Frame):
         top_name = stats.get('top_player', None)
         top_score = stats.get('top_score', None)
         self.var_top_player.set('-' if not top_name else f"{top_name} ({'-' if top_score is None else top_score})")
+        skew_max = stats.get('start_skew_max_ms', None)
+        self.var_start_skew.set('-' if skew_max is None else f'{skew_max:.0f} ms')
+        bank_version = stats.get('bank_version', None)
+        self.var_bank.set('-' if bank_version is None else
+                          f"v{bank_version} · {stats.get('bank_questions')} q · {stats.get('bank_load_ms'):.0f} ms")
 
     def _draw_chart(self, rows: List[Dict[str, Any]]) -> None:
         # Enhanced bar chart with gradients and labels
@@ -0,0 +1,165 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from config.server_config import server_config
+from server.ui_logger import ui_logger
+
+
+class TimerHandle:
+    """A scheduled deadline. `fired` becomes True once the callback has run."""
+
+    __slots__ = ('expires_tick', 'callback', 'bucket', 'fired', 'cancelled')
+
+    def __init__(self, expires_tick: int, callback: Callable[[], None], bucket: Set['TimerHandle']) -> None:
+        self.expires_tick = expires_tick
+        self.callback = callback
+        self.bucket = bucket  # the slot, or the revolution set, currently holding it
+        self.fired = False
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Hashed timer wheel owning every session's question deadline.
+
+    Time is divided into ticks; a deadline within one revolution lands in
+    slot `expires_tick % slots`, so schedule() and cancel() are O(1) and a
+    slot only ever holds the deadlines due on its next tick. Later deadlines
+    wait in a set per revolution and are moved into their slots once, when
+    that revolution starts, so every deadline is touched O(1) times however
+    long it is.
+
+    A single daemon thread advances the wheel; it sleeps while nothing is
+    pending. pause() freezes the tick counter, so every pending deadline
+    keeps its remaining time until resume(). Callbacks run on the wheel
+    thread and must be quick.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512) -> None:
+        self.tick = float(tick)
+        self._slots: List[Set[TimerHandle]] = [set() for _ in range(slots)]
+        self._later: Dict[int, Set[TimerHandle]] = {}  # revolution -> deadlines beyond the current one
+        self._current_tick = 0
+        self._pending = 0
+        self._paused = False
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='timer-wheel', daemon=True)
+            self._thread.start()
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Call `callback` after `delay` seconds of unpaused time.
+
+        Raises:
+            ValueError: delay is NaN or infinite
+        """
+        if not math.isfinite(delay):
+            raise ValueError(f'timer delay must be finite, got {delay!r}')
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self._lock:
+            self._ensure_started()
+            expires = self._current_tick + ticks
+            slots = len(self._slots)
+            if ticks <= slots:
+                bucket = self._slots[expires % slots]
+            else:
+                bucket = self._later.setdefault(expires // slots, set())
+            handle = TimerHandle(expires, callback, bucket)
+            bucket.add(handle)
+            self._pending += 1
+            if self._pending == 1:
+                self._wakeup.notify_all()
+            return handle
+
+    def cancel(self, handle: Optional[TimerHandle]) -> bool:
+        """Cancel a pending deadline.
+
+        Returns:
+            True if it was pending, False if it already fired or was cancelled.
+        """
+        if handle is None:
+            return False
+        with self._lock:
+            if handle.fired or handle.cancelled:
+                return False
+            handle.cancelled = True
+            handle.bucket.discard(handle)
+            self._pending -= 1
+            return True
+
+    def remaining(self, handle: TimerHandle) -> float:
+        """Seconds left before a pending deadline fires."""
+        with self._lock:
+            return max(0, handle.expires_tick - self._current_tick) * self.tick
+
+    def pause(self) -> None:
+        """Freeze all pending deadlines."""
+        with self._lock:
+            self._paused = True
+
+    def resume(self) -> None:
+        """Continue all pending deadlines from where they were paused."""
+        with self._lock:
+            self._paused = False
+            self._wakeup.notify_all()
+
+    def is_paused(self) -> bool:
+        with self._lock:
+            return self._paused
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+    def _advance(self) -> List[TimerHandle]:
+        """Advance one tick and collect expired handles (lock held)."""
+        self._current_tick += 1
+        slots = len(self._slots)
+        slot = self._current_tick % slots
+        if slot == 0:
+            # A new revolution: its deadlines move into their slots
+            for handle in self._later.pop(self._current_tick // slots, ()):
+                handle.bucket = self._slots[handle.expires_tick % slots]
+                handle.bucket.add(handle)
+        expired, self._slots[slot] = self._slots[slot], set()
+        for handle in expired:
+            handle.fired = True
+        self._pending -= len(expired)
+        return list(expired)
+
+    def _run(self) -> None:
+        next_tick = time.monotonic() + self.tick
+        while True:
+            with self._lock:
+                while (self._paused or not self._pending) and not self._stopped:
+                    self._wakeup.wait()
+                    # Do not replay the paused or idle interval as a burst of ticks
+                    next_tick = time.monotonic() + self.tick
+                if self._stopped:
+                    return
+                expired: List[TimerHandle] = []
+                now = time.monotonic()
+                while now >= next_tick:
+                    expired.extend(self._advance())
+                    next_tick += self.tick
+                delay = next_tick - now
+            for handle in expired:
+                try:
+                    handle.callback()
+                except Exception as e:
+                    ui_logger.send_log(f'[TIMER] Deadline callback failed: {e!r}')
+            time.sleep(delay)
+
+
+question_timers = TimerWheel(server_config.TIMER_TICK, server_config.TIMER_SLOTS)
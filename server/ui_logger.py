@@ -1,6 +1,11 @@
+import math
 import threading
+import time
 from queue import Queue, Empty
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.question_index import NO_FILTER, GameFilter
+from core.shared_logic import MAX_DIFFICULTY
 
 
 class UILogger:
@@ -30,11 +35,40 @@ class UILogger:
         self._game_state: str = 'NOT_STARTED'
         self._waiting_room: set[str] = set()  # Players waiting for START button
 
+        # Game state broadcast: threads wait on the condition, other engines
+        # (e.g. asyncio) subscribe with a listener called on every transition
+        self._state_changed = threading.Condition(self._lock)
+        self._state_listeners: List[Callable[[str], None]] = []
+
+        # Per-game settings: seconds a player has to answer each question,
+        # and which questions of the bank the game draws from
+        self._question_timeout: Optional[float] = None
+        self._game_filter: GameFilter = NO_FILTER
+
+        # Start skew: delay between START press and each player's first QUESTION
+        self._started_at: Optional[float] = None
+        self._start_skew: Dict[str, float] = {}  # name -> seconds
+
+        # Set in worker processes: shared state lives in the master process and
+        # mutations are forwarded to it (see server/coordinator.py)
+        self._coordinator = None
+
+        # Off when no dashboard drains the log queue (headless mode)
+        self._stream_logs: bool = True
+
+        # Live question bank: (version, question count, load seconds)
+        self._question_bank: Optional[Tuple[int, int, float]] = None
+
     def send_log(self, message: str) -> None:
+        if self._coordinator is not None:
+            self._coordinator.post('send_log', message)
+            return
         try:
             print(message)
         except Exception:
             pass
+        if not self._stream_logs:
+            return
         try:
             self._log_queue.put_nowait(message)
         except Exception:
@@ -43,6 +77,12 @@ class UILogger:
     def log(self, text: str) -> None:
         self.send_log(text)
 
+    def set_log_streaming(self, enabled: bool) -> None:
+        """Enable or disable queueing log lines for a UI to drain."""
+        self._stream_logs = bool(enabled)
+        if not enabled:
+            self.drain_logs(self._log_queue.qsize())
+
     def drain_logs(self, max_items: int = 1000) -> List[str]:
         items: List[str] = []
         for _ in range(max_items):
@@ -53,6 +93,9 @@ class UILogger:
         return items
 
     def update_active_players(self, names: List[str]) -> None:
+        if self._coordinator is not None:
+            # The master tracks players as they join; a worker only sees its own
+            return
         with self._lock:
             current = {n: self._active_players.get(n, 'waiting') for n in names}
             self._active_players = current
@@ -67,6 +110,9 @@ class UILogger:
                 del self._active_players[name]
 
     def set_player_status(self, name: str, status: str) -> None:
+        if self._coordinator is not None:
+            self._coordinator.post('set_player_status', name, status)
+            return
         with self._lock:
             self._active_players[name] = status
 
@@ -87,6 +133,9 @@ class UILogger:
         return [n for n, _ in self.get_active_players_with_status()]
 
     def update_scoreboard(self, name: str, score: int, total: int, status: str = 'done') -> None:
+        if self._coordinator is not None:
+            self._coordinator.post('update_scoreboard', name, score, total, status)
+            return
         with self._lock:
             self._scoreboard[name] = {'score': int(score), 'total': int(total), 'status': status}
             self._finished_names.add(name)
@@ -94,8 +143,7 @@ class UILogger:
     def get_scoreboard_rows(self) -> List[Dict[str, int | str]]:
         with self._lock:
             rows = [{'name': n, **d} for n, d in self._scoreboard.items()]
-        rows.sort(key=lambda r: (r.get('score', 0), -r.get('total', 1)), reverse=True)
-        return rows
+        return self._sort_scoreboard(rows)
 
     def record_score(self, points: int) -> None:
         pass
@@ -115,33 +163,167 @@ class UILogger:
         return str(top.get('name', '')) if top.get('name') is not None else None, int(top.get('score', 0))
 
     def mark_started(self, name: str) -> None:
+        if self._coordinator is not None:
+            self._coordinator.post('mark_started', name)
+            return
         with self._lock:
             self._started_names.add(name)
 
     def mark_finished(self, name: str) -> None:
+        if self._coordinator is not None:
+            self._coordinator.post('mark_finished', name)
+            return
         with self._lock:
             self._finished_names.add(name)
 
-    def get_statistics(self) -> Dict[str, int | float | None]:
+    def set_question_timeout(self, seconds: float) -> None:
+        """Set the answer deadline used for questions sent from now on."""
+        if not (math.isfinite(seconds) and seconds > 0):
+            raise ValueError('question timeout must be a positive number of seconds')
         with self._lock:
-            online = len(self._active_players)
-            total_started = len(self._started_names)
-            total_finished = len(self._finished_names)
-            server_running = self._server_running
-        high, low = self.get_score_extremes()
-        top_name, top_score = self.get_top_player()
+            self._question_timeout = float(seconds)
+        self.send_log(f'Question timeout set to {seconds:g}s')
+
+    def get_question_timeout(self, default: float) -> float:
+        with self._lock:
+            return default if self._question_timeout is None else self._question_timeout
+
+    def set_game_filter(self, text: str) -> GameFilter:
+        """Set the question filter used by quizzes starting from now on.
+
+        Args:
+            text: Filter such as "category=geography, difficulty<=2"; ''
+                clears it (see GameFilter)
+
+        Raises:
+            ValueError: If the filter text is invalid
+        """
+        game_filter = GameFilter.parse(text)
+        with self._lock:
+            self._game_filter = game_filter
+        self.send_log(f'Question filter set to {game_filter}' if not game_filter.is_any
+                      else 'Question filter cleared: whole bank')
+        if game_filter.is_empty:
+            self.send_log(f'[FILTER] "{text.strip()}" matches no difficulty (questions are rated '
+                          f'1-{MAX_DIFFICULTY}); quizzes will use the whole bank')
+        return game_filter
+
+    def get_game_filter(self) -> GameFilter:
+        with self._lock:
+            return self._game_filter
+
+    def record_start_skew(self, name: str, at: Optional[float] = None) -> Optional[float]:
+        """Record the time from the START press to this player's first QUESTION.
+
+        Args:
+            name: Player name
+            at: time.monotonic() when the question was sent (defaults to now)
+
+        Returns:
+            Skew in seconds, or None if the game has no recorded START.
+        """
+        now = time.monotonic() if at is None else at
+        if self._coordinator is not None:
+            # CLOCK_MONOTONIC is system-wide, so the master can compute the skew
+            self._coordinator.post('record_start_skew', name, now)
+            with self._lock:
+                started_at = self._started_at
+            return None if started_at is None else now - started_at
+        with self._lock:
+            if self._started_at is None:
+                return None
+            skew = now - self._started_at
+            self._start_skew[name] = skew
+            return skew
+
+    def set_question_bank(self, version: int, count: int, load_seconds: float) -> None:
+        """Record the question bank version new sessions now draw from."""
+        if self._coordinator is not None:
+            self._coordinator.post('set_question_bank', version, count, load_seconds)
+            return
+        with self._lock:
+            self._question_bank = (version, count, load_seconds)
+
+    def get_start_skews(self) -> Dict[str, float]:
+        """Return per-player start skew in seconds."""
+        with self._lock:
+            return dict(self._start_skew)
+
+    @staticmethod
+    def _sort_scoreboard(rows: List[Dict[str, int | str]]) -> List[Dict[str, int | str]]:
+        rows.sort(key=lambda r: (r.get('score', 0), -r.get('total', 1)), reverse=True)
+        return rows
+
+    @staticmethod
+    def _build_statistics(rows: List[Dict[str, int | str]], online: int, total_started: int,
+                          total_finished: int, server_running: bool, skews: List[float],
+                          question_bank: Optional[Tuple[int, int, float]]) -> Dict[str, int | float | None]:
+        """Compute dashboard statistics from copied state (no lock needed)."""
+        scores = [int(r['score']) for r in rows]
+        bank_version, bank_questions, bank_load_seconds = question_bank or (None, None, None)
         completion = 0.0
         if total_started > 0:
             completion = round((total_finished / total_started) * 100.0, 1)
         return {
             'online': online,
             'total_started': total_started,
-            'high_score': high,
-            'low_score': low,
+            'high_score': max(scores) if scores else None,
+            'low_score': min(scores) if scores else None,
             'completion_rate': completion,
-            'top_player': top_name,
-            'top_score': top_score,
+            'top_player': str(rows[0]['name']) if rows else None,
+            'top_score': scores[0] if rows else None,
             'server_running': server_running,
+            'start_skew_avg_ms': round(sum(skews) / len(skews) * 1000.0, 1) if skews else None,
+            'start_skew_max_ms': round(max(skews) * 1000.0, 1) if skews else None,
+            'bank_version': bank_version,
+            'bank_questions': bank_questions,
+            'bank_load_ms': None if bank_load_seconds is None else round(bank_load_seconds * 1000.0, 1),
+        }
+
+    def get_statistics(self) -> Dict[str, int | float | None]:
+        with self._lock:
+            rows = [{'name': n, **d} for n, d in self._scoreboard.items()]
+            online = len(self._active_players)
+            total_started = len(self._started_names)
+            total_finished = len(self._finished_names)
+            server_running = self._server_running
+            skews = list(self._start_skew.values())
+            question_bank = self._question_bank
+        return self._build_statistics(self._sort_scoreboard(rows), online, total_started,
+                                      total_finished, server_running, skews, question_bank)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Copy players, scoreboard and statistics in one short lock section.
+
+        Everything derived (sorting, statistics) is computed after the lock
+        is released, so pollers never hold up session threads.
+
+        Returns:
+            Dict with game_state, question_timeout, game_filter, players (list of
+            {name, status}), scoreboard (rows as get_scoreboard_rows())
+            and stats (as get_statistics()).
+        """
+        with self._lock:
+            players = list(self._active_players.items())
+            rows = [{'name': n, **d} for n, d in self._scoreboard.items()]
+            total_started = len(self._started_names)
+            total_finished = len(self._finished_names)
+            server_running = self._server_running
+            game_state = self._game_state
+            question_timeout = self._question_timeout
+            game_filter = str(self._game_filter)
+            skews = list(self._start_skew.values())
+            question_bank = self._question_bank
+        rows = self._sort_scoreboard(rows)
+        players.sort(key=lambda x: x[0])
+        return {
+            'game_state': game_state,
+            'question_timeout': question_timeout,
+            'game_filter': game_filter,
+            'players': [{'name': n, 'status': st} for n, st in players],
+            'scoreboard': rows,
+            'stats': self._build_statistics(rows, len(players), total_started, total_finished,
+                                            server_running, skews, question_bank),
         }
 
     def reset_scores_and_names(self, name_registry=None) -> None:
@@ -155,6 +337,7 @@ class UILogger:
             self._finished_names.clear()
             self._active_players.clear()
             self._started_names.clear()
+            self._start_skew.clear()
         
         self.send_log('Server remains RUNNING after reset - clients can still join')
         
@@ -207,6 +390,8 @@ class UILogger:
                 # ─────────────────────────────────────────────────────────────
                 if self._game_state == 'NOT_STARTED':
                     self._game_state = 'STARTED'
+                    self._started_at = time.monotonic()
+                    self._start_skew.clear()
                     self.send_log('Game STARTED - Waiting room players now playing')
                     
                     # Release all waiting players to active quiz
@@ -233,6 +418,11 @@ class UILogger:
                     return
             
             self._server_running = bool(running)
+            new_state = self._game_state
+            # Wake every session blocked in wait_while_game_state() at once
+            self._state_changed.notify_all()
+        
+        self._notify_state_listeners(new_state)
         
         if not running:
             # Use registered callback instead of dynamic import (avoids deadlock)
@@ -248,6 +438,49 @@ class UILogger:
     def get_game_state(self) -> str:
         with self._lock:
             return self._game_state
+
+    def wait_while_game_state(self, state: str, timeout: Optional[float] = None) -> str:
+        """Block until the game leaves `state` or shutdown is requested.
+
+        Replaces per-player polling: all waiters are woken together by
+        set_server_running() through a single notify_all().
+
+        Args:
+            state: Game state to wait out (e.g. 'NOT_STARTED')
+            timeout: Optional maximum wait in seconds
+
+        Returns:
+            The game state at wake-up time.
+        """
+        with self._state_changed:
+            self._state_changed.wait_for(
+                lambda: self._game_state != state or self._shutdown_requested,
+                timeout
+            )
+            return self._game_state
+
+    def add_state_listener(self, callback: Callable[[str], None]) -> None:
+        """Subscribe to game state transitions (called with the new state).
+
+        Listeners run outside the lock on the thread that changed the state,
+        so they must be quick (e.g. loop.call_soon_threadsafe).
+        """
+        with self._lock:
+            self._state_listeners.append(callback)
+
+    def remove_state_listener(self, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            if callback in self._state_listeners:
+                self._state_listeners.remove(callback)
+
+    def _notify_state_listeners(self, state: str) -> None:
+        with self._lock:
+            listeners = list(self._state_listeners)
+        for callback in listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                self.send_log(f'Warning: state listener failed: {e}')
     
     def add_to_waiting_room(self, name: str) -> bool:
         """Add player to waiting room (only works in NOT_STARTED state).
@@ -260,6 +493,8 @@ class UILogger:
             NOT_STARTED: Accept player → waiting room
             STARTED: Reject player (late join blocked)
         """
+        if self._coordinator is not None:
+            return self._coordinator.call('join_waiting_room', name)
         with self._lock:
             if self._game_state != 'NOT_STARTED':
                 return False  # Waiting room only exists in NOT_STARTED state
@@ -267,6 +502,16 @@ class UILogger:
             self._active_players[name] = 'waiting'
             return True
     
+    def is_name_reserved(self, name: str) -> bool:
+        """Check if another worker process already holds this name.
+
+        Always False in a single process, where the NameRegistry is the
+        source of truth.
+        """
+        if self._coordinator is not None:
+            return self._coordinator.call('is_name_reserved', name)
+        return False
+
     def is_waiting_room_available(self) -> bool:
         """Check if waiting room accepts new players.
         
@@ -284,6 +529,9 @@ class UILogger:
     def request_shutdown(self) -> None:
         with self._lock:
             self._shutdown_requested = True
+            state = self._game_state
+            self._state_changed.notify_all()
+        self._notify_state_listeners(state)
         self.send_log('Shutdown requested from GUI')
 
     def is_shutdown_requested(self) -> bool:
@@ -294,5 +542,55 @@ class UILogger:
         """Register callback for broadcasting STOP to clients (dependency injection)."""
         self._broadcast_stop_callback = callback
 
+    def attach_coordinator(self, coordinator) -> None:
+        """Forward shared state to the master process (worker processes only).
+
+        Args:
+            coordinator: Object with post(method, *args) for fire-and-forget
+                updates and call(method, *args) for answers that are needed
+                synchronously (see server.coordinator.CoordinatorLink).
+        """
+        self._coordinator = coordinator
+
+    def is_coordinated(self) -> bool:
+        """True in a worker process, where add_to_waiting_room() and
+        is_name_reserved() are round trips to the master."""
+        return self._coordinator is not None
+
+    def apply_remote_state(self, game_state: str, shutdown: bool, question_timeout: Optional[float],
+                           started_at: Optional[float], game_filter: Optional[str] = None) -> None:
+        """Mirror the master's game state in a worker process.
+
+        Wakes local waiters and listeners exactly like set_server_running(),
+        and broadcasts STOP to this worker's clients on STARTED → NOT_STARTED.
+        A game_filter of None keeps the current filter.
+        """
+        with self._lock:
+            if game_filter is not None and game_filter != str(self._game_filter):
+                self._game_filter = GameFilter.parse(game_filter)
+            old_state = self._game_state
+            changed = old_state != game_state or shutdown != self._shutdown_requested
+            self._game_state = game_state
+            self._server_running = game_state == 'STARTED'
+            self._shutdown_requested = shutdown
+            self._question_timeout = question_timeout
+            self._started_at = started_at
+            if changed:
+                self._state_changed.notify_all()
+        if not changed:
+            return
+        self._notify_state_listeners(game_state)
+        if old_state == 'STARTED' and game_state == 'NOT_STARTED' and self._broadcast_stop_callback:
+            try:
+                self._broadcast_stop_callback()
+            except Exception as e:
+                self.send_log(f'Warning: Could not broadcast stop: {e}')
+
+    def get_state_snapshot(self) -> Tuple[str, bool, Optional[float], Optional[float], str]:
+        """Return (game_state, shutdown, question_timeout, started_at, game_filter) atomically."""
+        with self._lock:
+            return (self._game_state, self._shutdown_requested, self._question_timeout, self._started_at,
+                    str(self._game_filter))
+
 
 ui_logger = UILogger()
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from config.server_config import server_config
+from server.coordinator import CoordinatorLink, GameCoordinator, serve_coordinator
+from server.ui_logger import ui_logger
+
+ACCEPT_TIMEOUT = server_config.ACCEPT_TIMEOUT
+WORKER_JOIN_TIMEOUT = 5.0  # seconds to wait for workers on shutdown
+
+
+def reuse_port_supported() -> bool:
+    return hasattr(socket, 'SO_REUSEPORT')
+
+
+def _mirror_state(link: CoordinatorLink, worker_id: int, report_metrics: bool) -> None:
+    """Keep this worker's ui_logger in sync with the master's game state.
+
+    Also reports queue depths (and metrics, if enabled) on every round,
+    i.e. at least once per ACCEPT_TIMEOUT.
+    """
+    from server.metrics import METRICS
+    from server.server import REGISTRY
+
+    version, epoch = -1, 0
+    while True:
+        try:
+            version, new_epoch, state, shutdown, question_timeout, started_at, game_filter = link.call(
+                'wait_for_change', version, ACCEPT_TIMEOUT
+            )
+        except Exception as e:
+            print(f'[WORKER {worker_id}] Coordinator unreachable, shutting down: {e}')
+            ui_logger.apply_remote_state(ui_logger.get_game_state(), True, None, None)
+            return
+        if new_epoch != epoch:
+            # Operator reset names on the dashboard
+            REGISTRY.clear_all()
+            epoch = new_epoch
+        ui_logger.apply_remote_state(state, shutdown, question_timeout, started_at, game_filter)
+        link.post('report_queue_depths', worker_id, REGISTRY.get_queue_depths())
+        if report_metrics:
+            link.post('report_metrics', worker_id, METRICS.collect())
+        if shutdown:
+            return
+
+
+def run_worker(worker_id: int, address: Tuple[str, int], authkey: bytes, options: Dict[str, Any]) -> None:
+    """Entry point of one accept worker process."""
+    from core.network_utils import set_send_observer
+    from core.question_bank import open_question_bank
+    from server import adaptive, metrics, outbound
+    from server import server as srv
+    from server.question_reload import BankWatcher, VersionedBank
+
+    link = CoordinatorLink(address, authkey)
+    ui_logger.attach_coordinator(link)
+    ui_logger.register_broadcast_stop_callback(srv.broadcast_stop_to_clients)
+    ui_logger.add_state_listener(srv._sync_question_timers)
+    outbound.configure(options['outbound_queue_size'], options['overflow_policy'], options.get('coalesce'))
+    report_metrics = bool(options.get('metrics_port'))
+    if report_metrics:
+        set_send_observer(metrics.SEND_SECONDS.observe)
+
+    threading.Thread(target=_mirror_state, args=(link, worker_id, report_metrics), daemon=True).start()
+
+    loader = options.get('question_loader', srv.QUESTION_LOADER)
+    cache = options.get('question_cache', srv.QUESTION_CACHE)
+    started = time.perf_counter()
+    questions = open_question_bank(srv.QUESTIONS_PATH, loader, cache)
+    bank = VersionedBank(questions, time.perf_counter() - started)
+    bank.report()
+    if options.get('selection') == 'adaptive':
+        # Workers share the ratings file; saves merge under a file lock
+        adaptive.enable(options.get('ratings', srv.RATINGS_PATH))
+    srv.prepare_bank(bank.current)
+    reload_interval = options.get('reload_interval', srv.QUESTION_RELOAD_INTERVAL)
+    if reload_interval > 0:
+        BankWatcher(bank, srv.QUESTIONS_PATH, loader, cache, reload_interval, srv.prepare_bank).start()
+    host, port = options['host'], options['port']
+    ui_logger.send_log(f'[WORKER {worker_id}] pid {os.getpid()} accepting on {host}:{port}')
+    try:
+        if options['engine'] == 'asyncio':
+            from server.async_server import start_async_server
+            start_async_server(bank, host, port, reuse_port=True)
+        else:
+            srv.start_server_socket(bank, host, port, reuse_port=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        adaptive.disable()
+
+
+class WorkerPool:
+    """N accept worker processes sharing one port through SO_REUSEPORT.
+
+    The calling (master) process becomes the coordinator: it owns the real
+    ui_logger and dashboard, and serves a GameCoordinator to the workers.
+    """
+
+    def __init__(self, workers: int, options: Dict[str, Any]) -> None:
+        self.workers = workers
+        self.options = options
+        self.coordinator = GameCoordinator(ui_logger)
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        authkey = os.urandom(16)
+        address = serve_coordinator(self.coordinator, authkey)
+        # spawn: workers must not inherit the master's Tk or lock state
+        ctx = multiprocessing.get_context('spawn')
+        for worker_id in range(self.workers):
+            process = ctx.Process(
+                target=run_worker,
+                args=(worker_id, address, authkey, self.options),
+                name=f'quiz-worker-{worker_id}',
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        ui_logger.send_log(f'Started {self.workers} workers on port {self.options["port"]} (SO_REUSEPORT)')
+
+    def wait(self) -> None:
+        """Block until shutdown is requested or every worker has exited."""
+        try:
+            while not ui_logger.is_shutdown_requested():
+                if not any(p.is_alive() for p in self._processes):
+                    ui_logger.send_log('All workers exited')
+                    break
+                time.sleep(ACCEPT_TIMEOUT)
+        except KeyboardInterrupt:
+            ui_logger.send_log('KeyboardInterrupt received, shutting down')
+            ui_logger.request_shutdown()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        deadline = time.monotonic() + WORKER_JOIN_TIMEOUT
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        ui_logger.send_log('Server main loop exiting')